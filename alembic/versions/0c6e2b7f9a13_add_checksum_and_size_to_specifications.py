@@ -0,0 +1,25 @@
+"""Add checksum_sha256 and size_bytes to specifications
+
+Revision ID: 0c6e2b7f9a13
+Revises: f1a2c9d84e37
+Create Date: 2026-10-19 13:05:12.631874
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6e2b7f9a13'
+down_revision: Union[str, Sequence[str], None] = 'f1a2c9d84e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('specifications', sa.Column('checksum_sha256', sa.String(length=64), nullable=True))
+    op.add_column('specifications', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('specifications', 'size_bytes')
+    op.drop_column('specifications', 'checksum_sha256')
@@ -0,0 +1,90 @@
+"""Add full-text search indexes for companies, projects and specs
+
+Revision ID: 2c7e9f4a6b31
+Revises: a9c3e7d15f20
+Create Date: 2026-10-19 18:21:37.904512
+
+On Postgres each table gets a GIN index on the weighted tsvector of its name
+(A) and description (B). The expression must stay identical to
+app.services.search.DOCUMENT or queries stop using the index. The indexes are
+built CONCURRENTLY, outside the migration transaction, so writes are not
+blocked.
+
+On SQLite an FTS5 table, search_index, covers all three tables. It is keyed by
+id * 3 + (0 company, 1 project, 2 spec) and kept current by triggers.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2c7e9f4a6b31'
+down_revision: Union[str, Sequence[str], None] = 'a9c3e7d15f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('companies', 'projects', 'specs')
+
+DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+        "USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    for code, table in enumerate(TABLES):
+        row = f"(new.id * 3 + {code}, new.name, new.description)"
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO search_index (rowid, title, body) VALUES {row}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF name, description ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 3 + {code}; "
+            f"INSERT INTO search_index (rowid, title, body) VALUES {row}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 3 + {code}; END"
+        )
+    op.execute("DELETE FROM search_index")
+    for code, table in enumerate(TABLES):
+        op.execute(
+            f"INSERT INTO search_index (rowid, title, body) "
+            f"SELECT id * 3 + {code}, name, description FROM {table}"
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        _upgrade_sqlite()
+        return
+    if bind.dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search "
+                f"ON {table} USING gin (({DOCUMENT}))"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for table in TABLES:
+            for event in ('insert', 'update', 'delete'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+        op.execute("DROP TABLE IF EXISTS search_index")
+        return
+    if bind.dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search")
@@ -0,0 +1,23 @@
+"""Add file_name to specs
+
+Revision ID: 3a5d1c8e7f42
+Revises: 6f3b8d2e9a14
+Create Date: 2026-10-19 18:05:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3a5d1c8e7f42'
+down_revision: Union[str, Sequence[str], None] = '6f3b8d2e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('specs', sa.Column('file_name', sa.String(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('specs', 'file_name')
@@ -0,0 +1,47 @@
+"""Index created_at and updated_at on users, companies, projects and specs
+
+Revision ID: 4e2a7c9d1b56
+Revises: 8b1d5f3e2a97
+Create Date: 2026-10-19 19:48:15.662093
+
+The /search/suggest index (app/core/suggest.py) refreshes every worker from
+rows created or updated since its last pass. These indexes keep that query
+off a full scan. On Postgres they are built CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4e2a7c9d1b56'
+down_revision: Union[str, Sequence[str], None] = '8b1d5f3e2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'companies', 'projects', 'specs')
+COLUMNS = ('created_at', 'updated_at')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for table in TABLES:
+            for column in COLUMNS:
+                op.create_index(f'ix_{table}_{column}', table, [column])
+        return
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for column in COLUMNS:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column} ON {table} ({column})")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for table in TABLES:
+            for column in COLUMNS:
+                op.drop_index(f'ix_{table}_{column}', table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for column in COLUMNS:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}")
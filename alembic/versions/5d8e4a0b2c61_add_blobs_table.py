@@ -0,0 +1,40 @@
+"""Add blobs table for content-addressed file storage
+
+Revision ID: 5d8e4a0b2c61
+Revises: 0c6e2b7f9a13
+Create Date: 2026-10-19 14:41:03.218845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e4a0b2c61'
+down_revision: Union[str, Sequence[str], None] = '0c6e2b7f9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('storage', sa.String(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('refcount', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unreferenced_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_blobs_id'), 'blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_blobs_sha256'), 'blobs', ['sha256'], unique=False)
+    op.create_index(op.f('ix_blobs_location'), 'blobs', ['location'], unique=True)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_blobs_location'), table_name='blobs')
+    op.drop_index(op.f('ix_blobs_sha256'), table_name='blobs')
+    op.drop_index(op.f('ix_blobs_id'), table_name='blobs')
+    op.drop_table('blobs')
@@ -0,0 +1,85 @@
+"""Add spec_contents, the full-text index of spec file text
+
+Revision ID: 6f3b8d2e9a14
+Revises: 4e2a7c9d1b56
+Create Date: 2026-10-19 20:41:06.318270
+
+Text extracted from uploaded spec files (app/services/spec_index.py), one row
+per spec. On Postgres the text gets a GIN index on its 'simple' tsvector; the
+expression must stay identical to app.services.spec_index.DOCUMENT. It is
+built CONCURRENTLY. On SQLite an external-content FTS5 table,
+spec_content_index, indexes it and triggers keep it current.
+
+Existing specs are indexed by the background indexer's first scan, or up
+front with: python -m app.services.spec_index
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3b8d2e9a14'
+down_revision: Union[str, Sequence[str], None] = '4e2a7c9d1b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCUMENT = "to_tsvector('simple', coalesce(content, ''))"
+
+
+def _upgrade_sqlite() -> None:
+    insert_new = "INSERT INTO spec_content_index (rowid, content) VALUES (new.spec_id, new.content);"
+    delete_old = (
+        "INSERT INTO spec_content_index (spec_content_index, rowid, content) "
+        "VALUES ('delete', old.spec_id, old.content);"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS spec_content_index USING fts5(content, "
+        "content = 'spec_contents', content_rowid = 'spec_id', tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS spec_content_index_insert AFTER INSERT ON spec_contents BEGIN {insert_new} END")
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS spec_content_index_update AFTER UPDATE OF content ON spec_contents BEGIN "
+        f"{delete_old} {insert_new} END"
+    )
+    op.execute(f"CREATE TRIGGER IF NOT EXISTS spec_content_index_delete AFTER DELETE ON spec_contents BEGIN {delete_old} END")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'spec_contents',
+        sa.Column('spec_id', sa.Integer(), nullable=False),
+        sa.Column('checksum_sha256', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('extractor', sa.String(length=16), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('indexed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['spec_id'], ['specs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('spec_id')
+    )
+    op.create_index(op.f('ix_spec_contents_checksum_sha256'), 'spec_contents', ['checksum_sha256'], unique=False)
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        _upgrade_sqlite()
+        return
+    if bind.dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_spec_contents_content "
+            f"ON spec_contents USING gin (({DOCUMENT}))"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS spec_content_index_{event}")
+        op.execute("DROP TABLE IF EXISTS spec_content_index")
+    elif bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_spec_contents_content")
+    op.drop_index(op.f('ix_spec_contents_checksum_sha256'), table_name='spec_contents')
+    op.drop_table('spec_contents')
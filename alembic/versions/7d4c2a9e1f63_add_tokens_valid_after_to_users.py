@@ -0,0 +1,23 @@
+"""Add tokens_valid_after to users
+
+Revision ID: 7d4c2a9e1f63
+Revises: 3a5d1c8e7f42
+Create Date: 2026-10-19 21:14:37.902551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4c2a9e1f63'
+down_revision: Union[str, Sequence[str], None] = '3a5d1c8e7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('tokens_valid_after', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('users', 'tokens_valid_after')
@@ -0,0 +1,89 @@
+"""Add trigram indexes for company search
+
+Revision ID: 8b1d5f3e2a97
+Revises: 2c7e9f4a6b31
+Create Date: 2026-10-19 19:02:48.117630
+
+crud.company.get_companies filters on ilike '%term%' over companies.name,
+companies.description and the owner's users.email.
+
+On Postgres those columns get pg_trgm GIN indexes, built CONCURRENTLY. The
+extension has to be creatable by the migration role. On SQLite each table gets
+an external-content FTS5 table with the trigram tokenizer, <table>_trgm, kept
+current by triggers.
+
+Both get a plain index on companies.owner_id, which the owner-email lookup
+and owner-scoped listings join on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1d5f3e2a97'
+down_revision: Union[str, Sequence[str], None] = '2c7e9f4a6b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = {
+    'companies': ('name', 'description'),
+    'users': ('email',),
+}
+
+
+def _upgrade_sqlite() -> None:
+    for table, columns in TRIGRAM_COLUMNS.items():
+        index = f'{table}_trgm'
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        insert_new = f"INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});"
+        delete_old = f"INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});"
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} "
+            f"USING fts5({names}, content = '{table}', content_rowid = 'id', tokenize = 'trigram')"
+        )
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN {insert_new} END")
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+            f"{delete_old} {insert_new} END"
+        )
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN {delete_old} END")
+        op.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_companies_owner_id', 'companies', ['owner_id'])
+        if bind.dialect.name == 'sqlite':
+            _upgrade_sqlite()
+        return
+    with op.get_context().autocommit_block():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_owner_id ON companies (owner_id)")
+        for table, columns in TRIGRAM_COLUMNS.items():
+            for column in columns:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        if bind.dialect.name == 'sqlite':
+            for table in TRIGRAM_COLUMNS:
+                for event in ('insert', 'update', 'delete'):
+                    op.execute(f"DROP TRIGGER IF EXISTS {table}_trgm_{event}")
+                op.execute(f"DROP TABLE IF EXISTS {table}_trgm")
+        op.drop_index('ix_companies_owner_id', table_name='companies')
+        return
+    with op.get_context().autocommit_block():
+        for table, columns in TRIGRAM_COLUMNS.items():
+            for column in columns:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_companies_owner_id")
+    # pg_trgm is left installed; other objects may depend on it
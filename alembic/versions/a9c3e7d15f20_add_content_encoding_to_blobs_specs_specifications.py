@@ -0,0 +1,29 @@
+"""Add content_encoding to blobs, specs and specifications
+
+Revision ID: a9c3e7d15f20
+Revises: 5d8e4a0b2c61
+Create Date: 2026-10-19 17:05:12.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e7d15f20'
+down_revision: Union[str, Sequence[str], None] = '5d8e4a0b2c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('blobs', sa.Column('content_encoding', sa.String(length=16), nullable=True))
+    op.add_column('blobs', sa.Column('stored_size_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('specs', sa.Column('content_encoding', sa.String(length=16), nullable=True))
+    op.add_column('specifications', sa.Column('content_encoding', sa.String(length=16), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('specifications', 'content_encoding')
+    op.drop_column('specs', 'content_encoding')
+    op.drop_column('blobs', 'stored_size_bytes')
+    op.drop_column('blobs', 'content_encoding')
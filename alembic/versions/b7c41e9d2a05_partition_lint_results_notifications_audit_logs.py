@@ -0,0 +1,149 @@
+"""Partition lint_results, notifications and audit_logs by month
+
+Revision ID: b7c41e9d2a05
+Revises: d099d2f46013
+Create Date: 2026-10-19 09:12:44.318207
+
+Postgres only; other dialects are left untouched. Each existing table is
+renamed to <table>_legacy, a RANGE (created_at) partitioned table is created
+in its place with one partition per month of existing data (plus a few
+months ahead) and a <table>_default partition, and the rows are copied
+across. The default partition catches rows outside every monthly partition,
+e.g. if maintenance has not run; app/services/partitions.py moves them out
+when it creates their month. The legacy tables are kept
+for verification and must be dropped in a separate, reviewed migration.
+
+Partitioned tables need the partition key in their primary key, so the
+primary key becomes (id, created_at) and the comments.lint_result_id foreign
+key (which requires a unique lint_results.id) is dropped.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41e9d2a05'
+down_revision: Union[str, Sequence[str], None] = 'd099d2f46013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+# table -> (foreign keys to restore, secondary indexes)
+TABLES = {
+    'lint_results': (
+        [('spec_id', 'specs')],
+        [('ix_lint_results_spec_id_created_at', 'spec_id, created_at')],
+    ),
+    'notifications': (
+        [('recipient_id', 'users')],
+        [('ix_notifications_recipient_id_created_at', 'recipient_id, created_at')],
+    ),
+    'audit_logs': (
+        [('user_id', 'users')],
+        [('ix_audit_logs_resource', 'resource_type, resource_id, created_at')],
+    ),
+}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(table: str, first_month: date) -> None:
+    current = date.today().replace(day=1)
+    month = min(first_month, current)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _finish_partitioned_table(table: str) -> None:
+    foreign_keys, indexes = TABLES[table]
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+    op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+    for column, target in foreign_keys:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        )
+    for name, columns in indexes:
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def _convert_table(bind, table: str) -> None:
+    legacy = f"{table}_legacy"
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+    op.execute(f"ALTER INDEX IF EXISTS ix_{table}_id RENAME TO ix_{legacy}_id")
+    op.execute(f"UPDATE {legacy} SET created_at = now() WHERE created_at IS NULL")
+
+    op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    _finish_partitioned_table(table)
+
+    first = bind.execute(sa.text(f"SELECT min(created_at) FROM {legacy}")).scalar()
+    _create_month_partitions(table, (first.date() if first else date.today()).replace(day=1))
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+
+
+def _create_audit_logs() -> None:
+    # audit_logs was modelled but never migrated; create it partitioned from the start
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id SERIAL NOT NULL,
+            event_type VARCHAR NOT NULL,
+            user_id INTEGER NOT NULL,
+            resource_type VARCHAR NOT NULL,
+            resource_id INTEGER NOT NULL,
+            action VARCHAR NOT NULL,
+            details JSON,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    _finish_partitioned_table('audit_logs')
+    _create_month_partitions('audit_logs', date.today().replace(day=1))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE comments DROP CONSTRAINT IF EXISTS comments_lint_result_id_fkey")
+    for table in TABLES:
+        if table == 'audit_logs' and not sa.inspect(bind).has_table('audit_logs'):
+            _create_audit_logs()
+        else:
+            _convert_table(bind, table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(bind)
+    for table in TABLES:
+        legacy = f"{table}_legacy"
+        if not inspector.has_table(legacy):
+            op.execute(f"DROP TABLE {table} CASCADE")
+            continue
+        op.execute(f"INSERT INTO {legacy} SELECT * FROM {table} ON CONFLICT (id) DO NOTHING")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {legacy}.id")
+        op.execute(f"DROP TABLE {table} CASCADE")
+        op.execute(f"ALTER TABLE {legacy} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {legacy}_pkey TO {table}_pkey")
+        op.execute(f"ALTER INDEX IF EXISTS ix_{legacy}_id RENAME TO ix_{table}_id")
+    op.create_foreign_key(None, 'comments', 'lint_results', ['lint_result_id'], ['id'])
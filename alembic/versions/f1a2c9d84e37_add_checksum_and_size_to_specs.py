@@ -0,0 +1,25 @@
+"""Add checksum_sha256 and size_bytes to specs
+
+Revision ID: f1a2c9d84e37
+Revises: e3f58a1c7b94
+Create Date: 2026-10-19 12:20:41.907336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a2c9d84e37'
+down_revision: Union[str, Sequence[str], None] = 'e3f58a1c7b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column('specs', sa.Column('checksum_sha256', sa.String(length=64), nullable=True))
+    op.add_column('specs', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('specs', 'size_bytes')
+    op.drop_column('specs', 'checksum_sha256')
@@ -1,43 +1,7 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+# Shared request dependencies. Every endpoint must resolve `db` and `current_user`
+# through these same callables: FastAPI caches a dependency per request by
+# identity, so one request opens one session and holds at most one connection.
+from app.db.session import get_db
+from app.utils.security import get_current_user, oauth2_scheme
 
-from app.core.config import settings
-from app.db.session import SessionLocal
-from app.db.models import User
-from app.schemas.user import UserOut
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
-
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user 
\ No newline at end of file
+__all__ = ["get_db", "get_current_user", "oauth2_scheme"]
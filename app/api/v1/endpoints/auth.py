@@ -2,29 +2,30 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks,
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.schemas.user import UserCreate, UserOut, Token, LoginRequest, ForgotPasswordRequest
+from app.schemas.user import UserCreate, UserOut, Token, LoginRequest, ForgotPasswordRequest, RefreshTokenRequest, LogoutRequest
+from app.core.user_cache import AuthenticatedUser
 from app.services import auth as auth_service, email as email_service
 from app.db.session import get_db
-from app.utils.security import get_current_user
+from app.utils import security
+from app.utils.security import get_current_user, oauth2_scheme
 
 router = APIRouter()
 
 @router.post("/signup", response_model=UserOut)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = auth_service.create_user(db, user_in)
+async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
+    user = await auth_service.create_user(db, user_in)
     return user
 
 @router.post("/login", response_model=Token)
-def login(login_in: LoginRequest, db: Session = Depends(get_db)):
-    user = auth_service.authenticate_user(db, login_in.email, login_in.password)
+async def login(login_in: LoginRequest, db: Session = Depends(get_db)):
+    user = await auth_service.authenticate_user(db, login_in.email, login_in.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    access_token = auth_service.create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return auth_service.create_token_pair(user.email)
 
 @router.post("/forgot-password")
-def forgot_password(req: ForgotPasswordRequest, db: Session = Depends(get_db)):
-    user = auth_service.reset_password(db, req.email, req.new_password)
+async def forgot_password(req: ForgotPasswordRequest, db: Session = Depends(get_db)):
+    user = await auth_service.reset_password(db, req.email, req.new_password)
     return {"msg": "Password reset successful"}
 
 @router.get("/profile", response_model=UserOut)
@@ -42,14 +43,55 @@ def get_me(current_user: UserOut = Depends(get_current_user)):
     return current_user
 
 @router.post("/logout")
-def logout():
-    """Logout (placeholder)."""
+def logout(
+    logout_in: LogoutRequest = Body(None),
+    token: str = Depends(oauth2_scheme)
+):
+    """Revoke the presented access token and, if given, the session's refresh token."""
+    payload = security.decode_token(token)
+    refresh_payload = None
+    if logout_in and logout_in.refresh_token:
+        try:
+            refresh_payload = security.decode_token(logout_in.refresh_token, token_type="refresh")
+        except HTTPException:
+            pass  # Already expired or revoked
+    try:
+        security.revoke_token(payload)
+        if refresh_payload is not None:
+            # Marked used in the shared store, so no worker accepts it for a refresh
+            security.consume_refresh_token(refresh_payload)
+    except Exception:
+        # Reporting success here would leave the tokens usable on other workers
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Logout temporarily unavailable")
     return {"msg": "Logged out"}
 
-@router.post("/refresh-token")
-def refresh_token():
-    """Refresh JWT token (placeholder)."""
-    return {"msg": "Token refreshed"}
+@router.post("/refresh-token", response_model=Token)
+def refresh_token(refresh_in: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new token pair; the presented refresh token is used up."""
+    payload = security.decode_token(refresh_in.refresh_token, token_type="refresh")
+    user = auth_service.get_user_by_email(db, payload["sub"])
+    if not user or not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    # Read from the row, not the user cache: a reset on another worker applies at once
+    if security.issued_before_reset(payload, AuthenticatedUser.from_user(user)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Rotation: the token is consumed atomically in the shared store, so of
+    # concurrent or replayed refreshes, on any worker, only the first succeeds
+    try:
+        first_use = security.consume_refresh_token(payload)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Token refresh temporarily unavailable")
+    if not first_use:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return auth_service.create_token_pair(user.email)
 
 @router.post("/request-password-reset")
 def request_password_reset(
@@ -71,7 +113,7 @@ def request_password_reset(
     return {"msg": "If the email exists, a reset link will be sent."}
 
 @router.post("/reset-password")
-def reset_password_with_token(
+async def reset_password_with_token(
     token: str = Body(..., embed=True),
     new_password: str = Body(..., embed=True),
     db: Session = Depends(get_db)
@@ -79,8 +121,6 @@ def reset_password_with_token(
     email = auth_service.verify_password_reset_token(token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = auth_service.get_user_by_email(db, email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    auth_service.reset_password(db, email, new_password)
+    # reset_password looks the user up and returns 404 if it no longer exists
+    await auth_service.reset_password(db, email, new_password)
     return {"msg": "Password reset successful"} 
\ No newline at end of file
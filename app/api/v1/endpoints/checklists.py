@@ -5,12 +5,16 @@ import os
 import uuid
 from datetime import datetime
 from app.api import deps
+from app.crud import checklist as crud_checklist
 from app.schemas.checklist_template import (
     ChecklistTemplateCreate, ChecklistTemplateOut, ChecklistItemCreate, ChecklistItemOut,
-    ActiveChecklistCreate, ActiveChecklistOut, ActiveChecklistItemCreate, ActiveChecklistItemOut, ActiveChecklistItemUpdate
+    ActiveChecklistCreate, ActiveChecklistBulkCreate, ActiveChecklistOut, ActiveChecklistItemCreate, ActiveChecklistItemOut, ActiveChecklistItemUpdate
 )
 from app.db.models import ChecklistTemplate, ChecklistItem, ActiveChecklist, ActiveChecklistItem
 from app.core.logging import get_logger, log_audit_event
+from app.services import blobs
+from app.services.storage import UPLOADS
+from app.services.uploads import hash_upload
 from app.utils.security import get_current_user
 from app.schemas.user import UserOut
 import app.db.models as models
@@ -109,23 +113,8 @@ def create_active_checklist(
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    # Create active checklist
-    db_checklist = ActiveChecklist(**checklist.dict())
-    db.add(db_checklist)
-    db.commit()
-    db.refresh(db_checklist)
-    
-    # Create active items from template items
-    template_items = db.query(ChecklistItem).filter(ChecklistItem.template_id == checklist.template_id).all()
-    for template_item in template_items:
-        active_item = ActiveChecklistItem(
-            checklist_id=db_checklist.id,
-            template_item_id=template_item.id,
-            status="pending"
-        )
-        db.add(active_item)
-    
-    db.commit()
+    # Create the checklist and copy all template items in a single transaction
+    db_checklist = crud_checklist.instantiate_active_checklist(db, checklist)
     
     # Audit logging
     log_audit_event(
@@ -140,6 +129,34 @@ def create_active_checklist(
     
     return db_checklist
 
+@router.post("/active/bulk", response_model=List[ActiveChecklistOut])
+def create_active_checklists_bulk(
+    bulk_in: ActiveChecklistBulkCreate,
+    current_user: UserOut = Depends(get_current_user),
+    db: Session = Depends(deps.get_db)
+):
+    """Create one active checklist per linked spec from the same template."""
+    # Check if template exists
+    template = db.query(ChecklistTemplate).filter(ChecklistTemplate.id == bulk_in.template_id).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    db_checklists = crud_checklist.instantiate_active_checklists_for_specs(db, bulk_in)
+    
+    # Audit logging
+    for db_checklist in db_checklists:
+        log_audit_event(
+            logger=logger,
+            event_type="active_checklist_created",
+            user_id=current_user.id,
+            resource_type="active_checklist",
+            resource_id=db_checklist.id,
+            action="create",
+            details={"template_id": bulk_in.template_id, "linked_spec_id": db_checklist.linked_spec_id}
+        )
+    
+    return db_checklists
+
 @router.get("/active", response_model=List[ActiveChecklistOut])
 def get_active_checklists(
     current_user: UserOut = Depends(get_current_user),
@@ -228,10 +245,8 @@ async def upload_evidence(
                 detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
             )
         
-        # Check file size (max 10MB)
-        file_size = 0
-        file_content = await file.read()
-        file_size = len(file_content)
+        # Check file size (max 10MB); the hash is reused by the blob store
+        _, file_size = await hash_upload(file)
         
         if file_size > 10 * 1024 * 1024:  # 10MB
             raise HTTPException(
@@ -257,21 +272,17 @@ async def upload_evidence(
                 detail="Only assigned users or admins can upload evidence for this checklist item"
             )
         
-        # Create upload directory if it doesn't exist
         upload_dir = "uploads/checklist_evidence"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(upload_dir, unique_filename)
         
         # Atomic operation: save file first, then update DB
         try:
-            # Save file to disk
-            with open(file_path, "wb") as f:
-                f.write(file_content)
+            # Content-addressed save; re-uploaded evidence only adds a reference.
+            # Never compressed: evidence paths are read as plain files.
+            file_path = (await blobs.store_upload(db, UPLOADS, upload_dir, file)).key
             
-            # Update database
+            # Update database, dropping the previous evidence's reference
+            # (net zero if the same file was uploaded again)
+            blobs.release(db, checklist_item.evidence_file_path)
             checklist_item.evidence_file_path = file_path
             checklist_item.updated_at = datetime.utcnow()
             db.commit()
@@ -290,9 +301,8 @@ async def upload_evidence(
             return checklist_item
             
         except Exception as e:
-            # Rollback: delete file if it was created
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            # Rollback: the blob reference is dropped with the transaction; an
+            # unreferenced file is orphaned and reported by the startup file sync
             db.rollback()
             raise HTTPException(
                 status_code=500,
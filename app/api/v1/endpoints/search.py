@@ -1,25 +1,54 @@
+from typing import List, Literal, Optional
+
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.db.models import Company, Project, Spec
+from app.core.config import settings
+from app.core.suggest import suggest_index
 from app.schemas.user import UserOut
-from app.schemas.company import Company as CompanySchema
-from app.schemas.project import Project as ProjectSchema
-from app.schemas.spec import Spec as SpecSchema
+from app.schemas.search import SearchResults, SpecContentResults, SuggestResults
+from app.services import search as search_service
+from app.services import spec_index
 
 router = APIRouter()
 
-@router.get("/", response_model=dict)
+@router.get("/", response_model=SearchResults)
 def global_search(
     q: str = Query(..., description="Search query"),
+    limit: int = Query(settings.SEARCH_DEFAULT_LIMIT, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(deps.get_db),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """Companies, projects and specs whose name or description matches `q`, best matches first."""
+    return search_service.search(db, q, limit, cursor)
+
+@router.get("/specs", response_model=SpecContentResults)
+def search_spec_contents(
+    q: str = Query(..., description="Words to find in spec files, e.g. a cell, corner or parameter name"),
+    limit: int = Query(settings.SEARCH_DEFAULT_LIMIT, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(deps.get_db),
     current_user: UserOut = Depends(deps.get_current_user)
 ):
-    companies = db.query(Company).filter(Company.name.ilike(f"%{q}%")).all()
-    projects = db.query(Project).filter(Project.name.ilike(f"%{q}%")).all()
-    specs = db.query(Spec).filter(Spec.name.ilike(f"%{q}%")).all()
+    """Specs whose file text (JSON keys and values, plain text, PDF text) matches `q`, with highlighted snippets."""
+    return spec_index.search_specs(db, q, limit, cursor)
+
+@router.get("/suggest", response_model=SuggestResults)
+def suggest(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    type: Optional[List[Literal["user", "company", "project", "spec"]]] = Query(None, description="Entity types to suggest; all by default"),
+    role: Optional[str] = Query(None, description="Only users with this role"),
+    is_active: Optional[bool] = Query(None, description="Only users with this active status"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """Type-ahead suggestions from this worker's in-memory prefix index; never queries the database."""
+    items = suggest_index.suggest(q, types=type, limit=limit, role=role, is_active=is_active)
     return {
-        "companies": [CompanySchema.model_validate(c).model_dump() for c in companies],
-        "projects": [ProjectSchema.model_validate(p).model_dump() for p in projects],
-        "specs": [SpecSchema.model_validate(s).model_dump() for s in specs],
-    } 
\ No newline at end of file
+        "items": [
+            {"type": item.type, "id": item.id, "label": item.label, "detail": item.detail}
+            for item in items
+        ],
+        "ready": suggest_index.ready,
+    }
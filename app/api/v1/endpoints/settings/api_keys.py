@@ -1,26 +1,49 @@
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-# from app.schemas.api_key import ApiKey, ApiKeyCreate
+from app.schemas.api_key import ApiKey, ApiKeyCreate, ApiKeyWithSecret
+from app.crud import api_key as crud_api_key
 from app.api import deps
 
 router = APIRouter()
 
-@router.get("/", response_model=dict)
-def list_api_keys(db: Session = Depends(deps.get_db)):
-    """List API keys (placeholder)."""
-    return {"msg": "List of API keys"}
+def _with_secret(api_key, key: str) -> ApiKeyWithSecret:
+    return ApiKeyWithSecret(**ApiKey.model_validate(api_key).model_dump(), key=key)
 
-@router.post("/", response_model=dict)
-def create_api_key(db: Session = Depends(deps.get_db)):
-    """Generate new API key (placeholder)."""
-    return {"msg": "API key created"}
+@router.get("/", response_model=List[ApiKey])
+def list_api_keys(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """List the current user's API keys (secrets are never returned)."""
+    return crud_api_key.get_api_keys(db, current_user.id)
 
-@router.post("/{key_id}/regenerate", response_model=dict)
-def regenerate_api_key(key_id: int, db: Session = Depends(deps.get_db)):
-    """Regenerate API key (placeholder)."""
-    return {"msg": "API key regenerated"}
+@router.post("/", response_model=ApiKeyWithSecret, status_code=status.HTTP_201_CREATED)
+def create_api_key(
+    api_key_in: ApiKeyCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Generate a new API key. The full key is only shown in this response."""
+    api_key, key = crud_api_key.create_api_key(db, api_key_in, current_user.id)
+    return _with_secret(api_key, key)
+
+@router.post("/{key_id}/regenerate", response_model=ApiKeyWithSecret)
+def regenerate_api_key(
+    key_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Regenerate an API key; the previous key is rejected from now on."""
+    api_key, key = crud_api_key.regenerate_api_key(db, key_id, current_user.id)
+    return _with_secret(api_key, key)
 
 @router.delete("/{key_id}", response_model=dict)
-def delete_api_key(key_id: int, db: Session = Depends(deps.get_db)):
-    """Delete API key (placeholder)."""
-    return {"msg": "API key deleted"} 
\ No newline at end of file
+def delete_api_key(
+    key_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Delete an API key."""
+    crud_api_key.delete_api_key(db, key_id, current_user.id)
+    return {"msg": "API key deleted"}
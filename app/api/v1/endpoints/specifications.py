@@ -1,15 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.specification import SpecificationOut, SpecificationCreate
-from app.crud.specification import create_specification, get_specifications, get_spec_by_file_path
+from app.crud.specification import (
+    create_specification, delete_specification as crud_delete_specification, get_specification,
+    get_specifications, get_spec_by_file_path
+)
 from app.utils.security import get_current_user
 from app.schemas.user import UserOut
 from typing import List, Optional
 import os
 import uuid
-from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from app.db.models import Specification
+from app.services import blobs
+from app.services.downloads import download_response
+from app.services.storage import UPLOADS, ObjectNotFound, StorageError, get_storage
 from datetime import datetime
 from uuid import UUID
 
@@ -26,18 +32,17 @@ async def upload_spec(
     current_user: UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    contents = await file.read()
-    file_id = str(uuid.uuid4())
-    ext = os.path.splitext(file.filename)[1]
-    save_path = os.path.join(UPLOAD_DIR, f"{file_id}{ext}")
-    with open(save_path, "wb") as buffer:
-        buffer.write(contents)
+    # Stored by content: chunked copy off the event loop, skipped for known files
+    upload = await blobs.store_upload(db, UPLOADS, UPLOAD_DIR, file, compress=True)
     spec_in = SpecificationCreate(
         file_name=file.filename,
         mime_type=file.content_type,
         uploaded_by=uploaded_by,
         assigned_to=assigned_to,
-        file_path=save_path
+        file_path=upload.key,
+        checksum_sha256=upload.checksum_sha256,
+        size_bytes=upload.size_bytes,
+        content_encoding=upload.content_encoding
     )
     return create_specification(db, spec_in)
 
@@ -67,15 +72,28 @@ def list_specifications(
     )
 
 @router.get("/{id}/download")
-def download_specification(
-    id: str,
+async def download_specification(
+    id: UUID,
+    request: Request,
     current_user: UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    spec = db.query(Specification).filter(Specification.id == id).first()
+    spec = await run_in_threadpool(get_specification, db, id)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found.")
-    return FileResponse(spec.file_path, filename=spec.file_name)
+    try:
+        return await download_response(
+            request,
+            get_storage(UPLOADS),
+            spec.file_path,
+            filename=spec.file_name,
+            media_type=spec.mime_type,
+            size=spec.size_bytes,
+            checksum_sha256=spec.checksum_sha256,
+            content_encoding=spec.content_encoding
+        )
+    except ObjectNotFound:
+        raise HTTPException(status_code=404, detail="Spec file not found.")
 
 @router.post("/{id}/approve")
 def approve_specification(
@@ -106,18 +124,19 @@ def reject_specification(
     return {"msg": "Spec rejected"}
 
 @router.delete("/{id}", status_code=204)
-def delete_specification(
+async def delete_specification(
     id: UUID,
     current_user: UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    spec = db.query(Specification).filter(Specification.id == id).first()
+    # DB work (including the blob row lock) on the threadpool, committed before any await
+    spec = await run_in_threadpool(get_specification, db, id)
     if not spec:
         raise HTTPException(status_code=404, detail="Spec not found.")
-    try:
-        os.remove(spec.file_path)
-    except Exception:
-        pass
-    db.delete(spec)
-    db.commit()
+    legacy_path = await run_in_threadpool(crud_delete_specification, db, spec)
+    if legacy_path:
+        try:
+            await get_storage(UPLOADS).delete(legacy_path)
+        except StorageError:
+            pass
     return
\ No newline at end of file
@@ -1,15 +1,22 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
 from app.crud import spec as crud_spec
 from app.crud import lint_result as crud_lint
-from app.schemas.spec import Spec, SpecCreate, SpecUpdate, SpecWithLintResults
+from app.schemas.spec import (
+    Spec, SpecCreate, SpecUpdate, SpecUploadFinalize, SpecUploadRequest, SpecUploadTicket, SpecWithLintResults
+)
 from app.schemas.lint_result import LintResult, LintResultCreate
 from app.schemas.user import UserOut
 from app.services.lint import lint_spec
-from app.crud.spec import generate_presigned_url
+from app.services.downloads import download_response, spec_download_limiter
+from app.services.storage import SPECS, ObjectNotFound, get_storage
+from app.crud.spec import generate_presigned_url, generate_presigned_urls
 
 router = APIRouter()
 
@@ -30,13 +37,56 @@ def read_specs(
         skip=skip,
         limit=limit
     )
-    # Add fileUrl to each spec
-    specs_with_url = []
-    for spec in specs:
-        spec_dict = spec.__dict__.copy()
-        spec_dict["fileUrl"] = generate_presigned_url(spec.file_path) if spec.file_path else None
-        specs_with_url.append(spec_dict)
-    return specs_with_url
+    # Add fileUrl to each spec: cached presigned URLs, or lazy per-spec redirects
+    results = [Spec.model_validate(spec) for spec in specs]
+    if settings.SPEC_FILE_URL_MODE == "redirect":
+        for result in results:
+            result.fileUrl = f"{settings.API_V1_STR}/specs/specs/{result.id}/file" if result.file_path else None
+    else:
+        # Compressed files are decoded by the API for clients that need it
+        urls = generate_presigned_urls(spec for spec in specs if spec.content_encoding is None)
+        for result in results:
+            result.fileUrl = urls.get(result.id)
+            if result.fileUrl is None and result.file_path:
+                # Store without presigned URLs (local disk): serve through the API
+                result.fileUrl = f"{settings.API_V1_STR}/specs/specs/{result.id}/file"
+    return results
+
+@router.get("/specs/{spec_id}/file")
+async def redirect_to_spec_file(
+    spec_id: int,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """
+    Redirect to a presigned URL for the spec's file; signs only when the file is actually fetched.
+    Compressed files, and stores that cannot presign (local disk), are served by the API instead.
+    """
+    spec = await run_in_threadpool(crud_spec.get_spec, db=db, spec_id=spec_id)
+    if not spec or not spec.file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spec not found"
+        )
+    url = generate_presigned_url(spec) if spec.content_encoding is None else None
+    if url:
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    try:
+        return await download_response(
+            request,
+            get_storage(SPECS),
+            spec.file_path,
+            media_type="application/octet-stream",
+            size=spec.size_bytes,
+            checksum_sha256=spec.checksum_sha256,
+            content_encoding=spec.content_encoding
+        )
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spec file not found"
+        )
 
 @router.post("/projects/{project_id}/specs", response_model=Spec)
 async def create_spec(
@@ -65,6 +115,41 @@ async def create_spec(
     )
     return spec
 
+@router.post("/projects/{project_id}/specs/uploads", response_model=SpecUploadTicket)
+async def begin_spec_upload(
+    project_id: int,
+    upload_in: SpecUploadRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """
+    Start a direct upload: returns presigned URL(s) to upload the file straight
+    to storage, and a token for finalizing it.
+    """
+    return await crud_spec.begin_direct_upload(
+        db=db,
+        project_id=project_id,
+        upload_in=upload_in,
+        author_id=current_user.id
+    )
+
+@router.post("/projects/{project_id}/specs/uploads/finalize", response_model=Spec)
+async def finalize_spec_upload(
+    project_id: int,
+    finalize_in: SpecUploadFinalize,
+    db: Session = Depends(deps.get_db),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """
+    Verify a direct upload's size and checksum and create the spec.
+    """
+    return await crud_spec.finalize_direct_upload(
+        db=db,
+        project_id=project_id,
+        finalize_in=finalize_in,
+        author_id=current_user.id
+    )
+
 @router.get("/specs/{spec_id}", response_model=SpecWithLintResults)
 def read_spec(
     spec_id: int,
@@ -101,7 +186,7 @@ def update_spec(
     return spec
 
 @router.delete("/specs/{spec_id}", response_model=bool)
-def delete_spec(
+async def delete_spec(
     spec_id: int,
     db: Session = Depends(deps.get_db),
     current_user: UserOut = Depends(deps.get_current_user)
@@ -109,7 +194,7 @@ def delete_spec(
     """
     Delete a spec.
     """
-    return crud_spec.delete_spec(
+    return await crud_spec.delete_spec(
         db=db,
         spec_id=spec_id,
         company_owner_id=current_user.id
@@ -195,10 +280,39 @@ def approve_spec(spec_id: int, db: Session = Depends(deps.get_db)):
     """Approve spec (placeholder)."""
     return {"msg": "Spec approved"}
 
-@router.get("/specs/{spec_id}/download", response_model=dict)
-def download_spec(spec_id: int, db: Session = Depends(deps.get_db)):
-    """Download/export spec (placeholder)."""
-    return {"msg": "Spec downloaded"}
+@router.get("/specs/{spec_id}/download")
+async def download_spec(
+    spec_id: int,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: UserOut = Depends(deps.get_current_user)
+):
+    """
+    Stream the spec's file through the API, for clients that cannot reach the
+    store directly. Supports Range and conditional requests.
+    """
+    spec = await run_in_threadpool(crud_spec.get_spec, db=db, spec_id=spec_id)
+    if not spec or not spec.file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spec not found"
+        )
+    try:
+        return await spec_download_limiter.run(request, lambda: download_response(
+            request,
+            get_storage(SPECS),
+            spec.file_path,
+            filename=crud_spec.download_filename(spec),
+            media_type="application/octet-stream",
+            size=spec.size_bytes,
+            checksum_sha256=spec.checksum_sha256,
+            content_encoding=spec.content_encoding
+        ))
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spec file not found"
+        )
 
 @router.post("/specs/{spec_id}/duplicate", response_model=dict)
 def duplicate_spec(spec_id: int, db: Session = Depends(deps.get_db)):
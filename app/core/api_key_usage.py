@@ -0,0 +1,95 @@
+"""
+last_used_at bookkeeping for API keys, kept off the request's connection.
+
+Authentication only records the key id and time in memory. A daemon thread
+writes the pending marks every API_KEY_USAGE_FLUSH_INTERVAL_SECONDS in one
+short transaction on its own connection. A request authenticated by API key
+therefore checks out one connection, like a JWT request, and never commits
+the request session. Marks not yet flushed when a worker stops are lost; the
+column is advisory.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+
+from app.core import metrics
+from app.core.logging import get_logger
+from app.db.models import ApiKey
+from app.db.session import engine
+
+logger = get_logger(__name__)
+
+
+class ApiKeyUsage:
+    """Pending last_used_at values by key id, written in batches."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.written = 0
+        self.last_flush: Optional[float] = None
+        self.flush_errors = 0
+
+    def record(self, key_id: int) -> None:
+        with self._lock:
+            self._pending[key_id] = datetime.now(timezone.utc)
+
+    def flush(self) -> int:
+        """Write every pending mark in one transaction; returns how many keys were updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    update(ApiKey.__table__)
+                    .where(ApiKey.__table__.c.id == bindparam("key_id"))
+                    .values(last_used_at=bindparam("used_at")),
+                    [{"key_id": key_id, "used_at": used_at} for key_id, used_at in pending.items()]
+                )
+        except Exception:
+            # Keep the marks for the next flush unless a newer one arrived meanwhile
+            with self._lock:
+                for key_id, used_at in pending.items():
+                    self._pending.setdefault(key_id, used_at)
+            raise
+        self.written += len(pending)
+        self.last_flush = time.time()
+        return len(pending)
+
+    def start(self, interval: float) -> None:
+        """Flush every `interval` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    self.flush_errors += 1
+                    logger.error("API key usage flush failed", error=str(e))
+
+        self._thread = threading.Thread(target=loop, name="api-key-usage-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "last_flush": self.last_flush,
+            "flush_errors": self.flush_errors,
+        }
+
+
+api_key_usage = ApiKeyUsage()
+metrics.register("api_key_usage", api_key_usage.stats)
@@ -31,16 +31,120 @@ class Settings(BaseSettings):
             return v
         return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
 
+    # Query instrumentation: flag requests where one statement shape repeats more than this
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 10
+
+    # Monthly partitions for lint_results, notifications and audit_logs (Postgres only)
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_RETENTION_MONTHS: int = 24
+    PARTITION_RETENTION_ACTION: str = "archive"  # archive or drop
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # Token revocation: "redis" (shared between workers) or "memory" (single process/tests)
+    REVOCATION_STORE: str = "redis"
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 5.0
+
+    # Authenticated-user cache used by get_current_user
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing: bcrypt cost and the dedicated pool it runs on. Stored
+    # hashes with a different cost are rehashed on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # API keys for machine clients; the HMAC secret defaults to SECRET_KEY
+    API_KEY_HMAC_SECRET: Optional[str] = None
+    API_KEY_CACHE_TTL_SECONDS: int = 60
+    API_KEY_CACHE_MAX_SIZE: int = 10000
+    # last_used_at of API keys is buffered in memory and written this often
+    API_KEY_USAGE_FLUSH_INTERVAL_SECONDS: float = 30.0
 
     # AWS S3
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str
     S3_BUCKET: str
+    # Point at a local S3-compatible server (MinIO, moto) for development and tests
+    S3_ENDPOINT_URL: Optional[str] = None
+
+    # File storage (app/services/storage): "s3" or "local" per store. Local
+    # roots are directories; the uploads root is the working directory so
+    # existing uploaded_specs/ and uploads/ paths stay valid.
+    SPECS_STORAGE_BACKEND: str = "s3"
+    SPECS_STORAGE_ROOT: str = "storage/specs"
+    UPLOADS_STORAGE_BACKEND: str = "local"
+    UPLOADS_STORAGE_ROOT: str = "."
+    # Per-store compression of new spec and specification blobs (evidence is
+    # stored as-is): "none" or "zstd" (needs zstandard)
+    SPECS_STORAGE_COMPRESSION: str = "none"
+    UPLOADS_STORAGE_COMPRESSION: str = "none"
+    STORAGE_COMPRESSION_LEVEL: int = 3
+    # Throughput tuning for every store
+    STORAGE_CHUNK_SIZE: int = 1024 * 1024
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+    S3_UPLOAD_CONCURRENCY: int = 4
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    # Presigned download URLs for spec files. They are cached per worker and reused
+    # until the margin before expiry. "redirect" mode lists a per-spec endpoint
+    # instead, and that endpoint signs on demand.
+    PRESIGNED_URL_EXPIRES_SECONDS: int = 60 * 60 * 3
+    PRESIGNED_URL_REFRESH_MARGIN_SECONDS: int = 15 * 60
+    PRESIGNED_URL_CACHE_MAX_SIZE: int = 50000
+    SPEC_FILE_URL_MODE: str = "presigned"  # presigned or redirect
+    # Presigned direct uploads of spec files: clients upload to a staging key,
+    # then finalize. Files above the single-PUT limit go up as presigned
+    # multipart parts. A bucket lifecycle rule should expire the staging prefix.
+    DIRECT_UPLOAD_PREFIX: str = "incoming"
+    DIRECT_UPLOAD_EXPIRES_SECONDS: int = 60 * 60
+    DIRECT_UPLOAD_SINGLE_PUT_MAX_BYTES: int = 100 * 1024 * 1024
+    DIRECT_UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024 * 1024
+    # Downloads of local files: with nginx in front, set the internal location
+    # that maps to the uploads root and nginx sends files with sendfile itself.
+    # Requests asking for more ranges than this get the whole file.
+    DOWNLOAD_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    DOWNLOAD_MAX_RANGES: int = 16
+    # Spec files streamed through /specs/{id}/download at once, per worker;
+    # requests wait this long for a slot before getting a 503
+    SPEC_DOWNLOAD_MAX_CONCURRENCY: int = 32
+    SPEC_DOWNLOAD_ACQUIRE_TIMEOUT_SECONDS: float = 5.0
+    # Evidence file / checklist item consistency check, run in the background
+    # after startup. The manifest defaults to a dotfile next to the evidence dir.
+    FILE_SYNC_ON_STARTUP: bool = True
+    FILE_SYNC_MANIFEST_PATH: Optional[str] = None
+    FILE_SYNC_CHUNK_SIZE: int = 5000
+    FILE_SYNC_LOG_SAMPLE_SIZE: int = 20
+    # Unreferenced blobs are kept this long before GC deletes them
+    BLOB_GC_GRACE_HOURS: int = 24
+    # /search page size: the default and the largest a client may ask for
+    SEARCH_DEFAULT_LIMIT: int = 20
+    SEARCH_MAX_LIMIT: int = 100
+    # /search/suggest prefix index, held in each worker. It is refreshed from
+    # rows changed since the last pass and rebuilt in full less often, which
+    # is when rows deleted by other workers drop out. A lookup examines at most
+    # SUGGEST_MAX_SCAN index keys per entity type.
+    SUGGEST_ON_STARTUP: bool = True
+    SUGGEST_REFRESH_INTERVAL_SECONDS: float = 30.0
+    SUGGEST_REBUILD_INTERVAL_SECONDS: float = 3600.0
+    SUGGEST_MAX_SCAN: int = 500
+    SUGGEST_LOAD_CHUNK_SIZE: int = 10000
+    # Spec file content index behind /search/specs. Each worker indexes the
+    # files uploaded through it on a background thread. A periodic scan picks
+    # up specs with missing or stale content, such as uploads through another
+    # worker that stopped first; on Postgres only one worker at a time scans.
+    # Larger files are not read; longer text is cut.
+    SPEC_INDEX_ON_STARTUP: bool = True
+    SPEC_INDEX_SCAN_INTERVAL_SECONDS: float = 300.0
+    SPEC_INDEX_BATCH_SIZE: int = 100
+    SPEC_INDEX_MAX_FILE_BYTES: int = 50 * 1024 * 1024
+    SPEC_INDEX_MAX_CHARS: int = 500_000
 
     # Redis
     REDIS_HOST: str
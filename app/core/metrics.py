@@ -0,0 +1,11 @@
+from typing import Any, Callable, Dict
+
+# name -> zero-argument callable returning a JSON-serialisable dict
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Expose a component's in-process stats on the /metrics endpoint."""
+    _providers[name] = provider
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pinning min/max to the configured cost makes verify_and_update() return a new
+# hash whenever a stored hash was made with a different cost, in either direction.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))], 3)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own small thread pool so login and signup bursts cannot
+    occupy the threadpool shared by every other endpoint. At most `workers`
+    hashes run at once and at most `queue_size` more wait; beyond that callers
+    get an immediate 503 instead of queueing indefinitely.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, queue_size: int, samples: int = 1000) -> None:
+        self.context = context
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._wait_ms: Deque[float] = deque(maxlen=samples)
+        self._hash_ms: Deque[float] = deque(maxlen=samples)
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("Password hashing queue full", in_flight=self._in_flight)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self._in_flight += 1
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._wait_ms.append((started - enqueued) * 1000)
+                    self._hash_ms.append((finished - started) * 1000)
+                    self.completed += 1
+
+        def release(_) -> None:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; the second item is a replacement hash if the stored one uses an old cost."""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            wait_ms, hash_ms = list(self._wait_ms), list(self._hash_ms)
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+                "queue_wait_ms_p50": _percentile(wait_ms, 50),
+                "queue_wait_ms_p95": _percentile(wait_ms, 95),
+                "hash_ms_p50": _percentile(hash_ms, 50),
+                "hash_ms_p95": _percentile(hash_ms, 95),
+            }
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE
+)
+metrics.register("password_hashing", password_hasher.stats)
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+
+class PresignedUrlCache:
+    """
+    Process-local cache of presigned GET URLs keyed by (bucket, key,
+    Content-Disposition). The disposition is signed into the URL, so rows that
+    share a blob but download under different names get their own URLs.
+
+    A URL signed for `expires_in` seconds is handed out again until `margin`
+    seconds before it expires, so every URL returned is still valid for at
+    least `margin` seconds. Blob keys are content-addressed and never change
+    content, so reusing a URL for the same key is safe.
+    """
+
+    def __init__(self, max_size: int, expires_in: int, margin: int) -> None:
+        self.max_size = max_size
+        self.expires_in = expires_in
+        self.margin = margin
+        self._entries: "OrderedDict[Tuple[str, str, Optional[str]], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(
+        self,
+        bucket: str,
+        requests: Iterable[Tuple[str, Optional[str]]],
+        sign: Callable[[str, str, Optional[str], int], Optional[str]]
+    ) -> Dict[Tuple[str, Optional[str]], str]:
+        """
+        URLs for (key, content_disposition) pairs; misses are signed in one
+        pass with `sign(bucket, key, content_disposition, expires_in)`.
+        """
+        now = time.monotonic()
+        urls: Dict[Tuple[str, Optional[str]], str] = {}
+        missing: Dict[Tuple[str, Optional[str]], None] = {}
+        with self._lock:
+            for request in requests:
+                entry = self._entries.get((bucket, *request))
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end((bucket, *request))
+                    urls[request] = entry[1]
+                    self.hits += 1
+                elif request not in urls and request not in missing:
+                    missing[request] = None
+                    self.misses += 1
+        # Signing is CPU only (no network), done outside the lock
+        signed = {request: sign(bucket, *request, self.expires_in) for request in missing}
+        reuse_until = now + self.expires_in - self.margin
+        with self._lock:
+            for request, url in signed.items():
+                if url is None:
+                    continue
+                self._entries[(bucket, *request)] = (reuse_until, url)
+                self._entries.move_to_end((bucket, *request))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        urls.update(signed)
+        return urls
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+presigned_url_cache = PresignedUrlCache(
+    max_size=settings.PRESIGNED_URL_CACHE_MAX_SIZE,
+    expires_in=settings.PRESIGNED_URL_EXPIRES_SECONDS,
+    margin=settings.PRESIGNED_URL_REFRESH_MARGIN_SECONDS
+)
+metrics.register("presigned_url_cache", presigned_url_cache.stats)
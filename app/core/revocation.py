@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (revoked_at, jti, expires_at)
+RevocationEntry = Tuple[float, str, float]
+
+
+class InMemoryRevocationStore:
+    """Single-process stand-in for the shared store, used in tests and local runs."""
+
+    def __init__(self) -> None:
+        self._entries: List[RevocationEntry] = []
+        self._used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries.append((time.time(), jti, expires_at))
+
+    def consume(self, jti: str, expires_at: float) -> bool:
+        with self._lock:
+            if jti in self._used:
+                return False
+            self._used[jti] = expires_at
+            return True
+
+    def since(self, cursor: float) -> List[RevocationEntry]:
+        with self._lock:
+            return [entry for entry in self._entries if entry[0] >= cursor]
+
+    def prune(self, before: float) -> None:
+        with self._lock:
+            self._entries = [entry for entry in self._entries if entry[2] >= before]
+            self._used = {jti: expires_at for jti, expires_at in self._used.items() if expires_at >= before}
+
+
+class RedisRevocationStore:
+    """
+    Revoked token ids in a Redis sorted set scored by revocation time, so each
+    worker can fetch only what was revoked since its last sync.
+    """
+
+    KEY = "auth:revoked_tokens"
+    USED_KEY_PREFIX = "auth:used:"
+
+    def __init__(self, client) -> None:
+        self._client = client
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self._client.zadd(self.KEY, {f"{jti}:{int(expires_at)}": time.time()})
+
+    def consume(self, jti: str, expires_at: float) -> bool:
+        # SET NX is atomic across workers; the key expires with the token
+        return bool(self._client.set(f"{self.USED_KEY_PREFIX}{jti}", 1, nx=True, exat=int(expires_at) + 1))
+
+    def since(self, cursor: float) -> List[RevocationEntry]:
+        entries = []
+        for member, score in self._client.zrangebyscore(self.KEY, cursor, "+inf", withscores=True):
+            jti, _, expires_at = member.decode().rpartition(":")
+            entries.append((score, jti, float(expires_at)))
+        return entries
+
+    def prune(self, before: float) -> None:
+        # Anything revoked longer ago than the longest token lifetime has expired anyway
+        self._client.zremrangebyscore(self.KEY, "-inf", before - settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
+class RevocationFilter:
+    """
+    Local copy of revoked token ids. Checks are a dict lookup with no I/O; new
+    revocations from other workers arrive through sync(), run in the background.
+    """
+
+    # Re-read a little history on each sync to tolerate clock skew between writers
+    SYNC_OVERLAP_SECONDS = 5.0
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self._revoked: Dict[str, float] = {}
+        self._cursor = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_sync: Optional[float] = None
+        self.sync_errors = 0
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+        self.store.add(jti, expires_at)
+
+    def consume(self, jti: str, expires_at: float) -> bool:
+        """
+        Mark a single-use token as used in the shared store. True for the first
+        caller only, on any worker; the local copy is not consulted, since it
+        lags the store by up to one sync interval.
+        """
+        return self.store.consume(jti, expires_at)
+
+    def sync(self) -> None:
+        started = time.time()
+        entries = self.store.since(self._cursor)
+        with self._lock:
+            for _, jti, expires_at in entries:
+                self._revoked[jti] = expires_at
+            # Expired tokens fail signature checks anyway; stop tracking them
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at < started]:
+                del self._revoked[jti]
+        self.store.prune(started)
+        self._cursor = started - self.SYNC_OVERLAP_SECONDS
+        self.last_sync = started
+
+    def start(self, interval: float) -> None:
+        """Sync once now, then every `interval` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._run_sync()
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self._run_sync()
+
+        self._thread = threading.Thread(target=loop, name="token-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run_sync(self) -> None:
+        try:
+            self.sync()
+        except Exception as e:
+            self.sync_errors += 1
+            logger.error("Token revocation sync failed", error=str(e))
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._revoked),
+            "last_sync": self.last_sync,
+            "sync_errors": self.sync_errors,
+        }
+
+
+def _build_store():
+    if settings.REVOCATION_STORE == "memory":
+        return InMemoryRevocationStore()
+    import redis
+    return RedisRevocationStore(redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT))
+
+
+revocation_filter = RevocationFilter(_build_store())
+metrics.register("token_revocation", revocation_filter.stats)
@@ -0,0 +1,342 @@
+"""
+In-process prefix index for type-ahead suggestions (/search/suggest).
+
+Every entity type has a sorted array of (key, word, id) tuples, searched with
+bisect. Labels are indexed from the start of each word, so "smi" finds both
+"John Smith" and "john.smith@example.com". Lookups never touch the database.
+
+The index is built on a background thread after startup. Commits made in this
+process reach it through ORM hooks once the transaction commits. Writes from
+other workers, and bulk SQL, arrive with the periodic delta refresh. It
+re-reads rows created or updated since the previous refresh, going back
+REFRESH_OVERLAP further to catch transactions that committed late. Rows
+deleted by other workers disappear at the next full rebuild.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.models import Company, Project, Spec, User
+from app.db.session import SessionLocal
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    type: str
+    id: int
+    label: str
+    detail: Optional[str] = None
+    role: Optional[str] = None
+    is_active: bool = True
+
+
+# (lowercased text from the start of a word, word position, id)
+IndexKey = Tuple[str, int, int]
+
+_WORD = re.compile(r"\w+")
+
+# Sorts after any character a key can continue with
+_MAX_CHAR = chr(0x10FFFF)
+
+# Words of a label indexed as starting points; later words only match the full text
+MAX_WORDS = 8
+
+
+def _user(row) -> Suggestion:
+    return Suggestion(
+        "user", row.id, row.full_name or row.email or "", detail=row.email, role=row.role,
+        is_active=row.is_active is not False
+    )
+
+
+def _named(entity_type: str) -> Callable[..., Suggestion]:
+    return lambda row: Suggestion(entity_type, row.id, row.name or "")
+
+
+def _spec(row) -> Suggestion:
+    return Suggestion("spec", row.id, row.name or "", detail=row.version)
+
+
+# type -> (model, columns loaded, row or ORM object -> Suggestion)
+SOURCES = {
+    "user": (User, (User.id, User.email, User.full_name, User.role, User.is_active), _user),
+    "company": (Company, (Company.id, Company.name), _named("company")),
+    "project": (Project, (Project.id, Project.name), _named("project")),
+    "spec": (Spec, (Spec.id, Spec.name, Spec.version), _spec),
+}
+
+_TYPE_BY_MODEL = {model: entity_type for entity_type, (model, _, _) in SOURCES.items()}
+
+
+def index_keys(suggestion: Suggestion) -> Set[IndexKey]:
+    texts = [suggestion.label]
+    if suggestion.type == "user" and suggestion.detail:
+        texts.append(suggestion.detail)
+    keys = set()
+    for text in texts:
+        lowered = text.lower()
+        for word, match in enumerate(_WORD.finditer(lowered)):
+            if word >= MAX_WORDS:
+                break
+            keys.add((lowered[match.start():], word, suggestion.id))
+    return keys
+
+
+class PrefixIndex:
+    """Suggestions of one entity type, searchable by prefix. Not thread-safe; SuggestIndex locks."""
+
+    def __init__(self, suggestions: Iterable[Suggestion] = ()) -> None:
+        self._entries: Dict[int, Suggestion] = {s.id: s for s in suggestions}
+        keys = set()
+        for suggestion in self._entries.values():
+            keys |= index_keys(suggestion)
+        self._keys: List[IndexKey] = sorted(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, suggestion: Suggestion) -> None:
+        self.remove(suggestion.id)
+        self._entries[suggestion.id] = suggestion
+        for key in index_keys(suggestion):
+            insort(self._keys, key)
+
+    def remove(self, id: int) -> None:
+        suggestion = self._entries.pop(id, None)
+        if suggestion is None:
+            return
+        for key in index_keys(suggestion):
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+
+    def search(
+        self,
+        prefix: str,
+        max_scan: int,
+        accept: Optional[Callable[[Suggestion], bool]] = None
+    ) -> Dict[int, Tuple[int, Suggestion]]:
+        """
+        Suggestions with a word starting with `prefix`, mapped from id to
+        (lowest matching word position, suggestion). At most `max_scan` keys
+        are examined.
+        """
+        found: Dict[int, Tuple[int, Suggestion]] = {}
+        keys = self._keys
+        start = bisect_left(keys, (prefix,))
+        end = min(bisect_left(keys, (prefix + _MAX_CHAR,), start), start + max_scan)
+        for key, word, id in keys[start:end]:
+            if id in found:
+                if word < found[id][0]:
+                    found[id] = (word, found[id][1])
+                continue
+            suggestion = self._entries[id]
+            if accept is None or accept(suggestion):
+                found[id] = (word, suggestion)
+        return found
+
+
+class SuggestIndex:
+    """Prefix indexes of every entity type in SOURCES, with their refresh loop."""
+
+    REFRESH_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, PrefixIndex] = {entity_type: PrefixIndex() for entity_type in SOURCES}
+        self._lock = threading.Lock()
+        self._since = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.ready = False
+        self.last_rebuild: Optional[float] = None
+        self.last_refresh: Optional[float] = None
+        self.rebuild_seconds: Optional[float] = None
+        self.refresh_errors = 0
+        self.lookups = 0
+
+    def suggest(
+        self,
+        q: str,
+        types: Optional[Sequence[str]] = None,
+        limit: int = 10,
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> List[Suggestion]:
+        """
+        Up to `limit` suggestions whose label (or user email) has a word
+        starting with `q`. Matches at the start of the label come first, then
+        shorter labels. `role` and `is_active` only filter users.
+        """
+        prefix = q.strip().lower()
+        if not prefix:
+            return []
+
+        def accept(suggestion: Suggestion) -> bool:
+            if suggestion.type != "user":
+                return True
+            return (role is None or suggestion.role == role) and (
+                is_active is None or suggestion.is_active == is_active
+            )
+
+        found: List[Tuple[int, Suggestion]] = []
+        with self._lock:
+            self.lookups += 1
+            for entity_type in types or SOURCES:
+                index = self._indexes.get(entity_type)
+                if index is not None:
+                    found.extend(index.search(prefix, settings.SUGGEST_MAX_SCAN, accept).values())
+        found.sort(key=lambda item: (item[0] > 0, len(item[1].label), item[1].label.lower(), item[1].type))
+        return [suggestion for _, suggestion in found[:limit]]
+
+    def apply(self, puts: Iterable[Suggestion] = (), removes: Iterable[Tuple[str, int]] = ()) -> None:
+        with self._lock:
+            for entity_type, id in removes:
+                self._indexes[entity_type].remove(id)
+            for suggestion in puts:
+                self._indexes[suggestion.type].put(suggestion)
+
+    def _track(self, *timestamps) -> None:
+        for timestamp in timestamps:
+            if timestamp is not None and (self._since is None or timestamp > self._since):
+                self._since = timestamp
+
+    def rebuild(self, db: Session) -> None:
+        """Load every row again, in keyset chunks, and swap the new indexes in."""
+        started = time.perf_counter()
+        chunk_size = settings.SUGGEST_LOAD_CHUNK_SIZE
+        indexes = {}
+        for entity_type, (model, columns, build) in SOURCES.items():
+            suggestions = []
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(*columns, model.created_at, model.updated_at)
+                    .where(model.id > last_id)
+                    .order_by(model.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                for row in rows:
+                    suggestions.append(build(row))
+                    self._track(row.created_at, row.updated_at)
+                last_id = rows[-1].id
+            indexes[entity_type] = PrefixIndex(suggestions)
+        with self._lock:
+            self._indexes = indexes
+        self.ready = True
+        self.last_rebuild = self.last_refresh = time.time()
+        self.rebuild_seconds = round(time.perf_counter() - started, 3)
+        logger.info("Suggest index rebuilt", seconds=self.rebuild_seconds, **self.sizes())
+
+    def refresh(self, db: Session) -> None:
+        """Apply rows created or updated since the last refresh."""
+        if not self.ready or self._since is None:
+            # Nothing loaded yet, or nothing had a timestamp to resume from
+            self.rebuild(db)
+            return
+        since = self._since - self.REFRESH_OVERLAP
+        puts = []
+        for model, columns, build in SOURCES.values():
+            rows = db.execute(
+                select(*columns, model.created_at, model.updated_at)
+                .where(or_(model.created_at >= since, model.updated_at >= since))
+            ).all()
+            for row in rows:
+                puts.append(build(row))
+                self._track(row.created_at, row.updated_at)
+        self.apply(puts)
+        self.last_refresh = time.time()
+
+    def start(self, interval: float, rebuild_interval: float) -> None:
+        """Build the index on a daemon thread, then refresh it every `interval` seconds."""
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            self._run(self.rebuild)
+            rebuilt_at = time.monotonic()
+            while not self._stop.wait(interval):
+                if time.monotonic() - rebuilt_at >= rebuild_interval:
+                    self._run(self.rebuild)
+                    rebuilt_at = time.monotonic()
+                else:
+                    self._run(self.refresh)
+
+        self._thread = threading.Thread(target=loop, name="suggest-index-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, step: Callable[[Session], None]) -> None:
+        db = SessionLocal()
+        try:
+            step(db)
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.error("Suggest index refresh failed", step=step.__name__, error=str(e))
+        finally:
+            db.close()
+
+    def sizes(self) -> Dict[str, int]:
+        return {entity_type: len(index) for entity_type, index in self._indexes.items()}
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "entries": self.sizes(),
+            "lookups": self.lookups,
+            "last_rebuild": self.last_rebuild,
+            "last_refresh": self.last_refresh,
+            "rebuild_seconds": self.rebuild_seconds,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+suggest_index = SuggestIndex()
+metrics.register("suggest_index", suggest_index.stats)
+
+
+# ORM writes in this process reach the index when their transaction commits
+def _queue_put(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is None:
+        return
+    entity_type = _TYPE_BY_MODEL[mapper.class_]
+    session.info.setdefault("suggest_puts", []).append(SOURCES[entity_type][2](target))
+
+def _queue_remove(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is None:
+        return
+    session.info.setdefault("suggest_removes", []).append((_TYPE_BY_MODEL[mapper.class_], target.id))
+
+for _model in _TYPE_BY_MODEL:
+    event.listen(_model, "after_insert", _queue_put)
+    event.listen(_model, "after_update", _queue_put)
+    event.listen(_model, "after_delete", _queue_remove)
+
+@event.listens_for(Session, "after_commit")
+def _apply_suggest_changes(session: Session) -> None:
+    puts = session.info.pop("suggest_puts", ())
+    removes = session.info.pop("suggest_removes", ())
+    if puts or removes:
+        suggest_index.apply(puts, removes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_suggest_changes(session: Session) -> None:
+    session.info.pop("suggest_puts", None)
+    session.info.pop("suggest_removes", None)
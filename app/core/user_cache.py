@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.models import ApiKey, User
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Immutable snapshot of the user columns handlers read from current_user."""
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: Optional[str]
+    is_active: bool
+    is_superuser: bool
+    # Epoch seconds of the last password reset; tokens issued earlier are rejected
+    tokens_valid_after: Optional[float] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        valid_after = user.tokens_valid_after
+        if valid_after is not None and valid_after.tzinfo is None:
+            valid_after = valid_after.replace(tzinfo=timezone.utc)
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            tokens_valid_after=valid_after.timestamp() if valid_after is not None else None,
+        )
+
+
+class UserCache:
+    """Process-local, size-bounded TTL cache of authenticated users keyed by token subject or API key hash."""
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str) -> Optional[AuthenticatedUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, subject: str, user: AuthenticatedUser, ttl_seconds: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def invalidate_user(self, email: str) -> None:
+        """Drop every entry for this user, whatever it is keyed by."""
+        with self._lock:
+            for subject in [s for s, (_, user) in self._entries.items() if user.email == email]:
+                del self._entries[subject]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+metrics.register("user_cache", user_cache.stats)
+
+api_key_cache = UserCache(
+    max_size=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS
+)
+metrics.register("api_key_cache", api_key_cache.stats)
+
+
+# Any ORM update or delete of a user (password reset, role change, deactivation)
+# drops the cached entry once the transaction commits.
+def _mark_stale(mapper, connection, target: User) -> None:
+    session = Session.object_session(target)
+    if session is None:
+        return
+    stale = session.info.setdefault("stale_user_subjects", set())
+    stale.add(target.email)
+    stale.update(e for e in inspect(target).attrs.email.history.deleted if e)
+
+def _mark_stale_api_key(mapper, connection, target: ApiKey) -> None:
+    session = Session.object_session(target)
+    if session is None:
+        return
+    stale = session.info.setdefault("stale_api_key_hashes", set())
+    stale.add(target.key_hash)
+    stale.update(h for h in inspect(target).attrs.key_hash.history.deleted if h)
+
+event.listen(User, "after_update", _mark_stale)
+event.listen(User, "after_delete", _mark_stale)
+event.listen(ApiKey, "after_update", _mark_stale_api_key)
+event.listen(ApiKey, "after_delete", _mark_stale_api_key)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_users(session: Session) -> None:
+    for subject in session.info.pop("stale_user_subjects", ()):
+        user_cache.invalidate(subject)
+        api_key_cache.invalidate_user(subject)
+    for key_hash in session.info.pop("stale_api_key_hashes", ()):
+        api_key_cache.invalidate(key_hash)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_users(session: Session) -> None:
+    session.info.pop("stale_user_subjects", None)
+    session.info.pop("stale_api_key_hashes", None)
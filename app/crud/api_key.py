@@ -0,0 +1,82 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.models import ApiKey, User
+from app.schemas.api_key import ApiKeyCreate
+
+# Keys look like tok_<prefix>_<secret>; the prefix is stored in clear for lookup
+KEY_SCHEME = "tok_"
+
+def _new_key() -> Tuple[str, str]:
+    prefix = secrets.token_hex(6)
+    return prefix, f"{KEY_SCHEME}{prefix}_{secrets.token_urlsafe(32)}"
+
+def parse_key(key: str) -> Optional[str]:
+    """Return the lookup prefix of a well-formed key, else None."""
+    if not key.startswith(KEY_SCHEME):
+        return None
+    prefix, sep, secret = key[len(KEY_SCHEME):].partition("_")
+    if not sep or not prefix or not secret:
+        return None
+    return prefix
+
+def hash_key(key: str) -> str:
+    # Keys are high-entropy random strings, so a keyed fast hash is enough; no bcrypt
+    secret = (settings.API_KEY_HMAC_SECRET or settings.SECRET_KEY).encode()
+    return hmac.new(secret, key.encode(), hashlib.sha256).hexdigest()
+
+def get_api_keys(db: Session, user_id: int) -> List[ApiKey]:
+    return db.query(ApiKey).filter(ApiKey.user_id == user_id).order_by(ApiKey.created_at.desc()).all()
+
+def get_api_key_with_user(db: Session, prefix: str) -> Optional[Tuple[ApiKey, User]]:
+    stmt = lambda_stmt(
+        lambda: select(ApiKey, User).join(User, ApiKey.user_id == User.id).where(ApiKey.prefix == prefix).limit(1)
+    )
+    return db.execute(stmt).first()
+
+def _get_owned_api_key(db: Session, key_id: int, user_id: int) -> ApiKey:
+    api_key = db.query(ApiKey).filter(ApiKey.id == key_id, ApiKey.user_id == user_id).first()
+    if not api_key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="API key not found")
+    return api_key
+
+def create_api_key(db: Session, api_key_in: ApiKeyCreate, user_id: int) -> Tuple[ApiKey, str]:
+    """Create a key for `user_id`; returns the row and the full key, which is not stored."""
+    prefix, key = _new_key()
+    expires_at = None
+    if api_key_in.expires_in_days:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=api_key_in.expires_in_days)
+    db_api_key = ApiKey(
+        user_id=user_id,
+        name=api_key_in.name,
+        prefix=prefix,
+        key_hash=hash_key(key),
+        expires_at=expires_at
+    )
+    db.add(db_api_key)
+    db.commit()
+    db.refresh(db_api_key)
+    return db_api_key, key
+
+def regenerate_api_key(db: Session, key_id: int, user_id: int) -> Tuple[ApiKey, str]:
+    """Replace the key's secret (and prefix); the old key stops working immediately."""
+    db_api_key = _get_owned_api_key(db, key_id, user_id)
+    prefix, key = _new_key()
+    db_api_key.prefix = prefix
+    db_api_key.key_hash = hash_key(key)
+    db.commit()
+    db.refresh(db_api_key)
+    return db_api_key, key
+
+def delete_api_key(db: Session, key_id: int, user_id: int) -> None:
+    db_api_key = _get_owned_api_key(db, key_id, user_id)
+    db.delete(db_api_key)
+    db.commit()
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
-from app.db.models import Checklist
+from sqlalchemy import insert, select, literal
+from app.db.models import Checklist, ActiveChecklist, ActiveChecklistItem, ChecklistItem
 from app.schemas.checklist import ChecklistCreate
+from app.schemas.checklist_template import ActiveChecklistCreate, ActiveChecklistBulkCreate
 from typing import List
 
 def create_checklist(db: Session, checklist_in: ChecklistCreate) -> Checklist:
@@ -11,4 +13,62 @@ def create_checklist(db: Session, checklist_in: ChecklistCreate) -> Checklist:
     return db_checklist
 
 def get_checklists(db: Session) -> List[Checklist]:
-    return db.query(Checklist).all() 
\ No newline at end of file
+    return db.query(Checklist).all()
+
+def _copy_template_items(checklist_ids: List[int]):
+    """
+    Build a single INSERT ... SELECT that copies every item of each checklist's
+    template into that checklist, without loading the items into Python.
+    """
+    source = select(
+        ActiveChecklist.id,
+        ChecklistItem.id,
+        literal("pending")
+    ).join(
+        ChecklistItem, ChecklistItem.template_id == ActiveChecklist.template_id
+    ).where(
+        ActiveChecklist.id.in_(checklist_ids)
+    )
+    return insert(ActiveChecklistItem).from_select(
+        ["checklist_id", "template_item_id", "status"],
+        source
+    )
+
+def instantiate_active_checklist(
+    db: Session,
+    checklist_in: ActiveChecklistCreate
+) -> ActiveChecklist:
+    """Create an active checklist and its items from a template in one transaction."""
+    return instantiate_active_checklists(db, [checklist_in.dict()])[0]
+
+def instantiate_active_checklists_for_specs(
+    db: Session,
+    bulk_in: ActiveChecklistBulkCreate
+) -> List[ActiveChecklist]:
+    """Instantiate one template for many specs at once."""
+    base = bulk_in.dict(exclude={"linked_spec_ids"})
+    return instantiate_active_checklists(
+        db,
+        [{**base, "linked_spec_id": spec_id} for spec_id in bulk_in.linked_spec_ids]
+    )
+
+def instantiate_active_checklists(
+    db: Session,
+    checklists_in: List[dict]
+) -> List[ActiveChecklist]:
+    db_checklists = [ActiveChecklist(**values) for values in checklists_in]
+    try:
+        db.add_all(db_checklists)
+        # Flush assigns ids without committing so the item copy joins the same transaction
+        db.flush()
+        ids = [c.id for c in db_checklists]
+        db.execute(_copy_template_items(ids))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # One SELECT reloads every expired checklist instead of a refresh per row
+    return db.query(ActiveChecklist)\
+        .filter(ActiveChecklist.id.in_(ids))\
+        .order_by(ActiveChecklist.id)\
+        .all()
@@ -1,13 +1,78 @@
+import math
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from sqlalchemy import or_
+from sqlalchemy import Integer, column, func, or_, lambda_stmt, select, table, text, union
 
-from app.db.models import Company, Project
+from app.db.models import Company, Project, User
 from app.schemas.company import CompanyCreate, CompanyUpdate
+from app.services.search import TRIGRAM_MIN_LENGTH, ensure_sqlite_index, like_pattern, trigram_phrase
 
 def get_company(db: Session, company_id: int) -> Optional[Company]:
-    return db.query(Company).filter(Company.id == company_id).first()
+    stmt = lambda_stmt(lambda: select(Company).where(Company.id == company_id).limit(1))
+    return db.execute(stmt).scalars().first()
+
+def _search_filter(db: Session, search: str, filters: list, bound: int):
+    """
+    Filter for companies whose name, description or owner email contains
+    `search`, case-insensitively. Each column is looked up through its own
+    trigram index and the matching ids are unioned, instead of OR-ing across
+    an outer join. Each branch applies `filters` itself and keeps only its
+    first `bound` ids in id order, so a term matching most rows stops early
+    instead of materializing every match; the caller pages in id order.
+    An owner branch whose term matches many users scans companies instead.
+    """
+    dialect = db.get_bind().dialect.name
+    pattern = like_pattern(search)
+    owners = select(User.id).where(User.email.ilike(pattern, escape="\\"))
+    name_or_description = or_(
+        Company.name.ilike(pattern, escape="\\"),
+        Company.description.ilike(pattern, escape="\\")
+    )
+    owner_matches = owners.where(User.id == Company.owner_id).exists()
+    if len(search) < TRIGRAM_MIN_LENGTH or dialect not in ("postgresql", "sqlite"):
+        # No trigram to look up: one scan that can stop at the page limit,
+        # checking each owner by primary key
+        return or_(name_or_description, owner_matches)
+    if dialect == "sqlite":
+        ensure_sqlite_index(db)
+        phrase = trigram_phrase(search)
+        companies_trgm = table("companies_trgm", column("rowid", Integer))
+        users_trgm = table("users_trgm", column("rowid", Integer))
+        # Looking up the owners costs about one step per matching user, while
+        # scanning companies in id order for `bound` hits takes about
+        # bound * users / matches steps. Unlike Postgres, SQLite does not
+        # weigh the two, so count the matches up to where they break even.
+        users = db.execute(select(func.max(User.id))).scalar() or 0
+        cutoff = math.isqrt(bound * users) + 1
+        common_owner = db.execute(text(
+            "SELECT count(*) FROM (SELECT rowid FROM users_trgm WHERE users_trgm MATCH :phrase LIMIT :cutoff)"
+        ), {"phrase": phrase, "cutoff": cutoff}).scalar() >= cutoff
+        # FTS5 yields matches in rowid order, so ordering by its rowid lets
+        # the branch stop at the bound
+        branches = [
+            select(Company.id)
+            .join(companies_trgm, companies_trgm.c.rowid == Company.id)
+            .where(text("companies_trgm MATCH :phrase").bindparams(phrase=phrase), *filters)
+            .order_by(companies_trgm.c.rowid),
+            select(Company.id).where(
+                owner_matches if common_owner else Company.owner_id.in_(
+                    select(users_trgm.c.rowid)
+                    .where(text("users_trgm MATCH :owner_phrase").bindparams(owner_phrase=phrase))
+                ),
+                *filters
+            ).order_by(Company.id),
+        ]
+    else:
+        # pg_trgm GIN indexes serve each branch (migration 8b1d5f3e2a97); with
+        # the bound the planner can instead walk the primary key and stop
+        # early when the term is common
+        branches = [
+            select(Company.id).where(name_or_description, *filters).order_by(Company.id),
+            select(Company.id).where(Company.owner_id.in_(owners), *filters).order_by(Company.id),
+        ]
+    bounded = [branch.limit(bound).subquery() for branch in branches]
+    return Company.id.in_(union(*(select(sub.c.id) for sub in bounded)))
 
 def get_companies(
     db: Session, 
@@ -18,21 +83,16 @@ def get_companies(
     status: Optional[str] = None
 ) -> List[Company]:
     query = db.query(Company)
+    filters = []
     if owner_id:
-        query = query.filter(Company.owner_id == owner_id)
-    if search:
-        from app.db.models import User
-        query = query.join(User, Company.owner_id == User.id, isouter=True)
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Company.name.ilike(search_pattern),
-                Company.description.ilike(search_pattern),
-                User.email.ilike(search_pattern)
-            )
-        )
+        filters.append(Company.owner_id == owner_id)
     if status:
-        query = query.filter(Company.status == status)
+        filters.append(Company.status == status)
+    if filters:
+        query = query.filter(*filters)
+    if search:
+        # Paged in id order, which the per-branch bound in _search_filter relies on
+        query = query.filter(_search_filter(db, search, filters, skip + limit)).order_by(Company.id)
     return query.offset(skip).limit(limit).all()
 
 def create_company(db: Session, company: CompanyCreate, owner_id: int) -> Company:
@@ -1,8 +1,8 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
 
-from app.db.models import LintResult, Spec, Project, Company
+from app.db.models import LintResult
+from app.crud.permissions import authorize_spec, authorize_lint_result, forget
 from app.schemas.lint_result import LintResultCreate
 
 def get_lint_result(db: Session, lint_result_id: int) -> Optional[LintResult]:
@@ -26,22 +26,8 @@ def create_lint_result(
     lint_result_in: LintResultCreate,
     company_owner_id: int
 ) -> LintResult:
-    # Verify spec exists and user has access
-    spec = db.query(Spec).filter(Spec.id == lint_result_in.spec_id).first()
-    if not spec:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Spec not found"
-        )
-    
-    # Verify user owns the company
-    project = db.query(Project).filter(Project.id == spec.project_id).first()
-    company = db.query(Company).filter(Company.id == project.company_id).first()
-    if company.owner_id != company_owner_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # Verify spec exists and user owns its company (one joined query)
+    authorize_spec(db, lint_result_in.spec_id, company_owner_id)
     
     db_lint_result = LintResult(**lint_result_in.dict())
     db.add(db_lint_result)
@@ -54,23 +40,10 @@ def delete_lint_result(
     lint_result_id: int,
     company_owner_id: int
 ) -> bool:
-    db_lint_result = get_lint_result(db, lint_result_id)
-    if not db_lint_result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Lint result not found"
-        )
-    
-    # Verify user owns the company
-    spec = db.query(Spec).filter(Spec.id == db_lint_result.spec_id).first()
-    project = db.query(Project).filter(Project.id == spec.project_id).first()
-    company = db.query(Company).filter(Company.id == project.company_id).first()
-    if company.owner_id != company_owner_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # Lint result lookup and company ownership check in one joined query
+    db_lint_result = authorize_lint_result(db, lint_result_id, company_owner_id)
     
     db.delete(db_lint_result)
     db.commit()
+    forget(db, "lint_result", lint_result_id)
     return True 
\ No newline at end of file
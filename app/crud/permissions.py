@@ -0,0 +1,74 @@
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.db.models import LintResult, Spec, Project, Company
+
+# Resolved (entity, id) -> owning company's owner_id, kept on the session so it
+# lives exactly as long as the request.
+_MEMO_KEY = "company_owner_memo"
+
+def _memo(db: Session) -> Dict[Tuple[str, int], Optional[int]]:
+    return db.info.setdefault(_MEMO_KEY, {})
+
+def _check_owner(owner_id: Optional[int], user_id: int) -> None:
+    if owner_id is None or owner_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+def authorize_spec(db: Session, spec_id: int, company_owner_id: int) -> Spec:
+    """
+    Load a spec and verify the user owns its company with a single joined query.
+    Raises 404 if the spec does not exist and 403 if the user does not own it.
+    """
+    key = ("spec", spec_id)
+    memo = _memo(db)
+    if key in memo:
+        spec = db.get(Spec, spec_id)
+    else:
+        row = db.query(Spec, Company.owner_id)\
+            .outerjoin(Project, Project.id == Spec.project_id)\
+            .outerjoin(Company, Company.id == Project.company_id)\
+            .filter(Spec.id == spec_id)\
+            .first()
+        spec = row[0] if row else None
+        if spec is not None:
+            memo[key] = row[1]
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Spec not found"
+        )
+    _check_owner(memo[key], company_owner_id)
+    return spec
+
+def authorize_lint_result(db: Session, lint_result_id: int, company_owner_id: int) -> LintResult:
+    """Load a lint result and verify ownership of its spec's company in one query."""
+    key = ("lint_result", lint_result_id)
+    memo = _memo(db)
+    if key in memo:
+        lint_result = db.get(LintResult, lint_result_id)
+    else:
+        row = db.query(LintResult, Company.owner_id)\
+            .outerjoin(Spec, Spec.id == LintResult.spec_id)\
+            .outerjoin(Project, Project.id == Spec.project_id)\
+            .outerjoin(Company, Company.id == Project.company_id)\
+            .filter(LintResult.id == lint_result_id)\
+            .first()
+        lint_result = row[0] if row else None
+        if lint_result is not None:
+            memo[key] = row[1]
+            memo[("spec", lint_result.spec_id)] = row[1]
+    if lint_result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lint result not found"
+        )
+    _check_owner(memo[key], company_owner_id)
+    return lint_result
+
+def forget(db: Session, entity: str, entity_id: int) -> None:
+    """Drop a memoized answer, e.g. after the entity is deleted or moved."""
+    _memo(db).pop((entity, entity_id), None)
@@ -1,4 +1,5 @@
 from typing import List, Optional
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
@@ -6,7 +7,8 @@ from app.db.models import Project, Company
 from app.schemas.project import ProjectCreate, ProjectUpdate
 
 def get_project(db: Session, project_id: int) -> Optional[Project]:
-    return db.query(Project).filter(Project.id == project_id).first()
+    stmt = lambda_stmt(lambda: select(Project).where(Project.id == project_id).limit(1))
+    return db.execute(stmt).scalars().first()
 
 def get_projects(
     db: Session,
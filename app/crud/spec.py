@@ -1,24 +1,28 @@
-from typing import List, Optional
+import os
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, UploadFile
-import boto3
-from botocore.exceptions import ClientError
-import os
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 
 from app.core.config import settings
-from app.db.models import Spec, Project, Company
-from app.schemas.spec import SpecCreate, SpecUpdate
+from app.core.logging import get_logger
+from app.core.presigned_urls import presigned_url_cache
+from app.db.models import Spec, SpecContent, Project
+from app.crud.permissions import authorize_spec, forget
+from app.schemas.spec import SpecCreate, SpecUpdate, SpecUploadFinalize, SpecUploadRequest
+from app.services import blobs, direct_uploads
+from app.services.downloads import content_disposition
+from app.services.spec_index import spec_indexer
+from app.services.storage import SPECS, StorageError, get_storage
+from app.services.uploads import UploadResult
 
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION
-)
+logger = get_logger(__name__)
 
 def get_spec(db: Session, spec_id: int) -> Optional[Spec]:
-    return db.query(Spec).filter(Spec.id == spec_id).first()
+    stmt = lambda_stmt(lambda: select(Spec).where(Spec.id == spec_id).limit(1))
+    return db.execute(stmt).scalars().first()
 
 def get_specs(
     db: Session,
@@ -32,6 +36,39 @@ def get_specs(
         .limit(limit)\
         .all()
 
+def _get_project_or_404(db: Session, project_id: int) -> Project:
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return project
+
+def _add_spec(
+    db: Session,
+    spec_in: SpecCreate,
+    upload: UploadResult,
+    author_id: int,
+    file_name: Optional[str]
+) -> Spec:
+    db_spec = Spec(
+        **{k: v for k, v in spec_in.dict().items() if k != 'spec_metadata'},
+        spec_metadata=spec_in.spec_metadata,
+        file_path=upload.key,
+        file_name=file_name,
+        checksum_sha256=upload.checksum_sha256,
+        size_bytes=upload.size_bytes,
+        content_encoding=upload.content_encoding,
+        author_id=author_id
+    )
+    db.add(db_spec)
+    db.commit()
+    db.refresh(db_spec)
+    # Extract the file's text for /search/specs in the background
+    spec_indexer.enqueue(db_spec.id)
+    return db_spec
+
 async def create_spec(
     db: Session,
     spec_in: SpecCreate,
@@ -39,65 +76,59 @@ async def create_spec(
     author_id: int
 ) -> Spec:
     # Verify project exists and user has access
-    project = db.query(Project).filter(Project.id == spec_in.project_id).first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    # Generate S3 key
-    file_extension = os.path.splitext(file.filename)[1]
-    s3_key = f"specs/{project.id}/{spec_in.version}/{file.filename}"
+    _get_project_or_404(db, spec_in.project_id)
     
     try:
-        # Upload to S3
-        file_content = await file.read()
-        s3_client.put_object(
-            Bucket=settings.S3_BUCKET,
-            Key=s3_key,
-            Body=file_content
-        )
-        
-        # Create spec record
-        db_spec = Spec(
-            **{k: v for k, v in spec_in.dict().items() if k != 'metadata'},
-            spec_metadata=spec_in.spec_metadata,
-            file_path=s3_key,
-            author_id=author_id
-        )
-        db.add(db_spec)
-        db.commit()
-        db.refresh(db_spec)
-        return db_spec
+        # Content-addressed: identical files share one stored object, streamed in parts
+        upload = await blobs.store_upload(db, SPECS, "blobs", file, fanout=True, compress=True)
+        return _add_spec(db, spec_in, upload, author_id, file.filename)
         
-    except ClientError as e:
+    except StorageError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
 
+async def begin_direct_upload(
+    db: Session,
+    project_id: int,
+    upload_in: SpecUploadRequest,
+    author_id: int
+) -> dict:
+    _get_project_or_404(db, project_id)
+    return await direct_uploads.begin_upload(
+        project_id, author_id, upload_in.size_bytes, upload_in.checksum_sha256
+    )
+
+async def finalize_direct_upload(
+    db: Session,
+    project_id: int,
+    finalize_in: SpecUploadFinalize,
+    author_id: int
+) -> Spec:
+    claims = direct_uploads.decode_upload_token(finalize_in.upload_token, project_id, author_id)
+    _get_project_or_404(db, project_id)
+    spec_in = SpecCreate(project_id=project_id, **finalize_in.dict(exclude={"upload_token", "file_name"}))
+    try:
+        upload = await direct_uploads.finalize_upload(db, claims)
+        db_spec = _add_spec(db, spec_in, upload, author_id, finalize_in.file_name)
+    except StorageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to store file: {str(e)}"
+        )
+    # Only after the commit: the blob row is no longer locked while this awaits
+    await direct_uploads.discard_staged(claims)
+    return db_spec
+
 def update_spec(
     db: Session,
     spec_id: int,
     spec_in: SpecUpdate,
     company_owner_id: int
 ) -> Optional[Spec]:
-    db_spec = get_spec(db, spec_id)
-    if not db_spec:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Spec not found"
-        )
-    
-    # Verify user owns the company
-    project = db.query(Project).filter(Project.id == db_spec.project_id).first()
-    company = db.query(Company).filter(Company.id == project.company_id).first()
-    if company.owner_id != company_owner_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # Spec lookup and company ownership check in one joined query
+    db_spec = authorize_spec(db, spec_id, company_owner_id)
     
     for field, value in spec_in.dict(exclude_unset=True).items():
         setattr(db_spec, field, value)
@@ -107,56 +138,57 @@ def update_spec(
     db.refresh(db_spec)
     return db_spec
 
-def delete_spec(
+def _delete_spec_row(db: Session, spec_id: int, company_owner_id: int) -> Optional[str]:
+    # Spec lookup and company ownership check in one joined query
+    db_spec = authorize_spec(db, spec_id, company_owner_id)
+    # Release the shared blob; files from before the blob store are deleted directly
+    legacy_path = None if blobs.release(db, db_spec.file_path) else db_spec.file_path
+    # Delete from database; SQLite does not cascade to the extracted text
+    db.query(SpecContent).filter(SpecContent.spec_id == spec_id).delete(synchronize_session=False)
+    db.delete(db_spec)
+    db.commit()
+    forget(db, "spec", spec_id)
+    return legacy_path
+
+async def delete_spec(
     db: Session,
     spec_id: int,
     company_owner_id: int
 ) -> bool:
-    db_spec = get_spec(db, spec_id)
-    if not db_spec:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Spec not found"
-        )
-    
-    # Verify user owns the company
-    project = db.query(Project).filter(Project.id == db_spec.project_id).first()
-    company = db.query(Company).filter(Company.id == project.company_id).first()
-    if company.owner_id != company_owner_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    try:
-        # Delete from S3
-        s3_client.delete_object(
-            Bucket=settings.S3_BUCKET,
-            Key=db_spec.file_path
-        )
-        
-        # Delete from database
-        db.delete(db_spec)
-        db.commit()
-        return True
-        
-    except ClientError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete file: {str(e)}"
-        ) 
+    # DB work (including the blob row lock) runs on the threadpool and is
+    # committed before the store is touched
+    legacy_path = await run_in_threadpool(_delete_spec_row, db, spec_id, company_owner_id)
+    if legacy_path:
+        try:
+            await get_storage(SPECS).delete(legacy_path)
+        except StorageError as e:
+            # The spec is gone already; the file is only an orphan now
+            logger.error("Failed to delete spec file", spec_id=spec_id, file_path=legacy_path, error=str(e))
+    return True
+
+def download_filename(spec: Spec) -> str:
+    """<name>-<version> plus the uploaded file's extension; blob keys have none."""
+    extension = os.path.splitext(spec.file_name or spec.file_path or "")[1]
+    return f"{spec.name}-{spec.version}{extension}"
 
-def generate_presigned_url(file_path: str, expires_in: int = 60 * 60 * 3) -> str:
+def _sign(bucket: str, key: str, disposition: Optional[str], expires_in: int) -> Optional[str]:
+    return get_storage(SPECS).presign(key, expires_in, content_disposition=disposition)
+
+def generate_presigned_urls(specs: Iterable[Spec]) -> Dict[int, str]:
     """
-    Generate a presigned URL for the given S3 file path, valid for a few hours (default: 3 hours).
+    Presigned URLs for many specs' files by spec id, served from the URL cache;
+    only files without a usable cached URL are signed. Each URL downloads as
+    download_filename(spec). Stores that cannot presign (local disk) return no URLs.
     """
-    try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': settings.S3_BUCKET, 'Key': file_path},
-            ExpiresIn=expires_in
-        )
-        return url
-    except ClientError as e:
-        # Optionally log the error
-        return None 
\ No newline at end of file
+    requests = {
+        spec.id: (spec.file_path, content_disposition(download_filename(spec)))
+        for spec in specs if spec.file_path
+    }
+    urls = presigned_url_cache.get_many(settings.S3_BUCKET, requests.values(), _sign)
+    return {spec_id: urls[request] for spec_id, request in requests.items() if urls.get(request)}
+
+def generate_presigned_url(spec: Spec) -> Optional[str]:
+    """
+    Generate a presigned URL for the spec's file, valid for a few hours (default: 3 hours).
+    """
+    return generate_presigned_urls([spec]).get(spec.id) 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.db.models import Specification
 from app.schemas.specification import SpecificationCreate
+from app.services import blobs
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
@@ -49,4 +50,16 @@ def get_specifications(
     return query.all()
 
 def get_spec_by_file_path(db: Session, file_path: str) -> Specification:
-    return db.query(Specification).filter(Specification.file_path == file_path).first() 
\ No newline at end of file
+    return db.query(Specification).filter(Specification.file_path == file_path).first() 
+def get_specification(db: Session, id: UUID) -> Optional[Specification]:
+    return db.query(Specification).filter(Specification.id == id).first()
+
+def delete_specification(db: Session, spec: Specification) -> Optional[str]:
+    """
+    Delete the row and release its blob, committed. Returns the path of a file
+    from before the blob store, which the caller deletes after this returns.
+    """
+    legacy_path = None if blobs.release(db, spec.file_path) else spec.file_path
+    db.delete(spec)
+    db.commit()
+    return legacy_path
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Enum, Text, JSON, Table
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Integer, String, DateTime, Enum, Text, JSON, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -37,8 +37,10 @@ class User(Base):
     role = Column(String)  # admin, engineer, pm
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+    # Set on password reset: access and refresh tokens issued earlier are rejected
+    tokens_valid_after = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     companies = relationship("Company", back_populates="owner")
@@ -46,6 +48,7 @@ class User(Base):
     comments = relationship("Comment", back_populates="author")
     notifications = relationship("Notification", back_populates="recipient")
     notification_preferences = relationship("NotificationPreference", back_populates="user")
+    api_keys = relationship("ApiKey", back_populates="user", cascade="all, delete-orphan")
 
 class Company(Base):
     __tablename__ = "companies"
@@ -53,9 +56,9 @@ class Company(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     status = Column(String, default="Active")
 
     # Relationships
@@ -69,8 +72,8 @@ class Project(Base):
     name = Column(String, index=True)
     description = Column(String, nullable=True)
     company_id = Column(Integer, ForeignKey("companies.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     company = relationship("Company", back_populates="projects")
@@ -87,17 +90,23 @@ class Spec(Base):
     version = Column(String)
     status = Column(Enum("draft", "review", "approved", "archived", name="spec_status"))
     file_path = Column(String)
+    file_name = Column(String, nullable=True)  # Original upload name; blob keys carry no extension
+    checksum_sha256 = Column(String(64), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    content_encoding = Column(String(16), nullable=True)  # Stored encoding, e.g. zstd; copied from the blob
     project_id = Column(Integer, ForeignKey("projects.id"))
     author_id = Column(Integer, ForeignKey("users.id"))
     spec_metadata = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     project = relationship("Project", back_populates="specs")
     lint_results = relationship("LintResult", back_populates="spec")
     comments = relationship("Comment", back_populates="spec")
 
+# lint_results and notifications are RANGE partitioned by created_at on Postgres
+# (primary key (id, created_at)); see app/services/partitions.py.
 class LintResult(Base):
     __tablename__ = "lint_results"
 
@@ -106,7 +115,7 @@ class LintResult(Base):
     issues = Column(JSON)
     summary = Column(String)
     spec_metadata = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     spec = relationship("Spec", back_populates="lint_results")
@@ -142,7 +151,7 @@ class Notification(Base):
     entity_id = Column(Integer)
     message = Column(Text)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     recipient = relationship("User", back_populates="notifications")
@@ -160,6 +169,59 @@ class NotificationPreference(Base):
     # Relationships
     user = relationship("User", back_populates="notification_preferences")
 
+class Blob(Base):
+    """
+    One stored copy of some content, shared by every row that uploaded the same
+    bytes. `location` is its key in the named store, derived from the SHA-256.
+    """
+    __tablename__ = "blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    # How the content is stored: None for as-is, or a compression (stored size differs)
+    content_encoding = Column(String(16), nullable=True)
+    stored_size_bytes = Column(BigInteger, nullable=True)
+    storage = Column(String, nullable=False)  # Store name: specs, uploads
+    location = Column(String, unique=True, index=True, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    # Set when refcount drops to 0; GC deletes the blob after a grace period
+    unreferenced_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SpecContent(Base):
+    """
+    Text extracted from a spec's file for content search (see
+    app/services/spec_index.py). Full-text indexed: GIN on Postgres, the
+    spec_content_index FTS5 table on SQLite.
+    """
+    __tablename__ = "spec_contents"
+
+    spec_id = Column(Integer, ForeignKey("specs.id", ondelete="CASCADE"), primary_key=True)
+    # Checksum of the file the content came from; a different spec checksum means re-index
+    checksum_sha256 = Column(String(64), nullable=True, index=True)
+    status = Column(String(16), nullable=False)  # indexed, unsupported, failed
+    extractor = Column(String(16), nullable=True)  # json, text, pdf
+    content = Column(Text, nullable=True)
+    error = Column(String, nullable=True)
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    # Public lookup part of the key; the secret part is only stored as an HMAC
+    prefix = Column(String(16), unique=True, index=True, nullable=False)
+    key_hash = Column(String(64), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="api_keys")
+
 class Specification(Base):
     __tablename__ = "specifications"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -170,6 +232,9 @@ class Specification(Base):
     status = Column(String, default="Pending")
     assigned_to = Column(String, nullable=True)
     file_path = Column(String, nullable=False)
+    checksum_sha256 = Column(String(64), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    content_encoding = Column(String(16), nullable=True)  # Stored encoding, e.g. zstd; copied from the blob
     approved_by = Column(String, nullable=True)
     rejected_by = Column(String, nullable=True)
 
@@ -0,0 +1,134 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+# Callbacks notified with the QueryStats of every finished request (see publish)
+_observers: List[Callable[["QueryStats"], None]] = []
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Reduce a SQL statement to its shape so repeated lookups group together."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Query count, DB time and statement shapes collected for one unit of work."""
+
+    def __init__(self) -> None:
+        self.query_count = 0
+        self.db_time_ms = 0.0
+        self.connection_checkouts = 0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.query_count += 1
+        self.db_time_ms += duration_ms
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statement shapes executed more than `threshold` times (likely N+1 loops)."""
+        return {shape: count for shape, count in self.fingerprints.items() if count > threshold}
+
+    def as_log_fields(self) -> Dict[str, object]:
+        return {
+            "db_query_count": self.query_count,
+            "db_time_ms": round(self.db_time_ms, 2),
+            "db_connection_checkouts": self.connection_checkouts,
+        }
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries():
+    """Collect QueryStats for every statement executed inside the block."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def publish(stats: QueryStats) -> None:
+    """Hand a finished request's stats to any registered observers."""
+    for observer in list(_observers):
+        observer(stats)
+
+
+@contextmanager
+def assert_query_budget(
+    max_queries: int,
+    max_repeats: Optional[int] = None,
+    max_checkouts: Optional[int] = None
+):
+    """
+    Test helper: fail if a request issued inside the block exceeds the query budget.
+
+        with assert_query_budget(max_queries=4, max_repeats=1, max_checkouts=1):
+            client.get("/api/v1/companies/", headers=auth_headers)
+
+    Requests are captured through RequestLoggingMiddleware, so this works with
+    TestClient; statements executed directly in the block are checked as well.
+    """
+    captured: List[QueryStats] = []
+    observer = captured.append
+    _observers.append(observer)
+    try:
+        with track_queries() as direct:
+            yield captured
+    finally:
+        _observers.remove(observer)
+    for stats in captured + [direct]:
+        if stats.query_count > max_queries:
+            raise AssertionError(
+                f"Query budget exceeded: {stats.query_count} queries (budget {max_queries}): "
+                f"{dict(stats.fingerprints)}"
+            )
+        if max_repeats is not None and stats.repeated(max_repeats):
+            raise AssertionError(
+                f"Repeated statements over budget ({max_repeats}): {stats.repeated(max_repeats)}"
+            )
+        if max_checkouts is not None and stats.connection_checkouts > max_checkouts:
+            raise AssertionError(
+                f"{stats.connection_checkouts} pool checkouts in one request (budget {max_checkouts})"
+            )
+
+
+def install(engine: Engine) -> None:
+    """Attach the cursor and pool hooks that feed the current QueryStats."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.connection_checkouts += 1
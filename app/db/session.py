@@ -2,15 +2,20 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db import query_stats
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+query_stats.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-# Dependency
+# Dependency. The session is bound to one connection for the whole request, so
+# a commit followed by more work (e.g. refresh) reuses it instead of returning
+# it to the pool and checking out another.
 def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
+    with engine.connect() as connection:
+        db = SessionLocal(bind=connection)
+        try:
+            yield db
+        finally:
+            db.close() 
\ No newline at end of file
@@ -5,15 +5,22 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
 from app.core.config import settings
+from app.core import metrics
+from app.core.revocation import revocation_filter
+from app.core.api_key_usage import api_key_usage
+from app.core.suggest import suggest_index
+from app.services.spec_index import spec_indexer
 from app.core.logging import setup_logging, get_logger, configure_logging
 from app.core.rate_limit import limiter
 from app.api.v1.api import api_router
 from app.middleware.logging import RequestLoggingMiddleware
+from app.middleware.download_slots import DownloadSlotMiddleware
 from app.db.session import get_db
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException
 import os
-from app.startup.file_sync import sync_files_and_db
+from app.startup.file_sync import start_file_sync
+from app.services.partitions import run_partition_maintenance
 from sqlalchemy import text
 # from app.middleware.rate_limit import RateLimitMiddleware
 
@@ -37,6 +44,7 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
 # Add middlewares
+app.add_middleware(DownloadSlotMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 # app.add_middleware(RateLimitMiddleware, rate_limit="1000/minute")
 
@@ -57,8 +65,26 @@ async def startup_event():
     """Run startup tasks including file sync."""
     logger.info("Starting TapeOutOps backend...")
     
-    # Sync files and database
-    sync_files_and_db()
+    # Check evidence files against the database in the background
+    if settings.FILE_SYNC_ON_STARTUP:
+        start_file_sync()
+    
+    # Make sure inserts always have a monthly partition to land in
+    run_partition_maintenance(retention=False)
+    
+    # Keep the local token revocation filter in sync with the shared store
+    revocation_filter.start(settings.REVOCATION_SYNC_INTERVAL_SECONDS)
+    
+    # Write API key last_used_at marks in batches, off request connections
+    api_key_usage.start(settings.API_KEY_USAGE_FLUSH_INTERVAL_SECONDS)
+    
+    # Build the /search/suggest prefix index in the background and keep it fresh
+    if settings.SUGGEST_ON_STARTUP:
+        suggest_index.start(settings.SUGGEST_REFRESH_INTERVAL_SECONDS, settings.SUGGEST_REBUILD_INTERVAL_SECONDS)
+    
+    # Index the text of uploaded spec files for /search/specs
+    if settings.SPEC_INDEX_ON_STARTUP:
+        spec_indexer.start(settings.SPEC_INDEX_SCAN_INTERVAL_SECONDS)
     
     logger.info("Backend startup completed")
 
@@ -67,6 +93,11 @@ async def health_check():
     """Health check endpoint - returns 200 if server is running."""
     return {"status": "healthy", "timestamp": "2025-07-10T00:30:00Z"}
 
+@app.get("/metrics")
+async def metrics_snapshot():
+    """In-process cache and pool statistics for this worker."""
+    return metrics.snapshot()
+
 @app.get("/ready")
 async def readiness_check(db: Session = Depends(get_db)):
     """Readiness check endpoint - returns 200 if DB and file system are accessible."""
@@ -0,0 +1,26 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.downloads import SLOTS_SCOPE_KEY
+
+
+class DownloadSlotMiddleware:
+    """
+    Releases the download slots a request took through DownloadLimiter.run
+    once the request is over, however it ended: response sent, client gone,
+    or an error before the response was sent. Pure ASGI, so the finally
+    wraps the whole send path.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        releases = scope[SLOTS_SCOPE_KEY] = []
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for release in releases:
+                release()
@@ -2,7 +2,9 @@ import time
 import uuid
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.config import settings
 from app.core.logging import get_logger, log_request, log_error
+from app.db import query_stats
 
 logger = get_logger(__name__)
 
@@ -11,31 +13,47 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         request_id = str(uuid.uuid4())
         start_time = time.time()
         
-        try:
-            response = await call_next(request)
-            duration = (time.time() - start_time) * 1000  # Convert to milliseconds
-            
-            log_request(
-                logger=logger,
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration_ms=duration,
-                client_host=request.client.host if request.client else None,
-                user_agent=request.headers.get("user-agent")
-            )
-            
-            return response
-            
-        except Exception as e:
-            duration = (time.time() - start_time) * 1000
-            log_error(
-                logger=logger,
-                request_id=request_id,
-                error=e,
-                method=request.method,
-                path=request.url.path,
-                duration_ms=duration
-            )
-            raise 
\ No newline at end of file
+        # Handlers run in a copy of this context, so their queries land in `stats`
+        with query_stats.track_queries() as stats:
+            try:
+                response = await call_next(request)
+                duration = (time.time() - start_time) * 1000  # Convert to milliseconds
+                repeated = stats.repeated(settings.SQL_REPEATED_STATEMENT_THRESHOLD)
+                
+                log_request(
+                    logger=logger,
+                    request_id=request_id,
+                    method=request.method,
+                    path=request.url.path,
+                    status_code=response.status_code,
+                    duration_ms=duration,
+                    client_host=request.client.host if request.client else None,
+                    user_agent=request.headers.get("user-agent"),
+                    **stats.as_log_fields()
+                )
+                if repeated:
+                    logger.warning(
+                        "n_plus_one_suspected",
+                        request_id=request_id,
+                        method=request.method,
+                        path=request.url.path,
+                        threshold=settings.SQL_REPEATED_STATEMENT_THRESHOLD,
+                        repeated_statements=repeated
+                    )
+                
+                return response
+                
+            except Exception as e:
+                duration = (time.time() - start_time) * 1000
+                log_error(
+                    logger=logger,
+                    request_id=request_id,
+                    error=e,
+                    method=request.method,
+                    path=request.url.path,
+                    duration_ms=duration,
+                    **stats.as_log_fields()
+                )
+                raise
+            finally:
+                query_stats.publish(stats)
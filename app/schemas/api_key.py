@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class ApiKeyBase(BaseModel):
+    name: str
+
+class ApiKeyCreate(ApiKeyBase):
+    expires_in_days: Optional[int] = Field(None, ge=1)
+
+class ApiKey(ApiKeyBase):
+    id: int
+    prefix: str
+    expires_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ApiKeyWithSecret(ApiKey):
+    # Full key; returned once on create/regenerate and never stored
+    key: str
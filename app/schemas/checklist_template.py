@@ -41,6 +41,12 @@ class ActiveChecklistBase(BaseModel):
 class ActiveChecklistCreate(ActiveChecklistBase):
     pass
 
+class ActiveChecklistBulkCreate(BaseModel):
+    template_id: int
+    linked_spec_ids: List[str] = Field(..., min_length=1)
+    created_by: Optional[str] = None
+    status: Optional[str] = "active"
+
 class ActiveChecklistOut(ActiveChecklistBase):
     id: int
     created_at: datetime
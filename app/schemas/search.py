@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+class SearchHit(BaseModel):
+    type: Literal["company", "project", "spec"]
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    score: float
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class SuggestItem(BaseModel):
+    type: Literal["user", "company", "project", "spec"]
+    id: int
+    label: str
+    # User email or spec version
+    detail: Optional[str] = None
+
+class SuggestResults(BaseModel):
+    items: List[SuggestItem]
+    # False until this worker has loaded its index; until then only rows it wrote itself are suggested
+    ready: bool
+
+class SpecContentHit(BaseModel):
+    spec_id: int
+    name: Optional[str] = None
+    version: Optional[str] = None
+    project_id: Optional[int] = None
+    # HTML-escaped text around the matches, which are wrapped in <mark></mark>
+    snippet: Optional[str] = None
+    score: float
+
+class SpecContentResults(BaseModel):
+    items: List[SpecContentHit]
+    next_cursor: Optional[str] = None
@@ -21,6 +21,29 @@ class SpecBase(BaseModel):
 class SpecCreate(SpecBase):
     project_id: int
 
+class SpecUploadRequest(BaseModel):
+    size_bytes: int = Field(..., gt=0)
+    checksum_sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+
+class SpecUploadPart(BaseModel):
+    part_number: int
+    url: str
+
+class SpecUploadTicket(BaseModel):
+    upload_token: str
+    expires_at: datetime
+    # Single PUT: send the file to url with headers. Multipart: PUT each
+    # part_size slice of the file to its part URL.
+    url: Optional[str] = None
+    headers: Dict[str, str] = {}
+    part_size: Optional[int] = None
+    parts: List[SpecUploadPart] = []
+
+class SpecUploadFinalize(SpecBase):
+    upload_token: str
+    # Original file name; its extension names the downloaded file
+    file_name: Optional[str] = None
+
 class SpecUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -32,6 +55,9 @@ class SpecInDBBase(SpecBase):
     id: int
     project_id: int
     file_path: str
+    checksum_sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    content_encoding: Optional[str] = None
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
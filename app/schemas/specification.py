@@ -10,6 +10,9 @@ class SpecificationBase(BaseModel):
     status: Optional[str] = "Pending"
     assigned_to: Optional[str] = None
     file_path: str
+    checksum_sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    content_encoding: Optional[str] = None
     approved_by: Optional[str] = None
     rejected_by: Optional[str] = None
 
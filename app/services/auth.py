@@ -1,9 +1,12 @@
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core.password_hashing import password_hasher
 from app.db import models
 from app.schemas.user import UserCreate
 from app.utils import security
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 import os
 
@@ -11,13 +14,25 @@ RESET_SECRET_KEY = os.environ.get("RESET_SECRET_KEY", "super-secret-reset-key")
 RESET_TOKEN_EXPIRE_MINUTES = 60
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    # Runs on every authenticated request: the lambda statement is compiled once
+    # and cached, with `email` bound as a parameter on each call.
+    stmt = lambda_stmt(lambda: select(models.User).where(models.User.email == email).limit(1))
+    return db.execute(stmt).scalars().first()
 
-def create_user(db: Session, user_in: UserCreate):
-    user = get_user_by_email(db, user_in.email)
+# Password flows are async: bcrypt runs on the dedicated password hashing pool,
+# and the database work runs on the shared threadpool only for as long as it takes.
+
+def _save(db: Session, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+async def create_user(db: Session, user_in: UserCreate):
+    user = await run_in_threadpool(get_user_by_email, db, user_in.email)
     if user:
         raise HTTPException(status_code=400, detail="Email already registered. Please log in instead.")
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await password_hasher.hash(user_in.password)
     db_user = models.User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -25,30 +40,40 @@ def create_user(db: Session, user_in: UserCreate):
         role=user_in.role,
         is_active=True,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_in_threadpool(_save, db, db_user)
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return None
-    if not security.verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored hash used a different BCRYPT_ROUNDS; upgrade it transparently
+        user.hashed_password = new_hash
+        await run_in_threadpool(_save, db, user)
     return user
 
 def create_access_token(data: dict):
     return security.create_access_token(data)
 
-def reset_password(db: Session, email: str, new_password: str):
-    user = get_user_by_email(db, email)
+def create_token_pair(email: str) -> dict:
+    return {
+        "access_token": security.create_access_token({"sub": email}),
+        "refresh_token": security.create_refresh_token({"sub": email}),
+        "token_type": "bearer",
+    }
+
+async def reset_password(db: Session, email: str, new_password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.hashed_password = security.get_password_hash(new_password)
-    db.commit()
-    db.refresh(user)
-    return user
+    user.hashed_password = await password_hasher.hash(new_password)
+    # Signs out every session: tokens issued before now are rejected on use and
+    # on refresh (see security.issued_before_reset)
+    user.tokens_valid_after = datetime.now(timezone.utc)
+    return await run_in_threadpool(_save, db, user)
 
 def create_password_reset_token(data: dict):
     to_encode = data.copy()
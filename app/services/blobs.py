@@ -0,0 +1,257 @@
+"""
+Content-addressed, reference-counted blob storage.
+
+Uploads are hashed first (from the request's spooled temp file) and stored
+under a key derived from their SHA-256, so uploading bytes that are already
+stored only adds a reference: no second write to the store. Rows that point
+at a blob (specs, specifications, checklist evidence) keep the blob key in
+their file path column and release it when deleted. Blobs whose refcount has
+been 0 for BLOB_GC_GRACE_HOURS are removed by the GC job, content first and
+then the row, under a row lock:
+
+    python -m app.services.blobs
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, List, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.models import Blob, Spec, Specification
+from app.db.session import SessionLocal
+from app.services.storage import StorageBackend, get_storage
+from app.services.storage.compression import compress_file, compression_for
+from app.services.uploads import UploadResult, hash_upload
+
+logger = get_logger(__name__)
+
+
+def blob_key(prefix: str, sha256: str, fanout: bool = False) -> str:
+    # Fan-out keeps S3 listings and key prefixes spread; local dirs stay flat
+    return f"{prefix}/{sha256[:2]}/{sha256}" if fanout else f"{prefix}/{sha256}"
+
+
+def _add_reference(db: Session, location: str) -> bool:
+    result = db.execute(
+        update(Blob)
+        .where(Blob.location == location)
+        .values(refcount=Blob.refcount + 1, unreferenced_at=None)
+    )
+    return result.rowcount > 0
+
+
+def _record_blob(
+    db: Session,
+    store: str,
+    location: str,
+    sha256: str,
+    size_bytes: int,
+    content_encoding: Optional[str] = None,
+    stored_size_bytes: Optional[int] = None
+) -> None:
+    # A concurrent upload of the same bytes may have inserted the row meanwhile
+    try:
+        with db.begin_nested():
+            db.add(Blob(
+                sha256=sha256,
+                size_bytes=size_bytes,
+                content_encoding=content_encoding,
+                stored_size_bytes=size_bytes if stored_size_bytes is None else stored_size_bytes,
+                storage=store,
+                location=location,
+                refcount=1
+            ))
+    except IntegrityError:
+        _add_reference(db, location)
+
+
+def _blob_exists(db: Session, location: str) -> bool:
+    # Plain read: takes no row lock
+    return db.query(Blob.id).filter(Blob.location == location).first() is not None
+
+
+def _blob_encoding(db: Session, location: str) -> Optional[str]:
+    return db.query(Blob.content_encoding).filter(Blob.location == location).scalar()
+
+
+def _set_encoding(db: Session, location: str, content_encoding: Optional[str], stored_size_bytes: int) -> None:
+    # The rows keep a copy of the blob's encoding; rewrite them all together
+    db.execute(
+        update(Blob)
+        .where(Blob.location == location)
+        .values(content_encoding=content_encoding, stored_size_bytes=stored_size_bytes)
+    )
+    for model in (Spec, Specification):
+        db.execute(update(model).where(model.file_path == location).values(content_encoding=content_encoding))
+
+
+async def _write(
+    storage: StorageBackend,
+    key: str,
+    source: BinaryIO,
+    size: int,
+    encoding: Optional[str]
+) -> Tuple[Optional[str], int]:
+    """
+    Write `source` to `key`, compressed with `encoding` if that makes it
+    smaller. Returns the encoding actually used and the stored size.
+    """
+    if encoding is not None:
+        compressed, stored_size = await run_in_threadpool(compress_file, source, size)
+        try:
+            if stored_size < size:
+                await storage.put_file(key, compressed)
+                return encoding, stored_size
+        finally:
+            compressed.close()
+    await storage.put_file(key, source)
+    return None, size
+
+
+async def store_upload(
+    db: Session,
+    store: str,
+    prefix: str,
+    file: UploadFile,
+    fanout: bool = False,
+    compress: bool = False
+) -> UploadResult:
+    """
+    Store an upload in `store` by content, or reference the existing copy.
+    With `compress`, new blobs are compressed if the store is configured for
+    it; only pass it for rows whose readers decode content_encoding.
+
+    Adds the blob reference to the session without committing; the caller
+    commits it together with the row that points at the blob, with no await
+    in between. All storage I/O happens before the blob row is updated or
+    inserted, so no row lock or uncommitted insert is held across an await,
+    where another request on the same event loop could block on it.
+    """
+    sha256, size = await hash_upload(file)
+    key = blob_key(prefix, sha256, fanout)
+    storage = get_storage(store)
+    compression = compression_for(store) if compress else None
+    written = None
+    # Also rewrite a known blob whose content has gone missing
+    if not (_blob_exists(db, key) and await storage.exists(key)):
+        written = await _write(storage, key, file.file, size, compression)
+    if not _add_reference(db, key):
+        if written is None:
+            # GC removed the blob since the check; the UPDATE matched nothing, so nothing is locked
+            written = await _write(storage, key, file.file, size, compression)
+        _record_blob(db, store, key, sha256, size, *written)
+        return UploadResult(key=key, size_bytes=size, checksum_sha256=sha256, content_encoding=written[0])
+    encoding = _blob_encoding(db, key)
+    if written is not None and written[0] != encoding:
+        _set_encoding(db, key, *written)
+        encoding = written[0]
+    return UploadResult(key=key, size_bytes=size, checksum_sha256=sha256, content_encoding=encoding)
+
+
+async def adopt_object(
+    db: Session,
+    store: str,
+    prefix: str,
+    staged_key: str,
+    sha256: str,
+    size: int,
+    fanout: bool = False
+) -> UploadResult:
+    """
+    Like store_upload, for an object already in `store` whose content has been
+    verified (a finalized direct upload): copied to its blob key server-side
+    unless the blob exists. It is kept as uploaded; compressing it would mean
+    reading it back. As with store_upload, the copy happens before the blob
+    row is touched. The staged object is left for the caller to delete once
+    it has committed.
+    """
+    key = blob_key(prefix, sha256, fanout)
+    storage = get_storage(store)
+    copied = False
+    if not (_blob_exists(db, key) and await storage.exists(key)):
+        await storage.copy(staged_key, key)
+        copied = True
+    if not _add_reference(db, key):
+        if not copied:
+            # GC removed the blob since the check; nothing is locked
+            await storage.copy(staged_key, key)
+        _record_blob(db, store, key, sha256, size)
+        return UploadResult(key=key, size_bytes=size, checksum_sha256=sha256, content_encoding=None)
+    encoding = _blob_encoding(db, key)
+    if copied and encoding is not None:
+        _set_encoding(db, key, None, size)
+        encoding = None
+    return UploadResult(key=key, size_bytes=size, checksum_sha256=sha256, content_encoding=encoding)
+
+
+def release(db: Session, location: Optional[str]) -> bool:
+    """
+    Drop one reference to the blob at `location` (not committed).
+
+    Returns False if `location` is not a blob, i.e. a file stored before the
+    blob store existed, which the caller should delete directly.
+    """
+    if not location:
+        return False
+    blob = db.query(Blob).filter(Blob.location == location).with_for_update().first()
+    if blob is None:
+        return False
+    blob.refcount = max(blob.refcount - 1, 0)
+    if blob.refcount == 0:
+        blob.unreferenced_at = datetime.now(timezone.utc)
+    return True
+
+
+async def collect_garbage(db: Session, grace_hours: Optional[int] = None) -> List[str]:
+    """Delete blobs that have had no references for `grace_hours`; returns their keys."""
+    if grace_hours is None:
+        grace_hours = settings.BLOB_GC_GRACE_HOURS
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    candidates = db.query(Blob.id, Blob.storage, Blob.location).filter(
+        Blob.refcount == 0,
+        Blob.unreferenced_at.isnot(None),
+        Blob.unreferenced_at < cutoff
+    ).all()
+    deleted = []
+    for blob_id, store, location in candidates:
+        # Lock the row and re-check the refcount: an upload may have re-referenced it.
+        # The lock is held until the content and then the row are gone, so an upload
+        # of the same bytes either referenced it first or waits, finds no row and
+        # writes the content again.
+        blob = db.query(Blob).filter(Blob.id == blob_id, Blob.refcount == 0).with_for_update().first()
+        if blob is None:
+            db.rollback()
+            continue
+        try:
+            await get_storage(store).delete(location)
+        except Exception as e:
+            # Keep the row so the next run retries
+            db.rollback()
+            logger.error("Failed to delete blob content", location=location, error=str(e))
+            continue
+        db.delete(blob)
+        db.commit()
+        deleted.append(location)
+    return deleted
+
+
+def run_blob_gc() -> None:
+    db = SessionLocal()
+    try:
+        deleted = asyncio.run(collect_garbage(db))
+        logger.info("Blob GC completed", deleted=len(deleted))
+    except Exception as e:
+        db.rollback()
+        logger.error("Blob GC failed", error=str(e))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_blob_gc()
@@ -0,0 +1,175 @@
+"""
+Presigned direct-to-store uploads of spec files.
+
+Uploading happens in two phases, so API workers only handle metadata:
+
+1. begin_upload: the client declares the file's size and SHA-256. It gets back
+   a presigned PUT for a staging key, or presigned multipart parts for files
+   above DIRECT_UPLOAD_SINGLE_PUT_MAX_BYTES. It also gets a signed upload
+   token that describes the upload.
+2. finalize_upload: once the client has uploaded, the staged object's size and
+   checksum are checked and it moves into the content-addressed blob store
+   (app/services/blobs.py). The caller deletes the staged object with
+   discard_staged once the spec row is committed.
+
+Single PUTs are signed with the checksum. The store verifies the bytes itself,
+so finalizing reads only object metadata. S3 keeps no whole-object SHA-256 for
+multipart objects, so those are read back once to hash them.
+
+Staged objects that are never finalized are left to a bucket lifecycle rule on
+DIRECT_UPLOAD_PREFIX, which should also abort incomplete multipart uploads.
+"""
+import hashlib
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services import blobs
+from app.services.storage import SPECS, ObjectNotFound, StorageError, get_storage
+from app.services.storage.s3 import MIN_PART_SIZE
+from app.services.uploads import UploadResult
+
+logger = get_logger(__name__)
+
+UPLOAD_TOKEN_TYPE = "spec_upload"
+
+# S3 limit on parts per multipart upload
+MAX_PARTS = 10000
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid or expired upload token"
+    )
+
+
+def _part_size(size_bytes: int) -> int:
+    return max(settings.S3_MULTIPART_PART_SIZE, MIN_PART_SIZE, math.ceil(size_bytes / MAX_PARTS))
+
+
+async def begin_upload(project_id: int, user_id: int, size_bytes: int, checksum_sha256: str) -> dict:
+    """
+    Presign a direct upload to a fresh staging key; returns the fields of a
+    SpecUploadTicket.
+
+    Even when a blob with this checksum already exists, the client still
+    uploads. Knowing a file's hash must not be enough to reference its content.
+    """
+    if size_bytes > settings.DIRECT_UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Files over {settings.DIRECT_UPLOAD_MAX_BYTES} bytes cannot be uploaded"
+        )
+    storage = get_storage(SPECS)
+    key = f"{settings.DIRECT_UPLOAD_PREFIX}/{uuid.uuid4().hex}"
+    expires_in = settings.DIRECT_UPLOAD_EXPIRES_SECONDS
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    claims = {
+        "sub": str(user_id),
+        "type": UPLOAD_TOKEN_TYPE,
+        "project_id": project_id,
+        "key": key,
+        "size_bytes": size_bytes,
+        "checksum_sha256": checksum_sha256,
+        "exp": expires_at,
+    }
+    ticket = {"expires_at": expires_at}
+
+    try:
+        if size_bytes <= settings.DIRECT_UPLOAD_SINGLE_PUT_MAX_BYTES:
+            presigned = storage.presign_put(key, expires_in, checksum_sha256)
+            if presigned is None:
+                raise StorageError(f"{storage.name} storage does not support presigned uploads")
+            ticket.update(url=presigned["url"], headers=presigned["headers"])
+        else:
+            part_size = _part_size(size_bytes)
+            upload_id = await storage.create_multipart_upload(key)
+            claims["upload_id"] = upload_id
+            ticket.update(part_size=part_size, parts=[
+                {"part_number": n, "url": storage.presign_upload_part(key, upload_id, n, expires_in)}
+                for n in range(1, math.ceil(size_bytes / part_size) + 1)
+            ])
+    except StorageError as e:
+        logger.warning("Direct upload unavailable", key=key, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads are not available; upload the file to the project's specs endpoint"
+        )
+
+    ticket["upload_token"] = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return ticket
+
+
+def decode_upload_token(token: str, project_id: int, user_id: int) -> dict:
+    """Claims of an upload token issued to this user for this project."""
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise _invalid_token()
+    if (
+        claims.get("type") != UPLOAD_TOKEN_TYPE
+        or claims.get("sub") != str(user_id)
+        or claims.get("project_id") != project_id
+    ):
+        raise _invalid_token()
+    return claims
+
+
+async def _hash_object(key: str) -> str:
+    digest = hashlib.sha256()
+    async for chunk in get_storage(SPECS).stream(key):
+        # hashlib releases the GIL on large buffers
+        await run_in_threadpool(digest.update, chunk)
+    return digest.hexdigest()
+
+
+async def finalize_upload(db: Session, claims: dict) -> UploadResult:
+    """
+    Verify the staged object against the size and checksum in `claims` and
+    copy it into the blob store. The blob reference is added to the session
+    without committing, as with blobs.store_upload; commit it before any
+    further await, then call discard_staged.
+    """
+    storage = get_storage(SPECS)
+    key = claims["key"]
+    try:
+        if claims.get("upload_id"):
+            await storage.complete_multipart_upload(key, claims["upload_id"])
+        size = await storage.size(key)
+        checksum = None
+        if size == claims["size_bytes"]:
+            checksum = await storage.verified_sha256(key) or await _hash_object(key)
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Uploaded file not found; upload it before finalizing"
+        )
+    except StorageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Upload could not be completed: {str(e)}"
+        )
+
+    if size != claims["size_bytes"] or checksum != claims["checksum_sha256"]:
+        await storage.delete(key)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Uploaded file does not match the declared size and checksum"
+        )
+    return await blobs.adopt_object(db, SPECS, "blobs", key, checksum, size, fanout=True)
+
+
+async def discard_staged(claims: dict) -> None:
+    """Delete the staged object of a finalized upload; the lifecycle rule catches failures."""
+    try:
+        await get_storage(SPECS).delete(claims["key"])
+    except StorageError as e:
+        logger.warning("Failed to delete staged upload", key=claims["key"], error=str(e))
@@ -0,0 +1,340 @@
+"""
+File download responses with HTTP caching and Range support.
+
+Strong ETags come from the stored SHA-256, so If-None-Match turns a repeat
+download into a 304 without touching storage. Range requests return 206 with
+one range or a multipart/byteranges body with several; ranges that cannot be
+satisfied get a 416.
+
+Whole local files go through FileResponse, which hands the path to the server
+through the http.response.pathsend extension where the server supports it
+(zero-copy sendfile). Behind nginx, set DOWNLOAD_ACCEL_REDIRECT_PREFIX. The
+app then answers with an X-Accel-Redirect header and nginx sends the file
+itself, using sendfile and its own Range handling.
+
+Objects that are not on local disk are streamed in STORAGE_CHUNK_SIZE chunks.
+Each chunk is read only after the previous one has been sent, so a slow client
+slows the read from the store instead of buffering in the API. DownloadLimiter
+caps how many such streams a worker runs at once; DownloadSlotMiddleware
+(app/middleware/download_slots.py) gives each slot back when its request ends.
+"""
+import asyncio
+import os
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.storage import ObjectNotFound, StorageBackend
+from app.services.storage.compression import decode_stream
+
+logger = get_logger(__name__)
+
+# Inclusive (start, end) byte offsets
+ByteRange = Tuple[int, int]
+
+# ASGI scope key of the release callbacks for the download slots a request holds
+SLOTS_SCOPE_KEY = "download_slots"
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header is valid but none of its ranges overlap the file."""
+
+
+def strong_etag(checksum_sha256: str, content_encoding: Optional[str] = None) -> str:
+    if content_encoding:
+        return f'"{checksum_sha256}-{content_encoding}"'
+    return f'"{checksum_sha256}"'
+
+
+def stat_etag(stat_result: os.stat_result) -> str:
+    # Legacy rows have no checksum; mtime and size identify the version of a
+    # local file well enough, the same way nginx and Starlette do it
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def if_none_match(header: Optional[str], etag: Optional[str]) -> bool:
+    """True if the client's cached copy is current (weak comparison, RFC 9110 13.1.2)."""
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_opaque_tag(tag) == etag for tag in header.split(","))
+
+
+def accepts_encoding(header: Optional[str], encoding: str) -> bool:
+    """True if Accept-Encoding allows `encoding`, by name or through "*", with q > 0."""
+    if not header:
+        return False
+    explicit = wildcard = None
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == encoding:
+            explicit = q > 0
+        elif name == "*":
+            wildcard = q > 0
+    return explicit if explicit is not None else bool(wildcard)
+
+
+def if_range(header: Optional[str], etag: Optional[str]) -> bool:
+    """True if a Range request should be honoured; If-Range needs a strong match."""
+    if header is None:
+        return True
+    return etag is not None and header.strip() == etag
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[ByteRange]]:
+    """
+    Satisfiable ranges from a Range header, sorted with overlaps merged.
+
+    Returns None when the whole file should be sent: no header, a malformed
+    header or more ranges than DOWNLOAD_MAX_RANGES (servers may ignore Range,
+    RFC 9110 14.2). Raises RangeNotSatisfiable if no range overlaps the file.
+    """
+    if not header:
+        return None
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash or not (first or last):
+            return None
+        if not (first or "0").isdigit() or not (last or "0").isdigit():
+            return None
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                return None
+        elif int(last) == 0:
+            continue
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+    if len(ranges) > settings.DOWNLOAD_MAX_RANGES:
+        return None
+    if not ranges:
+        raise RangeNotSatisfiable()
+    merged: List[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+async def _multipart_body(
+    storage: StorageBackend,
+    key: str,
+    parts: List[Tuple[bytes, ByteRange]],
+    closing: bytes
+) -> AsyncIterator[bytes]:
+    for header, (start, end) in parts:
+        yield header
+        async for chunk in storage.stream(key, start, end):
+            yield chunk
+        yield b"\r\n"
+    yield closing
+
+
+async def download_response(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    size: Optional[int] = None,
+    checksum_sha256: Optional[str] = None,
+    content_encoding: Optional[str] = None
+) -> Response:
+    """
+    Response for GET of `key`, honouring If-None-Match, Range and If-Range.
+
+    `size` and `checksum_sha256` describe the original file. An object stored
+    compressed (`content_encoding`) is sent as stored, with Content-Encoding,
+    to clients that accept that encoding. Other clients get it decoded while it
+    streams, without range support.
+
+    Raises ObjectNotFound if the file is missing from storage.
+    """
+    media_type = media_type or "application/octet-stream"
+    path = storage.local_path(key)
+    stat_result = None
+    if path is not None:
+        try:
+            stat_result = await run_in_threadpool(os.stat, path)
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+    passthrough = content_encoding is not None and accepts_encoding(
+        request.headers.get("accept-encoding"), content_encoding
+    )
+
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, no-cache"}
+    if filename:
+        headers["Content-Disposition"] = content_disposition(filename)
+    if content_encoding is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if checksum_sha256:
+        # Each representation needs its own strong ETag
+        etag = strong_etag(checksum_sha256, content_encoding if passthrough else None)
+    elif stat_result is not None and content_encoding is None:
+        etag = stat_etag(stat_result)
+    else:
+        etag = None
+    if etag:
+        headers["ETag"] = etag
+
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if content_encoding is not None and not passthrough:
+        headers["Accept-Ranges"] = "none"
+        if size is not None:
+            headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            decode_stream(storage.stream(key), content_encoding), headers=headers, media_type=media_type
+        )
+    if passthrough:
+        headers["Content-Encoding"] = content_encoding
+        size = None  # Ranges and lengths below are of the stored bytes
+
+    if stat_result is not None:
+        size = stat_result.st_size
+    elif size is None:
+        size = await storage.size(key)
+
+    if path is not None and settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX and not passthrough:
+        headers["X-Accel-Redirect"] = settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(key)
+        return Response(headers=headers, media_type=media_type)
+
+    ranges = None
+    if if_range(request.headers.get("if-range"), etag):
+        try:
+            ranges = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    if ranges is None:
+        if path is not None:
+            response = FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
+            # Fallback when the server lacks pathsend: fewer, larger reads
+            response.chunk_size = settings.STORAGE_CHUNK_SIZE
+            return response
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(storage.stream(key), headers=headers, media_type=media_type)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            storage.stream(key, start, end), status_code=206, headers=headers, media_type=media_type
+        )
+
+    boundary = uuid.uuid4().hex
+    parts = [
+        (
+            f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode(),
+            (start, end),
+        )
+        for start, end in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode()
+    headers["Content-Length"] = str(
+        sum(len(header) + end - start + 1 + 2 for header, (start, end) in parts) + len(closing)
+    )
+    return StreamingResponse(
+        _multipart_body(storage, key, parts, closing),
+        status_code=206,
+        headers=headers,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+    )
+
+
+class DownloadLimiter:
+    """
+    Caps the downloads a worker streams at once. A slot is held from building
+    the response until the request is over: DownloadSlotMiddleware releases it
+    after the last byte is sent, when the client disconnects, or when the
+    request fails before the response goes out. Requests that cannot get one
+    within `acquire_timeout` seconds get a 503 instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int, acquire_timeout: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self.completed += 1
+        self._slots.release()
+
+    async def run(self, request: Request, build: Callable[[], Awaitable[Response]]) -> Response:
+        slots = request.scope.get(SLOTS_SCOPE_KEY)
+        if slots is None:
+            raise RuntimeError("DownloadLimiter needs DownloadSlotMiddleware installed")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning("Download limit reached", in_flight=self.in_flight)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many downloads in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        slots.append(self._release)
+        return await build()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+spec_download_limiter = DownloadLimiter(
+    settings.SPEC_DOWNLOAD_MAX_CONCURRENCY, settings.SPEC_DOWNLOAD_ACQUIRE_TIMEOUT_SECONDS
+)
+metrics.register("spec_downloads", spec_download_limiter.stats)
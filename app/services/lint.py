@@ -1,31 +1,22 @@
 from typing import List, Dict, Any
 import json
 from fastapi import HTTPException, status
-import boto3
-from botocore.exceptions import ClientError
 
 from app.schemas.spec import Spec
 from app.schemas.lint_result import LintResult, LintIssue, LintSeverity
 from app.core.config import settings
-
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION
-)
+from app.services.storage import SPECS, StorageError, get_storage
+from app.services.storage.compression import read_decoded
 
 async def lint_spec(spec: Spec) -> LintResult:
     """
-    Lint a spec file from S3.
+    Lint a spec file from spec storage.
     """
     try:
-        # Download spec file from S3
-        response = s3_client.get_object(
-            Bucket=settings.AWS_S3_BUCKET,
-            Key=spec.file_path
-        )
-        spec_content = response['Body'].read().decode('utf-8')
+        # Download spec file, decompressing as it streams in
+        spec_content = (
+            await read_decoded(get_storage(SPECS), spec.file_path, spec.content_encoding)
+        ).decode('utf-8')
         
         # Parse spec content
         try:
@@ -102,7 +93,7 @@ async def lint_spec(spec: Spec) -> LintResult:
             summary=summary
         )
         
-    except ClientError as e:
+    except StorageError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error accessing spec file: {str(e)}"
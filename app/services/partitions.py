@@ -0,0 +1,184 @@
+"""
+Monthly partition maintenance for the append-only tables.
+
+lint_results, notifications and audit_logs are RANGE partitioned by created_at on
+Postgres (see migration b7c41e9d2a05). This module keeps partitions created ahead
+of time and detaches partitions older than the retention window, either moving
+them to an archive schema or dropping them. On other databases it is a no-op.
+
+Rows with no monthly partition land in <table>_default instead of failing the
+insert. Maintenance creates the partition for every month found there and
+moves those rows into it, so the default partition only holds rows between a
+missed run and the next one. Run it at least monthly (partitions exist
+PARTITION_PREMAKE_MONTHS ahead), e.g. daily from cron:
+
+    python -m app.services.partitions
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+
+logger = get_logger(__name__)
+
+PARTITIONED_TABLES = ("lint_results", "notifications", "audit_logs")
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def list_partitions(db: Session, table: str) -> Dict[str, date]:
+    """Attached monthly partitions of `table`, mapped to the first day of their month."""
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table}
+    ).scalars().all()
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+
+def _months_in_default(db: Session, table: str) -> List[date]:
+    rows = db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at)::date "
+        f"FROM {default_partition_name(table)}"
+    )).scalars().all()
+    return sorted(rows)
+
+
+def _create_partition(db: Session, table: str, month: date) -> None:
+    name = partition_name(table, month)
+    bounds = f"FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    default = default_partition_name(table)
+    # Block inserts into the default partition until the month's rows are out of it
+    db.execute(text(f"LOCK TABLE {default} IN SHARE ROW EXCLUSIVE MODE"))
+    has_rows = db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} "
+        f"WHERE created_at >= '{month.isoformat()}' AND created_at < '{_add_months(month, 1).isoformat()}')"
+    )).scalar()
+    if not has_rows:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+    # Postgres refuses a partition whose range still has rows in the default
+    # partition: fill a standalone table with them, then attach it
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {default} "
+        f"WHERE created_at >= '{month.isoformat()}' AND created_at < '{_add_months(month, 1).isoformat()}' "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ))
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Create the current month's partition and the next `months_ahead` ones if
+    missing, plus one for each month with rows in the default partition
+    (moving those rows into it). Also creates missing default partitions.
+    """
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_PREMAKE_MONTHS
+    current = date.today().replace(day=1)
+    created = []
+    for table in PARTITIONED_TABLES:
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"))
+        existing = set(list_partitions(db, table).values())
+        months = {_add_months(current, offset) for offset in range(months_ahead + 1)}
+        months.update(_months_in_default(db, table))
+        for month in sorted(months - existing):
+            _create_partition(db, table, month)
+            created.append(partition_name(table, month))
+    db.commit()
+    return created
+
+
+def apply_retention(
+    db: Session,
+    retention_months: Optional[int] = None,
+    action: Optional[str] = None
+) -> List[str]:
+    """
+    Detach partitions whose whole month is older than `retention_months`.
+
+    `action` is "archive" (move the detached table to PARTITION_ARCHIVE_SCHEMA,
+    where it can be dumped to cold storage) or "drop".
+    """
+    if retention_months is None:
+        retention_months = settings.PARTITION_RETENTION_MONTHS
+    action = action or settings.PARTITION_RETENTION_ACTION
+    if action not in ("archive", "drop"):
+        raise ValueError(f"Unknown partition retention action: {action}")
+
+    cutoff = _add_months(date.today().replace(day=1), -retention_months)
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    if action == "archive":
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+
+    detached = []
+    for table in PARTITIONED_TABLES:
+        for name, month in sorted(list_partitions(db, table).items(), key=lambda item: item[1]):
+            if _add_months(month, 1) > cutoff:
+                continue
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if action == "archive":
+                db.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+            else:
+                db.execute(text(f"DROP TABLE {name}"))
+            detached.append(name)
+    db.commit()
+    return detached
+
+
+def run_partition_maintenance(retention: bool = True) -> None:
+    """Create upcoming partitions and, if `retention`, detach expired ones."""
+    db = SessionLocal()
+    try:
+        if not _is_postgres(db):
+            return
+        created = ensure_partitions(db)
+        detached = apply_retention(db) if retention else []
+        logger.info(
+            "Partition maintenance completed",
+            created=created,
+            detached=detached,
+            retention_action=settings.PARTITION_RETENTION_ACTION
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error("Partition maintenance failed", error=str(e))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_partition_maintenance()
@@ -168,6 +168,11 @@ def get_lint_summary(
     ).join(Spec).join(LintResult).group_by(Project.name).order_by(func.count(LintResult.id).desc()).limit(5)
     if filters.project_id:
         project_query = project_query.filter(Project.id == filters.project_id)
+    # Bound created_at so Postgres only scans the matching monthly partitions
+    if filters.start_date:
+        project_query = project_query.filter(LintResult.created_at >= filters.start_date)
+    if filters.end_date:
+        project_query = project_query.filter(LintResult.created_at <= filters.end_date)
     for project_name, count in project_query.all():
         top_projects.append({
             "project": project_name,
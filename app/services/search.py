@@ -0,0 +1,269 @@
+"""
+Full-text search over the names and descriptions of companies, projects and specs.
+
+On Postgres each table has a GIN index on a weighted tsvector: the name is
+weight A and the description weight B (migration 2c7e9f4a6b31). Queries repeat
+DOCUMENT exactly so the planner can use those indexes, and Postgres keeps them
+current on every write.
+
+On SQLite all three tables feed one FTS5 table, search_index, which triggers on
+the source tables keep current. A database built with create_all instead of
+migrations gets the table and triggers on its first search.
+
+Every query term matches as a prefix and every term must match. Hits of all
+three types are ranked together, by ts_rank_cd or bm25, with names weighted
+above descriptions. Pages are keyset-paginated on (score, key). The key is
+id * 3 + the entity type's position in ENTITY_TYPES, which is also the FTS5
+rowid.
+
+Substring filters (ilike '%term%', as in crud.company) use trigram indexes:
+pg_trgm GIN indexes on Postgres (migration 8b1d5f3e2a97), and on SQLite FTS5
+tables with the trigram tokenizer over the same columns (TRIGRAM_COLUMNS),
+also kept current by triggers.
+
+Text extracted from spec files (app/services/spec_index.py) is indexed the
+same way: a GIN tsvector index on spec_contents.content on Postgres and the
+spec_content_index FTS5 table on SQLite.
+"""
+import base64
+import json
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, cast, func, literal_column, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.models import Company, Project, Spec
+
+logger = get_logger(__name__)
+
+ENTITY_TYPES = ("company", "project", "spec")
+
+_MODELS = (Company, Project, Spec)
+
+# Must match the indexed expression in the migration character for character
+DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+# bm25 column weights for (title, body)
+_SQLITE_WEIGHTS = (10.0, 1.0)
+
+_TERM = re.compile(r"\w+")
+
+# Source table -> columns with a SQLite trigram index, <table>_trgm
+TRIGRAM_COLUMNS = {
+    "companies": ("name", "description"),
+    "users": ("email",),
+}
+
+# Shorter terms have no trigram to look up; they fall back to a scan
+TRIGRAM_MIN_LENGTH = 3
+
+# (score, key) of the last hit on the previous page
+After = Tuple[float, int]
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def query_terms(q: str) -> List[str]:
+    return _TERM.findall(q.lower())
+
+
+def encode_cursor(score: float, key: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> After:
+    try:
+        score, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(score), int(key)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid search cursor"
+        )
+
+
+def sqlite_index_ddl() -> List[str]:
+    """Statements creating search_index and the triggers that keep it current."""
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+        "USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    for code, model in enumerate(_MODELS):
+        table = model.__tablename__
+        row = f"(new.id * 3 + {code}, new.name, new.description)"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO search_index (rowid, title, body) VALUES {row}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF name, description ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 3 + {code}; "
+            f"INSERT INTO search_index (rowid, title, body) VALUES {row}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 3 + {code}; END",
+        ]
+    return statements
+
+
+def sqlite_index_fill() -> List[str]:
+    """Statements (re)building search_index from the source tables."""
+    return ["DELETE FROM search_index"] + [
+        f"INSERT INTO search_index (rowid, title, body) "
+        f"SELECT id * 3 + {code}, name, description FROM {model.__tablename__}"
+        for code, model in enumerate(_MODELS)
+    ]
+
+
+def sqlite_trigram_ddl(table: str) -> List[str]:
+    """Statements creating <table>_trgm, an external-content trigram index, and its triggers."""
+    index = f"{table}_trgm"
+    columns = TRIGRAM_COLUMNS[table]
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    insert_new = f"INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});"
+    delete_old = f"INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} "
+        f"USING fts5({names}, content = '{table}', content_rowid = 'id', tokenize = 'trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"{delete_old} {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN {delete_old} END",
+    ]
+
+
+def sqlite_trigram_fill(table: str) -> List[str]:
+    index = f"{table}_trgm"
+    return [f"INSERT INTO {index} ({index}) VALUES ('rebuild')"]
+
+
+def sqlite_spec_content_ddl() -> List[str]:
+    """Statements creating spec_content_index over spec_contents.content, and its triggers."""
+    insert_new = "INSERT INTO spec_content_index (rowid, content) VALUES (new.spec_id, new.content);"
+    delete_old = (
+        "INSERT INTO spec_content_index (spec_content_index, rowid, content) "
+        "VALUES ('delete', old.spec_id, old.content);"
+    )
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS spec_content_index USING fts5(content, "
+        "content = 'spec_contents', content_rowid = 'spec_id', tokenize = 'unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS spec_content_index_insert AFTER INSERT ON spec_contents BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS spec_content_index_update AFTER UPDATE OF content ON spec_contents BEGIN "
+        f"{delete_old} {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS spec_content_index_delete AFTER DELETE ON spec_contents BEGIN {delete_old} END",
+    ]
+
+
+def _sqlite_indexes() -> dict:
+    # FTS5 table -> (DDL, fill) statements
+    indexes = {"search_index": (sqlite_index_ddl(), sqlite_index_fill())}
+    for table in TRIGRAM_COLUMNS:
+        indexes[f"{table}_trgm"] = (sqlite_trigram_ddl(table), sqlite_trigram_fill(table))
+    indexes["spec_content_index"] = (
+        sqlite_spec_content_ddl(),
+        ["INSERT INTO spec_content_index (spec_content_index) VALUES ('rebuild')"],
+    )
+    return indexes
+
+
+_sqlite_ready = False
+
+
+def ensure_sqlite_index(db: Session) -> None:
+    """Create and fill the FTS5 tables this SQLite database does not have yet."""
+    global _sqlite_ready
+    if _sqlite_ready:
+        return
+    # A one-off build on its own connection: request sessions are bound to a
+    # connection that may already be inside a transaction
+    engine = db.get_bind().engine
+    with engine.begin() as conn:
+        existing = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+        for name, (ddl, fill) in _sqlite_indexes().items():
+            if name in existing:
+                continue
+            for statement in ddl + fill:
+                conn.execute(text(statement))
+            logger.info("Built SQLite search index", table=name)
+    _sqlite_ready = True
+
+
+def like_pattern(term: str) -> str:
+    """'%term%' with LIKE wildcards in `term` escaped by backslash."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def trigram_phrase(term: str) -> str:
+    """FTS5 query matching `term` as a substring of a trigram-indexed column."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _postgres_hits(db: Session, terms: List[str], limit: int, after: Optional[After]) -> list:
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+    document = literal_column(DOCUMENT)
+    selects = [
+        select(
+            (model.id * 3 + code).label("key"),
+            model.name.label("name"),
+            model.description.label("description"),
+            # float4 would lose digits through the JSON cursor and break tie paging
+            cast(func.ts_rank_cd(document, tsquery), Float(53)).label("score"),
+        ).where(document.op("@@")(tsquery))
+        for code, model in enumerate(_MODELS)
+    ]
+    hits = union_all(*selects).subquery()
+    stmt = select(hits)
+    if after is not None:
+        stmt = stmt.where(or_(hits.c.score < after[0], and_(hits.c.score == after[0], hits.c.key > after[1])))
+    return db.execute(stmt.order_by(hits.c.score.desc(), hits.c.key).limit(limit)).all()
+
+
+def _sqlite_hits(db: Session, terms: List[str], limit: int, after: Optional[After]) -> list:
+    ensure_sqlite_index(db)
+    # bm25 is lower-is-better; negate it so both backends sort by score descending
+    sql = (
+        "SELECT key, name, description, score FROM ("
+        "SELECT rowid AS key, title AS name, body AS description, "
+        f"-bm25(search_index, {_SQLITE_WEIGHTS[0]}, {_SQLITE_WEIGHTS[1]}) AS score "
+        "FROM search_index WHERE search_index MATCH :match)"
+    )
+    params = {"match": " ".join(f'"{term}"*' for term in terms), "limit": limit}
+    if after is not None:
+        sql += " WHERE score < :score OR (score = :score AND key > :key)"
+        params.update(score=after[0], key=after[1])
+    return db.execute(text(sql + " ORDER BY score DESC, key LIMIT :limit"), params).all()
+
+
+def search(db: Session, q: str, limit: int, cursor: Optional[str] = None) -> dict:
+    """
+    One page of ranked hits for `q` across companies, projects and specs, as
+    the fields of SearchResults.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return {"items": [], "next_cursor": None}
+    after = decode_cursor(cursor) if cursor else None
+    fetch = _postgres_hits if _is_postgres(db) else _sqlite_hits
+    # One extra row tells whether there is a next page
+    rows = fetch(db, terms, limit + 1, after)
+    page = rows[:limit]
+    items = [
+        {
+            "type": ENTITY_TYPES[row.key % 3],
+            "id": row.key // 3,
+            "name": row.name,
+            "description": row.description,
+            "score": row.score,
+        }
+        for row in page
+    ]
+    next_cursor = encode_cursor(page[-1].score, page[-1].key) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
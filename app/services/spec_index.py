@@ -0,0 +1,593 @@
+"""
+Content index of uploaded spec files, searched by /search/specs.
+
+Text extracted from each spec's file is stored in spec_contents, one row per
+spec, with the checksum of the file it came from. Postgres indexes the text
+with a GIN tsvector index (migration 6f3b8d2e9a14) and SQLite with the
+spec_content_index FTS5 table (app/services/search.py). The database keeps
+both current on every write, so indexing a spec is a single row upsert.
+
+The extractor is picked by sniffing the file:
+- PDF ("%PDF-" header): page text via pypdf, imported on first use
+- JSON: one "path: value" line per leaf, so keys (parameter names) and values
+  (cells, corners) are both searchable
+- anything else without NUL bytes: UTF-8 text
+
+Uploads through this worker are queued when their spec is committed and
+indexed in batches on a background thread. A periodic scan queues specs that
+have no row or whose row came from a different checksum. Only one process
+scans: on Postgres, the worker holding the SCAN_LOCK_ID advisory lock, taken
+over by another worker if its connection goes away. Specs that share a file
+(same checksum) reuse the text extracted for the first one. Files that cannot
+be read are not given a row, so the next scan retries them. Files that cannot
+be extracted are recorded as unsupported or failed.
+
+Index everything missing or stale from the command line and print the
+indexing stats and index size:
+
+    python -m app.services.spec_index
+"""
+import asyncio
+import html
+import io
+import json
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Float, and_, cast, delete, func, insert, literal_column, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.models import Spec, SpecContent
+from app.db.session import SessionLocal, engine
+from app.services.search import After, decode_cursor, encode_cursor, ensure_sqlite_index, query_terms
+from app.services.storage import SPECS, ObjectNotFound, StorageError, get_storage
+from app.services.storage.compression import read_decoded
+
+logger = get_logger(__name__)
+
+INDEXED = "indexed"
+UNSUPPORTED = "unsupported"
+FAILED = "failed"
+
+# Columns of spec_contents produced by extraction, copied between specs sharing a file
+_RESULT_FIELDS = ("status", "extractor", "content", "error")
+
+# Must match the indexed expression in the migration character for character
+DOCUMENT = "to_tsvector('simple', coalesce(content, ''))"
+
+# NUL cannot be stored in Postgres text
+_STRIP = str.maketrans("", "", "\x00")
+
+# Word tokens as the indexes see them
+_TOKEN = re.compile(r"[^\W_]+")
+
+SNIPPET_CHARS = 200
+
+# Postgres advisory lock key held by the one worker that runs the periodic scan
+SCAN_LOCK_ID = 0x5bec1d3e
+
+
+class UnsupportedFile(Exception):
+    """The file holds no text this module can extract."""
+
+
+def _json_lines(value, path: str = "") -> Iterator[str]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _json_lines(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _json_lines(item, f"{path}[{i}]")
+    else:
+        leaf = value if isinstance(value, str) else json.dumps(value)
+        yield f"{path}: {leaf}" if path else leaf
+
+
+def _pdf_pages(data: bytes) -> Iterator[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedFile("PDF text extraction needs pypdf")
+    for page in PdfReader(io.BytesIO(data)).pages:
+        yield page.extract_text() or ""
+
+
+def _join_bounded(parts: Iterable[str], max_chars: int) -> str:
+    # Stops pulling parts once the text is long enough
+    kept: List[str] = []
+    size = 0
+    for part in parts:
+        kept.append(part)
+        size += len(part) + 1
+        if size >= max_chars:
+            break
+    return "\n".join(kept)[:max_chars]
+
+
+def extract_text(data: bytes, max_chars: Optional[int] = None) -> Tuple[str, str]:
+    """(extractor, text) of a spec file, cut at `max_chars`; raises UnsupportedFile for binary files."""
+    max_chars = max_chars or settings.SPEC_INDEX_MAX_CHARS
+    if b"%PDF-" in data[:1024]:
+        return "pdf", _join_bounded(_pdf_pages(data), max_chars).translate(_STRIP)
+    if data[:64].lstrip()[:1] in (b"{", b"["):
+        try:
+            document = json.loads(data)
+        except ValueError:
+            pass
+        else:
+            return "json", _join_bounded(_json_lines(document), max_chars).translate(_STRIP)
+    if b"\x00" in data[:8192]:
+        raise UnsupportedFile("Binary file")
+    # A UTF-8 character is at most 4 bytes
+    return "text", data[:max_chars * 4].decode("utf-8", errors="replace")[:max_chars].translate(_STRIP)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def stale_spec_ids(db: Session, chunk_size: int, reindex: bool = False) -> Iterator[List[int]]:
+    """
+    Ids of specs with a file and no content row, or a row extracted from
+    another checksum, in keyset chunks. With `reindex`, every spec with a file.
+    """
+    last_id = 0
+    while True:
+        stmt = (
+            select(Spec.id)
+            .outerjoin(SpecContent, SpecContent.spec_id == Spec.id)
+            .where(Spec.id > last_id, Spec.file_path.isnot(None))
+        )
+        if not reindex:
+            stmt = stmt.where(or_(
+                SpecContent.spec_id.is_(None),
+                SpecContent.checksum_sha256.is_distinct_from(Spec.checksum_sha256),
+            ))
+        ids = db.execute(stmt.order_by(Spec.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def index_size(db: Session) -> dict:
+    """Rows of spec_contents by status, and the bytes taken by the text and its index."""
+    rows = dict(db.execute(select(SpecContent.status, func.count()).group_by(SpecContent.status)).all())
+    if _is_postgres(db):
+        table_bytes, index_bytes = db.execute(text(
+            "SELECT pg_total_relation_size('spec_contents'), pg_relation_size('ix_spec_contents_content')"
+        )).one()
+    else:
+        ensure_sqlite_index(db)
+        table_bytes = db.execute(text(
+            "SELECT coalesce(sum(length(CAST(content AS BLOB))), 0) FROM spec_contents"
+        )).scalar()
+        # The FTS5 index itself lives in the b-tree blocks of its _data shadow table
+        index_bytes = db.execute(text(
+            "SELECT coalesce(sum(length(block)), 0) FROM spec_content_index_data"
+        )).scalar()
+    return {"rows": rows, "table_bytes": table_bytes, "index_bytes": index_bytes}
+
+
+class SpecIndexer:
+    """Background extraction of spec file text into spec_contents."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Holds SCAN_LOCK_ID while this process is the scanner (Postgres only)
+        self._scan_lock: Optional[Connection] = None
+        self.scanner = False
+        self.indexed = 0
+        self.shared = 0
+        self.unsupported = 0
+        self.failed = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.chars_indexed = 0
+        self.busy_seconds = 0.0
+        self.last_scan: Optional[float] = None
+        self.size: Optional[dict] = None
+
+    def enqueue(self, spec_id: int) -> None:
+        """Index `spec_id` soon. Ignored unless the indexer runs in this process; the scan catches it."""
+        if self._thread is not None:
+            self._queue.put(spec_id)
+
+    def _shared_content(self, db: Session, checksums: Set[str], exclude: List[int]) -> Dict[str, dict]:
+        """Stored extraction results of other specs with these checksums, by checksum."""
+        if not checksums:
+            return {}
+        first = (
+            select(func.min(SpecContent.spec_id))
+            .where(
+                SpecContent.checksum_sha256.in_(checksums),
+                SpecContent.spec_id.notin_(exclude),
+                SpecContent.status != FAILED,
+            )
+            .group_by(SpecContent.checksum_sha256)
+        )
+        rows = db.execute(
+            select(SpecContent.checksum_sha256, *(getattr(SpecContent, field) for field in _RESULT_FIELDS))
+            .where(SpecContent.spec_id.in_(first))
+        ).all()
+        return {row[0]: dict(zip(_RESULT_FIELDS, row[1:])) for row in rows}
+
+    async def _extract(self, spec) -> dict:
+        """Extraction result fields for `spec`'s file."""
+        if spec.size_bytes is not None and spec.size_bytes > settings.SPEC_INDEX_MAX_FILE_BYTES:
+            return {"status": UNSUPPORTED, "error": "File larger than SPEC_INDEX_MAX_FILE_BYTES"}
+        try:
+            data = await read_decoded(get_storage(SPECS), spec.file_path, spec.content_encoding)
+        except ObjectNotFound:
+            return {"status": FAILED, "error": "File not found in storage"}
+        # Other storage errors propagate: no row is written and the next scan retries
+        self.bytes_read += len(data)
+        try:
+            extractor, content = extract_text(data)
+        except UnsupportedFile as e:
+            return {"status": UNSUPPORTED, "error": str(e)}
+        except Exception as e:
+            return {"status": FAILED, "error": f"{type(e).__name__}: {e}"}
+        return {"status": INDEXED, "extractor": extractor, "content": content}
+
+    def _write(self, db: Session, rows: List[dict]) -> None:
+        db.execute(delete(SpecContent).where(SpecContent.spec_id.in_([row["spec_id"] for row in rows])))
+        db.execute(insert(SpecContent), rows)
+        db.commit()
+        for row in rows:
+            if row["status"] == INDEXED:
+                self.indexed += 1
+                self.chars_indexed += len(row["content"])
+            elif row["status"] == UNSUPPORTED:
+                self.unsupported += 1
+            else:
+                self.failed += 1
+
+    def _store(self, db: Session, rows: List[dict]) -> None:
+        """Replace the rows of a batch in one transaction, falling back to one row at a time."""
+        try:
+            self._write(db, rows)
+            return
+        except SQLAlchemyError:
+            db.rollback()
+        for row in rows:
+            try:
+                self._write(db, [row])
+                continue
+            except SQLAlchemyError as e:
+                db.rollback()
+                error = str(e)
+            if row["status"] == INDEXED:
+                # The text itself was rejected, e.g. a tsvector over the Postgres size limit
+                row.update(status=FAILED, content=None, error="Database rejected extracted text")
+                try:
+                    self._write(db, [row])
+                    continue
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    error = str(e)
+            # Usually the spec was deleted meanwhile
+            logger.warning("Failed to store spec content", spec_id=row["spec_id"], error=error)
+
+    async def index_specs(self, db: Session, spec_ids: List[int], reindex: bool = False) -> None:
+        """Index the specs in `spec_ids` whose stored text is missing or stale (all of them with `reindex`)."""
+        started = time.perf_counter()
+        try:
+            specs = db.execute(
+                select(Spec.id, Spec.file_path, Spec.checksum_sha256, Spec.size_bytes, Spec.content_encoding)
+                .where(Spec.id.in_(spec_ids), Spec.file_path.isnot(None))
+                .order_by(Spec.id)
+            ).all()
+            current = dict(db.execute(
+                select(SpecContent.spec_id, SpecContent.checksum_sha256).where(SpecContent.spec_id.in_(spec_ids))
+            ).all())
+            if not reindex:
+                specs = [spec for spec in specs if spec.id not in current or current[spec.id] != spec.checksum_sha256]
+            # Checksum -> result, from other specs' rows and then from this batch
+            results = self._shared_content(
+                db, {spec.checksum_sha256 for spec in specs if spec.checksum_sha256}, [spec.id for spec in specs]
+            )
+            indexed_at = datetime.now(timezone.utc)
+            rows = []
+            for spec in specs:
+                result = results.get(spec.checksum_sha256) if spec.checksum_sha256 else None
+                if result is not None:
+                    self.shared += 1
+                else:
+                    try:
+                        result = await self._extract(spec)
+                    except StorageError as e:
+                        self.errors += 1
+                        logger.warning("Failed to read spec file", spec_id=spec.id, error=str(e))
+                        continue
+                    if spec.checksum_sha256 and result["status"] != FAILED:
+                        results[spec.checksum_sha256] = result
+                rows.append({
+                    "spec_id": spec.id,
+                    "checksum_sha256": spec.checksum_sha256,
+                    "indexed_at": indexed_at,
+                    **{field: result.get(field) for field in _RESULT_FIELDS},
+                })
+            if rows:
+                self._store(db, rows)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+            # Release the read transaction between batches
+            db.rollback()
+
+    def backfill(self, db: Session, reindex: bool = False) -> None:
+        """Index every spec with missing or stale text, then measure the index."""
+        if not _is_postgres(db):
+            ensure_sqlite_index(db)
+        chunks = list(stale_spec_ids(db, settings.SPEC_INDEX_BATCH_SIZE, reindex))
+        db.rollback()
+        for spec_ids in chunks:
+            asyncio.run(self.index_specs(db, spec_ids, reindex))
+            if self._stop.is_set():
+                break
+        self.size = index_size(db)
+        db.rollback()
+        self.last_scan = time.time()
+
+    def _claim_scan(self) -> bool:
+        """
+        Whether this process runs the periodic scan. On Postgres, it does while
+        it holds the SCAN_LOCK_ID advisory lock on a connection of its own; the
+        server drops the lock with that connection, so another worker's next
+        attempt takes over. SQLite deployments run a single worker.
+        """
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._scan_lock is not None:
+            try:
+                self._scan_lock.execute(text("SELECT 1"))
+                self._scan_lock.commit()
+                return True
+            except SQLAlchemyError:
+                # The lock went with the connection
+                self._scan_lock.invalidate()
+                self._scan_lock.close()
+                self._scan_lock = None
+        conn = engine.connect()
+        try:
+            claimed = conn.execute(select(func.pg_try_advisory_lock(SCAN_LOCK_ID))).scalar()
+            # Session-level lock: it outlives the transaction
+            conn.commit()
+        except BaseException:
+            conn.close()
+            raise
+        if not claimed:
+            conn.close()
+            return False
+        self._scan_lock = conn
+        return True
+
+    def _release_scan(self) -> None:
+        if self._scan_lock is None:
+            return
+        try:
+            # Unlocked explicitly: the pool does not reset session-level locks
+            self._scan_lock.execute(select(func.pg_advisory_unlock(SCAN_LOCK_ID)))
+            self._scan_lock.commit()
+        except SQLAlchemyError:
+            self._scan_lock.invalidate()
+        finally:
+            self._scan_lock.close()
+            self._scan_lock = None
+
+    def _scan(self, db: Session) -> None:
+        self.scanner = self._claim_scan()
+        if self.scanner:
+            self.backfill(db)
+
+    def _index_queued(self, db: Session, spec_ids: List[int]) -> None:
+        if not _is_postgres(db):
+            ensure_sqlite_index(db)
+        asyncio.run(self.index_specs(db, spec_ids))
+
+    def start(self, scan_interval: float) -> None:
+        """Index queued uploads on a daemon thread, scanning for stale specs every `scan_interval` seconds."""
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            next_scan = time.monotonic()
+            while not self._stop.is_set():
+                if time.monotonic() >= next_scan:
+                    self._run("scan", self._scan)
+                    next_scan = time.monotonic() + scan_interval
+                    continue
+                try:
+                    spec_id = self._queue.get(timeout=max(next_scan - time.monotonic(), 0.01))
+                except queue.Empty:
+                    continue
+                batch = [spec_id]
+                while len(batch) < settings.SPEC_INDEX_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                spec_ids = [i for i in batch if i is not None]
+                if spec_ids:
+                    self._run("index", lambda db: self._index_queued(db, spec_ids))
+            self._release_scan()
+
+        self._thread = threading.Thread(target=loop, name="spec-content-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        # Wakes the thread if it is waiting on the queue
+        self._queue.put(None)
+
+    def _run(self, step: str, run: Callable[[Session], None]) -> None:
+        db = SessionLocal()
+        try:
+            run(db)
+        except Exception as e:
+            self.errors += 1
+            logger.error("Spec content indexing failed", step=step, error=str(e))
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        files = self.indexed + self.unsupported + self.failed
+        busy = self.busy_seconds
+        return {
+            "running": self._thread is not None,
+            "scanner": self.scanner,
+            "queued": self._queue.qsize(),
+            "indexed": self.indexed,
+            "shared": self.shared,
+            "unsupported": self.unsupported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+            "chars_indexed": self.chars_indexed,
+            "busy_seconds": round(busy, 3),
+            "files_per_second": round(files / busy, 1) if busy else None,
+            "mb_per_second": round(self.bytes_read / busy / 1e6, 2) if busy else None,
+            "last_scan": self.last_scan,
+            # As of the last scan
+            "index_size": self.size,
+        }
+
+
+spec_indexer = SpecIndexer()
+metrics.register("spec_index", spec_indexer.stats)
+
+
+def _term_pattern(term: str) -> str:
+    # Both indexes split words at underscores and punctuation; the last token matches as a prefix
+    tokens = _TOKEN.findall(term)
+    return r"(?<![^\W_])" + r"[\W_]+".join(map(re.escape, tokens)) + r"[^\W_]*"
+
+
+def highlight(content: Optional[str], terms: List[str], width: int = SNIPPET_CHARS) -> Optional[str]:
+    """
+    About `width` characters of `content` around the first match of any
+    term, HTML-escaped, with every match wrapped in <mark></mark>.
+    """
+    if not content:
+        return None
+    patterns = [_term_pattern(term) for term in terms if _TOKEN.search(term)]
+    if not patterns:
+        return None
+    pattern = re.compile("|".join(patterns), re.IGNORECASE)
+    first = pattern.search(content)
+    # No visible match (e.g. one found through diacritic folding): show the start
+    start = max(first.start() - width // 3, 0) if first else 0
+    window = content[start:start + width]
+    if start > 0:
+        window = window.split(None, 1)[-1]
+    if start + width < len(content):
+        window = window.rsplit(None, 1)[0]
+    window = " ".join(window.split())
+    parts = ["… "] if start > 0 else []
+    end = 0
+    for match in pattern.finditer(window):
+        parts += [html.escape(window[end:match.start()]), "<mark>", html.escape(match.group()), "</mark>"]
+        end = match.end()
+    parts.append(html.escape(window[end:]))
+    if start + width < len(content):
+        parts.append(" …")
+    return "".join(parts)
+
+
+def _postgres_hits(db: Session, terms: List[str], limit: int, after: Optional[After]) -> list:
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+    document = literal_column(DOCUMENT)
+    hits = (
+        select(
+            SpecContent.spec_id, Spec.name, Spec.version, Spec.project_id,
+            # float8 so the score survives the JSON cursor and ties page correctly
+            cast(func.ts_rank_cd(document, tsquery), Float(53)).label("score"),
+        )
+        .join(Spec, Spec.id == SpecContent.spec_id)
+        .where(document.op("@@")(tsquery))
+        .subquery()
+    )
+    stmt = select(hits)
+    if after is not None:
+        stmt = stmt.where(or_(hits.c.score < after[0], and_(hits.c.score == after[0], hits.c.spec_id > after[1])))
+    return db.execute(stmt.order_by(hits.c.score.desc(), hits.c.spec_id).limit(limit)).all()
+
+
+def _sqlite_hits(db: Session, terms: List[str], limit: int, after: Optional[After]) -> list:
+    ensure_sqlite_index(db)
+    # bm25 is lower-is-better; negated so both backends sort by score descending
+    sql = (
+        "SELECT spec_id, name, version, project_id, score FROM ("
+        "SELECT spec_content_index.rowid AS spec_id, specs.name, specs.version, specs.project_id, "
+        "-bm25(spec_content_index) AS score "
+        "FROM spec_content_index JOIN specs ON specs.id = spec_content_index.rowid "
+        "WHERE spec_content_index MATCH :match)"
+    )
+    params = {"match": " ".join(f'"{term}"*' for term in terms), "limit": limit}
+    if after is not None:
+        sql += " WHERE score < :score OR (score = :score AND spec_id > :spec_id)"
+        params.update(score=after[0], spec_id=after[1])
+    return db.execute(text(sql + " ORDER BY score DESC, spec_id LIMIT :limit"), params).all()
+
+
+def search_specs(db: Session, q: str, limit: int, cursor: Optional[str] = None) -> dict:
+    """
+    One page of specs whose file text matches every term of `q` (as a
+    prefix), best first, with a highlighted snippet; the fields of
+    SpecContentResults.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return {"items": [], "next_cursor": None}
+    after = decode_cursor(cursor) if cursor else None
+    fetch = _postgres_hits if _is_postgres(db) else _sqlite_hits
+    # One extra row tells whether there is a next page
+    rows = fetch(db, terms, limit + 1, after)
+    page = rows[:limit]
+    # Snippets are cut from the text in Python: snippet() and ts_headline re-tokenize the
+    # whole document for each row, several times slower than a regex search over it
+    contents = dict(db.execute(
+        select(SpecContent.spec_id, SpecContent.content)
+        .where(SpecContent.spec_id.in_([row.spec_id for row in page]))
+    ).all()) if page else {}
+    items = [
+        {
+            "spec_id": row.spec_id,
+            "name": row.name,
+            "version": row.version,
+            "project_id": row.project_id,
+            "snippet": highlight(contents.get(row.spec_id), terms),
+            "score": row.score,
+        }
+        for row in page
+    ]
+    next_cursor = encode_cursor(page[-1].score, page[-1].spec_id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def run_spec_index_backfill() -> None:
+    db = SessionLocal()
+    try:
+        spec_indexer.backfill(db)
+        logger.info("Spec content backfill completed", **spec_indexer.stats())
+        print(json.dumps(spec_indexer.stats(), indent=2))
+    except Exception as e:
+        db.rollback()
+        logger.error("Spec content backfill failed", error=str(e))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_spec_index_backfill()
@@ -0,0 +1,49 @@
+"""
+File storage behind one async interface.
+
+Two named stores are used by the app:
+
+- "specs": spec files uploaded through /specs (S3 by default)
+- "uploads": /specifications uploads and checklist evidence (local disk by default)
+
+Each is configured with <NAME>_STORAGE_BACKEND ("s3" or "local"); local stores
+are rooted at <NAME>_STORAGE_ROOT and S3 stores use S3_BUCKET. Keys stored in
+the database are relative to the store.
+"""
+from typing import Dict
+
+from app.core.config import settings
+from app.services.storage.base import ObjectNotFound, StorageBackend, StorageError
+from app.services.storage.local import LocalStorage
+from app.services.storage.s3 import S3Storage
+
+SPECS = "specs"
+UPLOADS = "uploads"
+
+_stores: Dict[str, StorageBackend] = {}
+
+
+def _build(name: str) -> StorageBackend:
+    backend = getattr(settings, f"{name.upper()}_STORAGE_BACKEND")
+    if backend == "s3":
+        return S3Storage(settings.S3_BUCKET)
+    if backend == "local":
+        return LocalStorage(getattr(settings, f"{name.upper()}_STORAGE_ROOT"))
+    raise ValueError(f"Unknown storage backend for {name}: {backend}")
+
+
+def get_storage(name: str) -> StorageBackend:
+    if name not in _stores:
+        _stores[name] = _build(name)
+    return _stores[name]
+
+
+def set_storage(name: str, backend: StorageBackend) -> None:
+    """Replace a store, e.g. with a local or in-memory one for tests and benchmarks."""
+    _stores[name] = backend
+
+
+__all__ = [
+    "SPECS", "UPLOADS", "get_storage", "set_storage",
+    "StorageBackend", "StorageError", "ObjectNotFound", "LocalStorage", "S3Storage",
+]
@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, BinaryIO, Dict, Optional
+
+
+class StorageError(Exception):
+    """A storage backend operation failed."""
+
+
+class ObjectNotFound(StorageError):
+    """The requested key does not exist."""
+
+
+class StorageBackend(ABC):
+    """
+    Async interface to a blob store. Keys are "/"-separated relative paths.
+
+    Drivers do their blocking I/O on the threadpool, so callers can use them
+    from async endpoints without stalling the event loop.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes) -> None:
+        """Store `data` under `key`, replacing any existing object."""
+
+    @abstractmethod
+    async def put_file(self, key: str, source: BinaryIO) -> None:
+        """Store the rest of a binary file object, read in chunks; memory use is bounded."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Whole object; only for files known to be small."""
+
+    @abstractmethod
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Object bytes `start`..`end` (inclusive, None for the end of the object) in chunks."""
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        """Object size in bytes; raises ObjectNotFound."""
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.size(key)
+        except ObjectNotFound:
+            return False
+        return True
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete `key`; deleting a missing key is not an error."""
+
+    @abstractmethod
+    async def copy(self, source_key: str, dest_key: str) -> None:
+        """Copy an object within this store, server-side where the backend allows it."""
+
+    @abstractmethod
+    def presign(self, key: str, expires_in: int, content_disposition: Optional[str] = None) -> Optional[str]:
+        """
+        Time-limited direct download URL, or None if the backend cannot issue
+        one. Signing is local CPU work, so unlike the rest this is synchronous.
+        `content_disposition` is sent back with the object, e.g. to name the
+        downloaded file.
+        """
+
+    # Direct client uploads (presigned). Backends that cannot accept them keep
+    # these defaults, and clients upload through the API instead.
+
+    def presign_put(self, key: str, expires_in: int, checksum_sha256: str) -> Optional[Dict[str, str]]:
+        """
+        URL the client PUTs the whole object to, plus the headers it must send.
+        The store itself rejects a body whose SHA-256 differs from `checksum_sha256`.
+        Returns None if the backend cannot issue one.
+        """
+        return None
+
+    async def create_multipart_upload(self, key: str) -> str:
+        """Start a multipart upload for presigned parts; returns its upload id."""
+        raise StorageError(f"{self.name} storage does not support multipart uploads")
+
+    def presign_upload_part(self, key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        raise StorageError(f"{self.name} storage does not support multipart uploads")
+
+    async def complete_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Assemble every part the store received, in part-number order."""
+        raise StorageError(f"{self.name} storage does not support multipart uploads")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        raise StorageError(f"{self.name} storage does not support multipart uploads")
+
+    async def verified_sha256(self, key: str) -> Optional[str]:
+        """Hex SHA-256 of the whole object as checked by the store on upload, if it keeps one."""
+        return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of `key` if the backend is disk-backed, for zero-copy sends."""
+        return None
@@ -0,0 +1,78 @@
+"""
+Optional zstd compression of stored objects.
+
+A store with <NAME>_STORAGE_COMPRESSION = "zstd" compresses blobs on write
+(see app/services/blobs.py), at STORAGE_COMPRESSION_LEVEL. Only uploads whose
+rows record the encoding ask for it: specs and specifications. Checklist
+evidence is always stored as-is. The encoding is recorded on the blob and on
+the rows that point at it, and readers decode while streaming. Objects with no
+recorded encoding are read as-is. That covers files stored before compression
+was enabled, files that did not get smaller and direct uploads.
+
+zstandard is only imported once something is compressed or decompressed.
+"""
+import tempfile
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+ZSTD = "zstd"
+
+ENCODINGS = (ZSTD,)
+
+
+def _zstandard():
+    import zstandard
+    return zstandard
+
+
+def compression_for(store: str) -> Optional[str]:
+    """Encoding new blobs in `store` are written with, or None."""
+    encoding = getattr(settings, f"{store.upper()}_STORAGE_COMPRESSION", None)
+    if not encoding or encoding == "none":
+        return None
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown storage compression for {store}: {encoding}")
+    return encoding
+
+
+def compress_file(source: BinaryIO, size: int, level: Optional[int] = None) -> Tuple[BinaryIO, int]:
+    """
+    zstd-compress `source` from the start into a spooled temp file; returns it
+    rewound, with its size. Blocking: run it on the threadpool.
+    """
+    if level is None:
+        level = settings.STORAGE_COMPRESSION_LEVEL
+    out = tempfile.SpooledTemporaryFile(max_size=settings.STORAGE_CHUNK_SIZE)
+    source.seek(0)
+    _, written = _zstandard().ZstdCompressor(level=level).copy_stream(
+        source, out, size=size, read_size=settings.STORAGE_CHUNK_SIZE, write_size=settings.STORAGE_CHUNK_SIZE
+    )
+    source.seek(0)
+    out.seek(0)
+    return out, written
+
+
+async def decode_stream(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Decoded bytes of a stored object's chunks; unencoded objects pass through."""
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown content encoding: {encoding}")
+    decompressor = _zstandard().ZstdDecompressor().decompressobj()
+    async for chunk in chunks:
+        # zstandard releases the GIL, so decompression runs off the event loop
+        data = await run_in_threadpool(decompressor.decompress, chunk)
+        if data:
+            yield data
+
+
+async def read_decoded(storage, key: str, encoding: Optional[str]) -> bytes:
+    """Whole decoded object; only for files known to be small."""
+    if encoding is None:
+        return await storage.get(key)
+    return b"".join([chunk async for chunk in decode_stream(storage.stream(key), encoding)])
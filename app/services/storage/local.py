@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, BinaryIO, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.storage.base import ObjectNotFound, StorageBackend, StorageError
+
+
+class LocalStorage(StorageBackend):
+    """Files under a root directory; for on-prem deployments, development and tests."""
+
+    name = "local"
+
+    def __init__(self, root: str, chunk_size: Optional[int] = None) -> None:
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size or settings.STORAGE_CHUNK_SIZE
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise StorageError(f"Key escapes storage root: {key}")
+        return path
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def _write(self, key: str, write) -> None:
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Temp file in the target directory, then an atomic rename: readers
+        # never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                write(out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    async def put(self, key: str, data: bytes) -> None:
+        await run_in_threadpool(self._write, key, lambda out: out.write(data))
+
+    async def put_file(self, key: str, source: BinaryIO) -> None:
+        await run_in_threadpool(
+            self._write, key, lambda out: shutil.copyfileobj(source, out, self.chunk_size)
+        )
+
+    def _read(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    async def get(self, key: str) -> bytes:
+        return await run_in_threadpool(self._read, key)
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            f = await run_in_threadpool(open, self._path(key), "rb")
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+        try:
+            await run_in_threadpool(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = await run_in_threadpool(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(f.close)
+
+    async def size(self, key: str) -> int:
+        try:
+            return (await run_in_threadpool(os.stat, self._path(key))).st_size
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    def _remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self._remove, key)
+
+    def _copy(self, source_key: str, dest_key: str) -> None:
+        try:
+            with open(self._path(source_key), "rb") as source:
+                self._write(dest_key, lambda out: shutil.copyfileobj(source, out, self.chunk_size))
+        except FileNotFoundError:
+            raise ObjectNotFound(source_key)
+
+    async def copy(self, source_key: str, dest_key: str) -> None:
+        await run_in_threadpool(self._copy, source_key, dest_key)
+
+    def presign(self, key: str, expires_in: int, content_disposition: Optional[str] = None) -> Optional[str]:
+        return None
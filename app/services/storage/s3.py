@@ -0,0 +1,205 @@
+import asyncio
+import base64
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.storage.base import ObjectNotFound, StorageBackend, StorageError
+
+logger = get_logger(__name__)
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+_NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+@lru_cache(maxsize=None)
+def shared_client():
+    """One S3 client per process; its connection pool is shared by every S3Storage."""
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        config=Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": 5, "mode": "adaptive"}
+        )
+    )
+
+
+def _translate(error: ClientError, key: str) -> StorageError:
+    if error.response.get("Error", {}).get("Code") in _NOT_FOUND_CODES:
+        return ObjectNotFound(key)
+    return StorageError(str(error))
+
+
+class S3Storage(StorageBackend):
+    """
+    S3 (or S3-compatible, via S3_ENDPOINT_URL) bucket. Large files go up as
+    multipart uploads of S3_MULTIPART_PART_SIZE parts, with at most
+    S3_UPLOAD_CONCURRENCY parts in flight, so memory per upload is bounded
+    by part size x concurrency.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, client=None, part_size: Optional[int] = None, concurrency: Optional[int] = None) -> None:
+        self.bucket = bucket
+        self.client = client or shared_client()
+        self.part_size = max(part_size or settings.S3_MULTIPART_PART_SIZE, MIN_PART_SIZE)
+        self.concurrency = concurrency or settings.S3_UPLOAD_CONCURRENCY
+        self.chunk_size = settings.STORAGE_CHUNK_SIZE
+
+    async def _call(self, method: str, key: str, **kwargs):
+        try:
+            return await run_in_threadpool(getattr(self.client, method), Bucket=self.bucket, Key=key, **kwargs)
+        except ClientError as e:
+            raise _translate(e, key)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await self._call("put_object", key, Body=data)
+
+    async def put_file(self, key: str, source: BinaryIO) -> None:
+        chunk = await run_in_threadpool(source.read, self.part_size)
+        if len(chunk) < self.part_size:
+            await self._call("put_object", key, Body=chunk)
+            return
+
+        upload_id = (await self._call("create_multipart_upload", key))["UploadId"]
+        parts: List[dict] = []
+        in_flight: List[asyncio.Task] = []
+        try:
+            while chunk:
+                part_number = len(parts) + len(in_flight) + 1
+                in_flight.append(asyncio.create_task(
+                    self._call("upload_part", key, UploadId=upload_id, PartNumber=part_number, Body=chunk)
+                ))
+                if len(in_flight) >= self.concurrency:
+                    oldest = in_flight.pop(0)
+                    parts.append({"PartNumber": len(parts) + 1, "ETag": (await oldest)["ETag"]})
+                chunk = await run_in_threadpool(source.read, self.part_size)
+            for task in in_flight:
+                parts.append({"PartNumber": len(parts) + 1, "ETag": (await task)["ETag"]})
+            in_flight = []
+            await self._call(
+                "complete_multipart_upload", key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            # Includes cancellation when the client disconnects mid-upload
+            for task in in_flight:
+                task.cancel()
+            try:
+                await self._call("abort_multipart_upload", key, UploadId=upload_id)
+            except Exception as e:
+                logger.error("Failed to abort multipart upload", key=key, upload_id=upload_id, error=str(e))
+            raise
+
+    async def get(self, key: str) -> bytes:
+        response = await self._call("get_object", key)
+        return await run_in_threadpool(response["Body"].read)
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        kwargs = {}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self._call("get_object", key, **kwargs)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await run_in_threadpool(body.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def size(self, key: str) -> int:
+        return (await self._call("head_object", key))["ContentLength"]
+
+    async def delete(self, key: str) -> None:
+        await self._call("delete_object", key)
+
+    async def copy(self, source_key: str, dest_key: str) -> None:
+        await self._call("copy_object", dest_key, CopySource={"Bucket": self.bucket, "Key": source_key})
+
+    def presign(self, key: str, expires_in: int, content_disposition: Optional[str] = None) -> Optional[str]:
+        params = {'Bucket': self.bucket, 'Key': key}
+        if content_disposition:
+            # Signed into the URL; S3 returns it as the Content-Disposition header
+            params['ResponseContentDisposition'] = content_disposition
+        try:
+            return self.client.generate_presigned_url(
+                'get_object',
+                Params=params,
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error("Failed to presign URL", key=key, error=str(e))
+            return None
+
+    def presign_put(self, key: str, expires_in: int, checksum_sha256: str) -> Optional[Dict[str, str]]:
+        # The checksum is part of the signature, and S3 verifies the body against it
+        checksum = base64.b64encode(bytes.fromhex(checksum_sha256)).decode()
+        try:
+            url = self.client.generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': self.bucket,
+                    'Key': key,
+                    'ChecksumAlgorithm': 'SHA256',
+                    'ChecksumSHA256': checksum,
+                },
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error("Failed to presign upload URL", key=key, error=str(e))
+            return None
+        return {"url": url, "headers": {"x-amz-checksum-sha256": checksum}}
+
+    async def create_multipart_upload(self, key: str) -> str:
+        return (await self._call("create_multipart_upload", key))["UploadId"]
+
+    def presign_upload_part(self, key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        try:
+            return self.client.generate_presigned_url(
+                'upload_part',
+                Params={'Bucket': self.bucket, 'Key': key, 'UploadId': upload_id, 'PartNumber': part_number},
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            raise StorageError(str(e))
+
+    async def complete_multipart_upload(self, key: str, upload_id: str) -> None:
+        # Take the part list from S3 rather than the client
+        parts: List[dict] = []
+        marker = 0
+        while True:
+            response = await self._call("list_parts", key, UploadId=upload_id, PartNumberMarker=marker)
+            parts.extend({"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in response.get("Parts", []))
+            if not response.get("IsTruncated"):
+                break
+            marker = response["NextPartNumberMarker"]
+        if not parts:
+            raise StorageError(f"No parts uploaded for {key}")
+        await self._call(
+            "complete_multipart_upload", key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        await self._call("abort_multipart_upload", key, UploadId=upload_id)
+
+    async def verified_sha256(self, key: str) -> Optional[str]:
+        checksum = (await self._call("head_object", key, ChecksumMode="ENABLED")).get("ChecksumSHA256")
+        # Multipart objects carry a checksum of part checksums ("...-N"), not of the content
+        if not checksum or "-" in checksum:
+            return None
+        return base64.b64decode(checksum).hex()
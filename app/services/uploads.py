@@ -0,0 +1,42 @@
+"""
+Helpers for request uploads.
+
+FastAPI spools uploaded files to a temp file, so they can be hashed with a
+chunked read (off the event loop) before deciding whether and where to store
+them; see app/services/blobs.py.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+@dataclass
+class UploadResult:
+    key: str  # Storage key
+    size_bytes: int
+    checksum_sha256: str
+    content_encoding: Optional[str] = None  # As stored; the size and checksum are of the original bytes
+
+
+def _hash_file(source, chunk_size: int) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    return digest.hexdigest(), size
+
+
+async def hash_upload(file: UploadFile) -> Tuple[str, int]:
+    """SHA-256 and size of an upload, read from its spooled temp file on the threadpool."""
+    return await run_in_threadpool(_hash_file, file.file, settings.STORAGE_CHUNK_SIZE)
@@ -1,97 +1,223 @@
+"""
+Consistency check between evidence files on disk and checklist items.
+
+It runs on a background thread after startup, so workers are ready straight
+away. The evidence directory is read with scandir and the database column in
+keyset-paginated chunks, so memory use is bounded by the number of paths and
+not by ORM objects. A manifest of every file's mtime and size is saved after
+each run. When the directory's mtime has not changed, the next run takes the
+file list from the manifest and does not list the directory. Otherwise only
+files missing from the manifest are stat'ed.
+"""
+import json
 import os
-import logging
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models import ActiveChecklistItem
+
+from app.core import metrics
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.db.models import ActiveChecklistItem
+from app.db.session import SessionLocal
+from app.services.storage import UPLOADS, get_storage
 
 logger = get_logger(__name__)
 
-def sync_files_and_db():
-    """Sync files on disk with database entries on startup."""
+EVIDENCE_PREFIX = "uploads/checklist_evidence"
+
+# File name -> (mtime_ns, size)
+FileEntries = Dict[str, Tuple[int, int]]
+
+_last_run: dict = {}
+
+
+def _evidence_dir() -> Optional[str]:
+    # Only a local uploads store has a directory to scan
+    return get_storage(UPLOADS).local_path(EVIDENCE_PREFIX)
+
+
+def _manifest_path(evidence_dir: str) -> str:
+    # Next to the directory, not in it: writing it must not change the directory's mtime
+    parent, name = os.path.split(evidence_dir.rstrip(os.sep))
+    return settings.FILE_SYNC_MANIFEST_PATH or os.path.join(parent, f".{name}.manifest.json")
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("prefix") == EVIDENCE_PREFIX else {}
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-", suffix=".part")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def scan_files(evidence_dir: str, previous: FileEntries) -> Tuple[FileEntries, int]:
+    """
+    Regular files in `evidence_dir`, streamed with scandir. Entries already in
+    `previous` keep their recorded mtime and size; only new names are stat'ed.
+    Dotfiles (in-progress uploads) are skipped. Returns the entries and how
+    many files were stat'ed.
+    """
+    entries: FileEntries = {}
+    stat_count = 0
+    with os.scandir(evidence_dir) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.name in previous:
+                entries[entry.name] = previous[entry.name]
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            stat_count += 1
+            entries[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return entries, stat_count
+
+
+def iter_evidence_paths(db: Session, chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Every evidence_file_path, fetched by primary key in chunks of `chunk_size` rows."""
+    chunk_size = chunk_size or settings.FILE_SYNC_CHUNK_SIZE
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(ActiveChecklistItem.id, ActiveChecklistItem.evidence_file_path)
+            .where(ActiveChecklistItem.evidence_file_path.isnot(None), ActiveChecklistItem.id > last_id)
+            .order_by(ActiveChecklistItem.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        for _, path in rows:
+            yield path
+        last_id = rows[-1][0]
+
+
+def _sample(paths: Set[str]) -> List[str]:
+    return sorted(paths)[:settings.FILE_SYNC_LOG_SAMPLE_SIZE]
+
+
+def sync_files_and_db() -> None:
+    """Report evidence files with no checklist item and items whose file is missing."""
+    started = time.perf_counter()
+    db = SessionLocal()
     try:
-        # Get database session
-        db = next(get_db())
-        
-        # Scan evidence files directory
-        evidence_dir = "uploads/checklist_evidence"
+        evidence_dir = _evidence_dir()
+        if evidence_dir is None:
+            logger.info("File sync skipped: uploads store is not on local disk")
+            return
         if not os.path.exists(evidence_dir):
             os.makedirs(evidence_dir, exist_ok=True)
             logger.info("Created evidence directory", path=evidence_dir)
             return
-        
-        # Get all files in evidence directory
-        files_on_disk = set()
-        for filename in os.listdir(evidence_dir):
-            file_path = os.path.join(evidence_dir, filename)
-            if os.path.isfile(file_path):
-                files_on_disk.add(file_path)
-        
-        # Get all file paths from database
-        db_items = db.query(ActiveChecklistItem).filter(
-            ActiveChecklistItem.evidence_file_path.isnot(None)
-        ).all()
-        files_in_db = {item.evidence_file_path for item in db_items if item.evidence_file_path}
-        
-        # Find orphaned files (on disk but not in DB)
-        orphaned_files = files_on_disk - files_in_db
-        if orphaned_files:
-            logger.warning(
-                "Found orphaned evidence files",
-                count=len(orphaned_files),
-                files=list(orphaned_files)
-            )
-        
-        # Find missing files (in DB but not on disk)
-        missing_files = files_in_db - files_on_disk
-        if missing_files:
-            logger.warning(
-                "Found missing evidence files",
-                count=len(missing_files),
-                files=list(missing_files)
-            )
-        
-        # Log summary
-        logger.info(
-            "File sync completed",
-            total_files_on_disk=len(files_on_disk),
-            total_files_in_db=len(files_in_db),
-            orphaned_files=len(orphaned_files),
-            missing_files=len(missing_files)
+
+        manifest_path = _manifest_path(evidence_dir)
+        manifest = load_manifest(manifest_path)
+        previous = {name: tuple(entry) for name, entry in manifest.get("files", {}).items()}
+        dir_mtime_ns = os.stat(evidence_dir).st_mtime_ns
+        if previous and manifest.get("dir_mtime_ns") == dir_mtime_ns:
+            # No file was added, removed or replaced since the last run
+            files, stat_count, scanned = previous, 0, False
+        else:
+            files, stat_count = scan_files(evidence_dir, previous)
+            scanned = True
+
+        on_disk = {f"{EVIDENCE_PREFIX}/{name}" for name in files}
+        in_db: Set[str] = set()
+        missing: Set[str] = set()
+        for path in iter_evidence_paths(db):
+            in_db.add(path)
+            if path not in on_disk:
+                missing.add(path)
+        orphaned = on_disk - in_db
+
+        if scanned:
+            save_manifest(manifest_path, {
+                "prefix": EVIDENCE_PREFIX,
+                "dir_mtime_ns": dir_mtime_ns,
+                "files": files,
+                "synced_at": time.time(),
+            })
+
+        if orphaned:
+            logger.warning("Found orphaned evidence files", count=len(orphaned), sample=_sample(orphaned))
+        if missing:
+            logger.warning("Found missing evidence files", count=len(missing), sample=_sample(missing))
+        _last_run.clear()
+        _last_run.update(
+            finished_at=time.time(),
+            duration_seconds=round(time.perf_counter() - started, 3),
+            files_on_disk=len(on_disk),
+            files_in_db=len(in_db),
+            orphaned_files=len(orphaned),
+            missing_files=len(missing),
+            directory_scanned=scanned,
+            files_statted=stat_count,
         )
-        
+        logger.info("File sync completed", **_last_run)
+
     except Exception as e:
+        _last_run.update(finished_at=time.time(), error=str(e))
         logger.error("File sync failed", error=str(e))
     finally:
         db.close()
 
+
+def start_file_sync() -> threading.Thread:
+    """Run sync_files_and_db once on a daemon thread; startup does not wait for it."""
+    thread = threading.Thread(target=sync_files_and_db, name="evidence-file-sync", daemon=True)
+    thread.start()
+    return thread
+
+
 def cleanup_orphaned_files():
     """Optional: Clean up orphaned files (use with caution)."""
+    db = SessionLocal()
     try:
-        evidence_dir = "uploads/checklist_evidence"
-        if not os.path.exists(evidence_dir):
+        evidence_dir = _evidence_dir()
+        if evidence_dir is None or not os.path.exists(evidence_dir):
             return
-        
-        db = next(get_db())
-        
-        # Get all file paths from database
-        db_items = db.query(ActiveChecklistItem).filter(
-            ActiveChecklistItem.evidence_file_path.isnot(None)
-        ).all()
-        files_in_db = {item.evidence_file_path for item in db_items if item.evidence_file_path}
-        
+
+        files_in_db = set(iter_evidence_paths(db))
+
         # Find and remove orphaned files
         orphaned_count = 0
-        for filename in os.listdir(evidence_dir):
-            file_path = os.path.join(evidence_dir, filename)
-            if os.path.isfile(file_path) and file_path not in files_in_db:
-                os.remove(file_path)
+        files, _ = scan_files(evidence_dir, {})
+        for name in files:
+            if f"{EVIDENCE_PREFIX}/{name}" not in files_in_db:
+                os.remove(os.path.join(evidence_dir, name))
                 orphaned_count += 1
-        
+
         if orphaned_count > 0:
             logger.info("Cleaned up orphaned files", count=orphaned_count)
-        
+
     except Exception as e:
         logger.error("Cleanup failed", error=str(e))
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+metrics.register("file_sync", lambda: dict(_last_run))
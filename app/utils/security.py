@@ -1,15 +1,20 @@
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import hmac
+import time
+import uuid
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.password_hashing import pwd_context
+from app.core.api_key_usage import api_key_usage
+from app.core.revocation import revocation_filter
+from app.core.user_cache import AuthenticatedUser, api_key_cache, user_cache
+from app.crud import api_key as crud_api_key
 from app.db.session import get_db
 from app.services import auth as auth_service
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
@@ -19,27 +24,102 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
+def _encode_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    expire = datetime.utcnow() + expires_delta
+    # iat keeps sub-second precision so a token issued right after a password
+    # reset is not mistaken for one issued before it
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex, "type": token_type})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+def create_access_token(data: dict, expires_delta: timedelta = None):
+    return _encode_token(
+        data, "access", expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+def create_refresh_token(data: dict):
+    return _encode_token(data, "refresh", timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str, token_type: str = "access") -> dict:
+    """Validate signature, expiry, token type and revocation; returns the payload."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    user = auth_service.get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
-    return user 
\ No newline at end of file
+        raise _credentials_exception()
+    # Tokens issued before refresh tokens existed carry no type and are access tokens
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise _credentials_exception()
+    if revocation_filter.is_revoked(payload.get("jti")):
+        raise _credentials_exception()
+    return payload
+
+def issued_before_reset(payload: dict, user: AuthenticatedUser) -> bool:
+    """True if the token predates the user's last password reset (tokens without iat always do)."""
+    if user.tokens_valid_after is None:
+        return False
+    return float(payload.get("iat", 0)) < user.tokens_valid_after
+
+def revoke_token(payload: dict) -> None:
+    """Revoke a decoded token until it would have expired anyway."""
+    if payload.get("jti"):
+        revocation_filter.revoke(payload["jti"], float(payload["exp"]))
+
+def consume_refresh_token(payload: dict) -> bool:
+    """Use up a decoded refresh token; False if it was already used (or logged out)."""
+    if not payload.get("jti"):
+        return False
+    return revocation_filter.consume(payload["jti"], float(payload["exp"]))
+
+def get_user_from_api_key(db: Session, key: str) -> AuthenticatedUser:
+    """Resolve an API key to its owner: prefix lookup plus HMAC check, cached by key hash."""
+    prefix = crud_api_key.parse_key(key)
+    if prefix is None:
+        raise _credentials_exception()
+    key_hash = crud_api_key.hash_key(key)
+    cached = api_key_cache.get(key_hash)
+    if cached is not None:
+        return cached
+    row = crud_api_key.get_api_key_with_user(db, prefix)
+    if row is None or not hmac.compare_digest(row.ApiKey.key_hash, key_hash) or not row.User.is_active:
+        raise _credentials_exception()
+    ttl = None
+    if row.ApiKey.expires_at is not None:
+        expires_at = row.ApiKey.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if ttl <= 0:
+            raise _credentials_exception()
+    current_user = AuthenticatedUser.from_user(row.User)
+    # last_used_at is only recorded on cache misses, i.e. at most once per TTL per key,
+    # and written later on another connection
+    api_key_usage.record(row.ApiKey.id)
+    api_key_cache.set(key_hash, current_user, ttl_seconds=ttl)
+    return current_user
+
+def get_user_from_token(db: Session, token: str) -> AuthenticatedUser:
+    """Resolve a bearer token (JWT or API key) to its user, serving repeat lookups from cache."""
+    if token.startswith(crud_api_key.KEY_SCHEME):
+        return get_user_from_api_key(db, token)
+    payload = decode_token(token)
+    email: str = payload["sub"]
+    current_user = user_cache.get(email)
+    if current_user is None:
+        user = auth_service.get_user_by_email(db, email=email)
+        if user is None:
+            raise _credentials_exception()
+        current_user = AuthenticatedUser.from_user(user)
+        user_cache.set(email, current_user)
+    if issued_before_reset(payload, current_user):
+        raise _credentials_exception()
+    return current_user
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    return get_user_from_token(db, token) 
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Time active checklist instantiation from a large template.
+
+Compares the previous per-item ORM loop with the single INSERT ... SELECT used by
+app.crud.checklist, and the bulk variant that instantiates one template for many specs.
+
+    python -m benchmarks.checklist_instantiation --items 5000 --specs 20
+    python -m benchmarks.checklist_instantiation --database-url postgresql://localhost/tapeout_bench
+
+Point --database-url at a scratch database; tables are created if missing.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import ChecklistTemplate, ChecklistItem, ActiveChecklist, ActiveChecklistItem
+from app.crud import checklist as crud_checklist
+from app.schemas.checklist_template import ActiveChecklistCreate, ActiveChecklistBulkCreate
+
+
+def seed_template(db, item_count: int) -> int:
+    template = ChecklistTemplate(name=f"Sign-off ({item_count} items)", created_by="bench")
+    db.add(template)
+    db.flush()
+    db.bulk_insert_mappings(ChecklistItem, [
+        {"template_id": template.id, "title": f"Check {i}", "order": i}
+        for i in range(item_count)
+    ])
+    db.commit()
+    return template.id
+
+
+def legacy_instantiate(db, template_id: int) -> ActiveChecklist:
+    """The pre-existing implementation: two commits and one ORM object per item."""
+    db_checklist = ActiveChecklist(template_id=template_id, linked_spec_id="legacy")
+    db.add(db_checklist)
+    db.commit()
+    db.refresh(db_checklist)
+    template_items = db.query(ChecklistItem).filter(ChecklistItem.template_id == template_id).all()
+    for template_item in template_items:
+        db.add(ActiveChecklistItem(
+            checklist_id=db_checklist.id,
+            template_item_id=template_item.id,
+            status="pending"
+        ))
+    db.commit()
+    return db_checklist
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--specs", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        template_id = seed_template(db, args.items)
+        results = {
+            "items": args.items,
+            "specs": args.specs,
+            "legacy_orm_loop_ms": timed(legacy_instantiate, db, template_id),
+            "insert_select_ms": timed(
+                crud_checklist.instantiate_active_checklist,
+                db,
+                ActiveChecklistCreate(template_id=template_id, linked_spec_id="single")
+            ),
+            "bulk_insert_select_ms": timed(
+                crud_checklist.instantiate_active_checklists_for_specs,
+                db,
+                ActiveChecklistBulkCreate(
+                    template_id=template_id,
+                    linked_spec_ids=[f"spec-{i}" for i in range(args.specs)]
+                )
+            ),
+        }
+        print(json.dumps(results, indent=2))
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
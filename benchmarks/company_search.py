@@ -0,0 +1,189 @@
+"""
+Latency of the company search filter at scale.
+
+Seeds --rows users and --rows companies (1M each by default), each company
+owned by a random user. It then times crud.company.get_companies(search=...)
+against the old query, an outer join with ilike '%term%' OR'ed over name,
+description and owner email. Terms cover a common word, a selective name
+suffix, an owner email, a miss and a two-letter term, which is too short for a
+trigram lookup. The report includes the query plan of each strategy for the
+selective term.
+
+    python -m benchmarks.company_search --database-url sqlite:///companies.db
+    python -m benchmarks.company_search --database-url postgresql://localhost/tapeout_bench --rows 1000000
+
+Seeding 1M rows takes a few minutes. Pass --skip-seed to reuse a database
+seeded by an earlier run. Use an empty scratch database: ids are assigned up
+front.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import event, or_, text
+from sqlalchemy.orm import Session
+
+from benchmarks.datagen import WORDS, _bulk_insert, _name, _reset_sequences
+from benchmarks.runner import git_commit, percentile
+
+LIMIT = 100
+
+
+def seed(db: Session, rows: int, seed_value: int) -> None:
+    from app.db.models import Company, User
+
+    rng = random.Random(seed_value)
+    for start in range(1, rows + 1, 100000):
+        batch = range(start, min(start + 100000, rows + 1))
+        _bulk_insert(db, User, [
+            {"id": i, "email": f"{rng.choice(WORDS)}.{i}@vendor{i % 997}.example.com", "hashed_password": "!",
+             "full_name": _name(rng), "role": "engineer", "is_active": True, "is_superuser": False}
+            for i in batch
+        ])
+        _bulk_insert(db, Company, [
+            {"id": i, "name": f"{_name(rng)} {i}", "description": f"{_name(rng, 4)} vendor",
+             "owner_id": rng.randint(1, rows), "status": "Active"}
+            for i in batch
+        ])
+        db.commit()
+    _reset_sequences(db)
+    db.commit()
+
+
+def legacy_query(db: Session, search: str) -> list:
+    """The query get_companies ran before the trigram indexes."""
+    from app.db.models import Company, User
+
+    pattern = f"%{search}%"
+    return (
+        db.query(Company)
+        .join(User, Company.owner_id == User.id, isouter=True)
+        .filter(or_(Company.name.ilike(pattern), Company.description.ilike(pattern), User.email.ilike(pattern)))
+        .limit(LIMIT)
+        .all()
+    )
+
+
+def indexed_query(db: Session, search: str) -> list:
+    from app.crud.company import get_companies
+
+    return get_companies(db, limit=LIMIT, search=search)
+
+
+def explain(db: Session, run: Callable[[Session, str], list], search: str) -> List[str]:
+    """Plan lines of the SELECT `run` issues for `search`."""
+    statements: List[str] = []
+    parameters: List = []
+    engine = db.get_bind()
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not statements:
+            statements.append(statement)
+            parameters.append(params)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run(db, search)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    if not statements:
+        return []
+    prefix = "EXPLAIN " if engine.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statements[0], parameters[0]).all()
+    return [str(row[-1]) for row in rows]
+
+
+def run_term(db: Session, run: Callable[[Session, str], list], search: str, repeats: int) -> dict:
+    latencies = []
+    matches = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        matches = len(run(db, search))
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+    return {
+        "matches": matches,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Users and companies to seed (each)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse rows from an earlier run")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per term and strategy")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    from benchmarks.env import configure
+    configure(args.database_url)
+
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.services.search import ensure_sqlite_index
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if engine.dialect.name == "sqlite":
+            # Triggers fill the trigram tables while seeding
+            ensure_sqlite_index(db)
+        if not args.skip_seed:
+            started = time.perf_counter()
+            seed(db, args.rows, args.seed)
+            seeded_seconds = round(time.perf_counter() - started, 1)
+        else:
+            seeded_seconds = None
+        if engine.dialect.name == "postgresql":
+            db.execute(text("ANALYZE companies"))
+            db.execute(text("ANALYZE users"))
+            db.commit()
+
+        from app.db.models import Company
+        selective = args.rows // 2 + 7
+        owner_id = db.get(Company, selective).owner_id
+        terms = {
+            "common_word": "serdes",
+            "selective_name": f" {selective}",
+            "owner_email": f".{owner_id}@vendor",
+            "miss": "zzqx",
+            "short": "io",
+        }
+        strategies: Dict[str, Callable[[Session, str], list]] = {"legacy": legacy_query, "indexed": indexed_query}
+        results = {
+            name: {term_name: run_term(db, run, term, args.repeats) for term_name, term in terms.items()}
+            for name, run in strategies.items()
+        }
+        plans = {name: explain(db, run, terms["selective_name"]) for name, run in strategies.items()}
+    finally:
+        db.close()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "target": args.database_url.split("@")[-1],
+            "dialect": engine.dialect.name,
+            "rows": args.rows,
+            "seed_seconds": seeded_seconds,
+            "limit": LIMIT,
+            "repeats": args.repeats,
+        },
+        "strategies": results,
+        "plans": plans,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare two benchmarks.runner reports and flag latency regressions.
+
+    python -m benchmarks.compare base.json head.json --metric p95_ms --threshold 10
+
+Exits with status 1 if any route's metric got worse by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", default="p95_ms", choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    regressions = []
+    print(f"{'route':<24} {'base':>10} {'head':>10} {'change':>9}   (metric: {args.metric})")
+    for route, head_stats in head["routes"].items():
+        base_stats = base["routes"].get(route)
+        if not base_stats:
+            print(f"{route:<24} {'-':>10} {head_stats[args.metric]:>10.2f} {'new':>9}")
+            continue
+        before, after = base_stats[args.metric], head_stats[args.metric]
+        change = (after - before) / before * 100 if before else 0.0
+        marker = ""
+        if change > args.threshold:
+            regressions.append(route)
+            marker = "  REGRESSION"
+        print(f"{route:<24} {before:>10.2f} {after:>10.2f} {change:>8.1f}%{marker}")
+
+    print(f"\nbase {base['meta'].get('commit')}  head {head['meta'].get('commit')}")
+    if regressions:
+        print(f"{len(regressions)} route(s) slower than {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Seeded synthetic dataset generator.
+
+Creates users, companies, projects, specs (with files in spec storage), lint results
+with issue arrays, comments, checklist templates with active checklists, and
+notifications at a chosen scale. The same seed and scale always produce the same
+rows, so runs are comparable between commits.
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --scale small
+    python -m benchmarks.datagen --database-url postgresql://localhost/tapeout_bench --scale medium --fake-s3
+
+Use an empty scratch database: ids are assigned up front so rows can reference
+each other without a round trip per insert.
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    User, Company, Project, Spec, LintResult, Comment, Notification, NotificationPreference,
+    ChecklistTemplate, ChecklistItem, ActiveChecklist, ActiveChecklistItem,
+    EntityType, NotificationType
+)
+
+BENCH_USER_EMAIL = "bench-admin@example.com"
+BENCH_USER_PASSWORD = "bench-password"
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": dict(
+        users=25, companies=10, projects_per_company=5, specs_per_project=8,
+        lint_results_per_spec=3, comments_per_spec=3, templates=3, items_per_template=200,
+        active_checklists=40, notifications_per_user=40
+    ),
+    "medium": dict(
+        users=250, companies=100, projects_per_company=8, specs_per_project=12,
+        lint_results_per_spec=5, comments_per_spec=5, templates=10, items_per_template=1000,
+        active_checklists=400, notifications_per_user=200
+    ),
+    "large": dict(
+        users=2000, companies=1000, projects_per_company=10, specs_per_project=15,
+        lint_results_per_spec=8, comments_per_spec=8, templates=25, items_per_template=5000,
+        active_checklists=2000, notifications_per_user=500
+    ),
+}
+
+ROLES = ["engineer", "engineer", "engineer", "pm", "admin"]
+SPEC_STATUSES = ["draft", "review", "approved", "archived"]
+ISSUE_TYPES = ["MISSING_FIELD", "INVALID_VERSION", "INVALID_METADATA", "TIMING_VIOLATION", "DRC_WARNING"]
+SEVERITIES = ["error", "warning", "info"]
+WORDS = [
+    "pll", "serdes", "ddr", "sram", "io", "clock", "power", "analog", "phy", "cache",
+    "tapeout", "netlist", "corner", "timing", "lvs", "drc", "floorplan", "pcie", "usb", "adc"
+]
+CHUNK = 5000
+
+
+def _name(rng: random.Random, words: int = 2) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).title()
+
+
+def _timestamp(rng: random.Random, now: datetime, days: int = 365) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+
+def _next_id(db: Session, model) -> int:
+    return (db.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[start:start + CHUNK])
+
+
+def _spec_document(rng: random.Random, name: str, version: str) -> bytes:
+    document = {
+        "name": name,
+        "version": version,
+        "description": f"{name} block specification",
+        "spec_metadata": {
+            "corner": rng.choice(["tt", "ff", "ss", "fs", "sf"]),
+            "voltage": round(rng.uniform(0.6, 1.2), 2),
+            "cells": [f"{rng.choice(WORDS)}_{i}" for i in range(rng.randint(5, 40))],
+        },
+    }
+    if rng.random() < 0.2:
+        del document["description"]
+    return json.dumps(document).encode()
+
+
+def _issues(rng: random.Random) -> List[dict]:
+    return [
+        {
+            "severity": rng.choice(SEVERITIES),
+            "type": rng.choice(ISSUE_TYPES),
+            "message": f"{rng.choice(WORDS)} check failed",
+            "location": {"line": rng.randint(1, 5000), "section": rng.choice(WORDS)},
+        }
+        for _ in range(rng.randint(0, 12))
+    ]
+
+
+async def _put_all(storage, files: Dict[str, bytes], concurrency: int = 32) -> None:
+    items = list(files.items())
+    for start in range(0, len(items), concurrency):
+        await asyncio.gather(*(storage.put(key, data) for key, data in items[start:start + concurrency]))
+
+
+def _reset_sequences(db: Session) -> None:
+    """Move Postgres id sequences past the explicitly assigned ids."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for model in (User, Company, Project, Spec, LintResult, Comment, Notification, NotificationPreference,
+                  ChecklistTemplate, ChecklistItem, ActiveChecklist, ActiveChecklistItem):
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table}), 1))"
+        ))
+
+
+def generate(db: Session, storage, seed: int = 42, scale: str = "small") -> Dict[str, int]:
+    """Populate `db` (and spec `storage`) with a deterministic dataset; returns row counts."""
+    from app.utils.security import get_password_hash
+
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    counts: Dict[str, int] = {}
+
+    # Users: one known login for the runner, the rest share a hash (bcrypt is slow)
+    password_hash = get_password_hash(BENCH_USER_PASSWORD)
+    user_id = _next_id(db, User)
+    users = [{
+        "id": user_id, "email": BENCH_USER_EMAIL, "hashed_password": password_hash,
+        "full_name": "Bench Admin", "role": "admin", "is_active": True, "is_superuser": True,
+    }]
+    for i in range(1, sizes["users"]):
+        users.append({
+            "id": user_id + i, "email": f"user{i}.{seed}@example.com", "hashed_password": password_hash,
+            "full_name": _name(rng), "role": rng.choice(ROLES), "is_active": rng.random() > 0.05,
+            "is_superuser": False,
+        })
+    _bulk_insert(db, User, users)
+    user_ids = [u["id"] for u in users]
+    counts["users"] = len(users)
+
+    # Companies are owned by the bench user so owner-scoped listings return data
+    company_id = _next_id(db, Company)
+    companies = [
+        {"id": company_id + i, "name": f"{_name(rng)} {i}", "description": f"{_name(rng, 4)} vendor",
+         "owner_id": user_ids[0] if i % 2 == 0 else rng.choice(user_ids), "status": "Active",
+         "created_at": _timestamp(rng, now)}
+        for i in range(sizes["companies"])
+    ]
+    _bulk_insert(db, Company, companies)
+    counts["companies"] = len(companies)
+
+    project_id = _next_id(db, Project)
+    projects = []
+    for company in companies:
+        for _ in range(sizes["projects_per_company"]):
+            projects.append({
+                "id": project_id + len(projects), "name": f"{_name(rng)} {len(projects)}",
+                "description": _name(rng, 6), "company_id": company["id"], "created_at": _timestamp(rng, now),
+            })
+    _bulk_insert(db, Project, projects)
+    counts["projects"] = len(projects)
+
+    spec_id = _next_id(db, Spec)
+    specs, spec_files = [], {}
+    for project in projects:
+        for _ in range(sizes["specs_per_project"]):
+            version = f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 20)}"
+            name = f"{_name(rng)} spec {len(specs)}"
+            key = f"specs/{project['id']}/{version}/spec_{len(specs)}.json"
+            spec_files[key] = _spec_document(rng, name, version)
+            specs.append({
+                "id": spec_id + len(specs), "name": name, "description": _name(rng, 5), "version": version,
+                "status": rng.choice(SPEC_STATUSES), "file_path": key, "project_id": project["id"],
+                "author_id": rng.choice(user_ids), "created_at": _timestamp(rng, now),
+            })
+    asyncio.run(_put_all(storage, spec_files))
+    _bulk_insert(db, Spec, specs)
+    counts["specs"] = len(specs)
+
+    lint_results, comments = [], []
+    lint_id, comment_id = _next_id(db, LintResult), _next_id(db, Comment)
+    for spec in specs:
+        for _ in range(sizes["lint_results_per_spec"]):
+            issues = _issues(rng)
+            lint_results.append({
+                "id": lint_id + len(lint_results), "spec_id": spec["id"], "issues": issues,
+                "summary": f"Found {len(issues)} issues", "created_at": _timestamp(rng, now),
+            })
+        for _ in range(sizes["comments_per_spec"]):
+            comments.append({
+                "id": comment_id + len(comments), "content": _name(rng, 12), "author_id": rng.choice(user_ids),
+                "entity_type": EntityType.SPEC, "entity_id": spec["id"], "spec_id": spec["id"],
+                "project_id": spec["project_id"], "created_at": _timestamp(rng, now),
+            })
+    _bulk_insert(db, LintResult, lint_results)
+    _bulk_insert(db, Comment, comments)
+    counts["lint_results"] = len(lint_results)
+    counts["comments"] = len(comments)
+
+    template_id, item_id = _next_id(db, ChecklistTemplate), _next_id(db, ChecklistItem)
+    templates, items, items_by_template = [], [], {}
+    for t in range(sizes["templates"]):
+        templates.append({"id": template_id + t, "name": f"{_name(rng)} sign-off", "created_by": BENCH_USER_EMAIL})
+        items_by_template[template_id + t] = []
+        for order in range(sizes["items_per_template"]):
+            items_by_template[template_id + t].append(item_id + len(items))
+            items.append({
+                "id": item_id + len(items), "template_id": template_id + t,
+                "title": f"Verify {_name(rng)}", "description": _name(rng, 8), "order": order,
+            })
+    _bulk_insert(db, ChecklistTemplate, templates)
+    _bulk_insert(db, ChecklistItem, items)
+    counts["checklist_templates"] = len(templates)
+    counts["checklist_items"] = len(items)
+
+    active_id, active_item_id = _next_id(db, ActiveChecklist), _next_id(db, ActiveChecklistItem)
+    active, active_items = [], []
+    for c in range(sizes["active_checklists"]):
+        chosen = rng.choice(templates)["id"]
+        active.append({
+            "id": active_id + c, "template_id": chosen, "linked_spec_id": str(rng.choice(specs)["id"]),
+            "created_by": BENCH_USER_EMAIL, "status": "active",
+        })
+        for template_item_id in items_by_template[chosen]:
+            active_items.append({
+                "id": active_item_id + len(active_items), "checklist_id": active_id + c,
+                "template_item_id": template_item_id, "status": rng.choice(["pending", "in_progress", "done"]),
+                "assigned_to_user_id": rng.choice(user_ids) if rng.random() < 0.3 else None,
+            })
+    _bulk_insert(db, ActiveChecklist, active)
+    _bulk_insert(db, ActiveChecklistItem, active_items)
+    counts["active_checklists"] = len(active)
+    counts["active_checklist_items"] = len(active_items)
+
+    notification_id = _next_id(db, Notification)
+    notifications = []
+    for uid in user_ids:
+        for _ in range(sizes["notifications_per_user"]):
+            notifications.append({
+                "id": notification_id + len(notifications), "recipient_id": uid,
+                "type": rng.choice(list(NotificationType)), "entity_type": EntityType.SPEC,
+                "entity_id": rng.choice(specs)["id"], "message": _name(rng, 8),
+                "is_read": rng.random() < 0.6, "created_at": _timestamp(rng, now, days=90),
+            })
+    _bulk_insert(db, Notification, notifications)
+    counts["notifications"] = len(notifications)
+
+    _reset_sequences(db)
+    db.commit()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-s3", action="store_true", help="Keep spec files in memory instead of S3")
+    args = parser.parse_args()
+
+    from benchmarks.env import configure
+    configure(args.database_url)
+
+    from app.db.base_class import Base
+    from app.db.session import engine, SessionLocal
+    from app.services.storage import SPECS, get_storage
+    from benchmarks import fake_s3
+
+    Base.metadata.create_all(engine)
+    if args.fake_s3:
+        fake_s3.install()
+    db = SessionLocal()
+    try:
+        counts = generate(db, get_storage(SPECS), seed=args.seed, scale=args.scale)
+    finally:
+        db.close()
+    print(json.dumps({"scale": args.scale, "seed": args.seed, "rows": counts}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Throughput and CPU cost of /specifications/{id}/download.
+
+Runs whole-file, single-range, multi-range and conditional (304) downloads at a
+fixed concurrency and reports MB/s and CPU seconds per GB served.
+
+In-process (ASGI transport) the CPU figure covers the app and the client
+together, since they share the process. Against a running server, pass
+--server-pid to read the server's own CPU time from /proc instead. That is the
+figure to compare between the FileResponse/pathsend path and an nginx
+X-Accel-Redirect deployment.
+
+    # in-process, with a generated 64 MB file on local storage
+    python -m benchmarks.downloads --database-url sqlite:///bench.db --size-mb 64 --requests 50
+
+    # against a running server (Linux only for --server-pid)
+    python -m benchmarks.downloads --base-url http://localhost:8000 --spec-id <uuid> \\
+        --server-pid $(pgrep -f "uvicorn app.main") --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.datagen import BENCH_USER_EMAIL, BENCH_USER_PASSWORD
+from benchmarks.runner import git_commit, percentile
+
+API = "/api/v1"
+
+
+def _range_headers(size: int) -> Dict[str, Dict[str, str]]:
+    quarter = size // 4
+    return {
+        "full": {},
+        "single_range": {"Range": f"bytes={quarter}-{3 * quarter - 1}"},
+        "multi_range": {
+            "Range": "bytes=" + ", ".join(f"{i * quarter}-{i * quarter + quarter // 2 - 1}" for i in range(4))
+        },
+        "not_modified": {},  # If-None-Match is filled in from the first response
+    }
+
+
+def proc_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        # Fields after the parenthesised command name; utime and stime are 14 and 15
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_case(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: Dict[str, str],
+    requests: int,
+    concurrency: int,
+    cpu_seconds: Callable[[], float]
+) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    served = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker() -> None:
+        nonlocal served
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            async with client.stream("GET", path, headers=headers) as response:
+                async for chunk in response.aiter_raw():
+                    served += len(chunk)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before
+    gigabytes = served / 1024 ** 3
+    return {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "bytes_served": served,
+        "throughput_mb_s": round(served / 1024 ** 2 / elapsed, 2) if elapsed else 0.0,
+        "cpu_seconds": round(cpu, 3),
+        "cpu_seconds_per_gb": round(cpu / gigabytes, 3) if gigabytes else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+async def run(
+    args: argparse.Namespace,
+    transport: Optional[httpx.AsyncBaseTransport],
+    headers: Optional[Dict[str, str]],
+    spec_id: str
+) -> dict:
+    if args.server_pid:
+        cpu_seconds = lambda: proc_cpu_seconds(args.server_pid)  # noqa: E731
+    else:
+        cpu_seconds = time.process_time
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    base_url = args.base_url or "http://bench"
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=300) as client:
+        if headers is None:
+            response = await client.post(
+                f"{API}/auth/login", json={"email": BENCH_USER_EMAIL, "password": BENCH_USER_PASSWORD}
+            )
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        path = f"{API}/specifications/{spec_id}/download"
+        first = await client.get(path, headers=headers)
+        first.raise_for_status()
+        cases = _range_headers(len(first.content))
+        cases["not_modified"] = {"If-None-Match": first.headers.get("etag", '"none"')}
+        results = {}
+        for name, extra in cases.items():
+            results[name] = await run_case(
+                client, path, {**headers, **extra}, args.requests, args.concurrency, cpu_seconds
+            )
+    return results
+
+
+def setup_in_process(size_mb: int) -> tuple:
+    """Seed a user and one local-storage specification file; returns (auth headers, spec id)."""
+    import hashlib
+
+    from app.db.base_class import Base
+    from app.db.models import Specification, User
+    from app.db.session import SessionLocal, engine
+    from app.services.storage import UPLOADS, LocalStorage, set_storage
+    from app.utils.security import create_access_token
+
+    root = tempfile.mkdtemp(prefix="bench-downloads-")
+    set_storage(UPLOADS, LocalStorage(root))
+    key = f"uploaded_specs/{uuid.uuid4().hex}.bin"
+    os.makedirs(os.path.join(root, "uploaded_specs"))
+    block = os.urandom(1024 * 1024)
+    digest = hashlib.sha256()
+    with open(os.path.join(root, key), "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+            digest.update(block)
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.email == BENCH_USER_EMAIL).first() is None:
+            # Never logged into; requests use a minted access token
+            db.add(User(email=BENCH_USER_EMAIL, hashed_password="!", role="admin", is_active=True))
+        spec = Specification(
+            file_name="bench.bin",
+            mime_type="application/octet-stream",
+            uploaded_by=BENCH_USER_EMAIL,
+            file_path=key,
+            checksum_sha256=digest.hexdigest(),
+            size_bytes=size_mb * 1024 * 1024,
+        )
+        db.add(spec)
+        db.commit()
+        spec_id = str(spec.id)
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': BENCH_USER_EMAIL})}"}, spec_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--database-url", help="Run the app in-process against this database")
+    target.add_argument("--base-url", help="Benchmark an already running server")
+    parser.add_argument("--spec-id", help="Specification to download (required with --base-url)")
+    parser.add_argument("--server-pid", type=int, help="Measure this process's CPU time instead of our own")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the generated file (in-process only)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per case")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+    if args.base_url and not args.spec_id:
+        parser.error("--spec-id is required with --base-url")
+
+    transport = None
+    headers = None
+    spec_id = args.spec_id
+    if args.database_url:
+        from benchmarks.env import configure
+        configure(args.database_url)
+
+        from app.main import app
+
+        headers, spec_id = setup_in_process(args.size_mb)
+        transport = httpx.ASGITransport(app=app)
+
+    results = asyncio.run(run(args, transport, headers, spec_id))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "target": args.base_url or args.database_url.split("@")[-1],
+            "concurrency": args.concurrency,
+            "requests_per_case": args.requests,
+            "cpu_measured": f"pid {args.server_pid}" if args.server_pid else "benchmark process",
+        },
+        "cases": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
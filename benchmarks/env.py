@@ -0,0 +1,9 @@
+import os
+import sys
+
+
+def configure(database_url: str) -> None:
+    """Point app settings at the benchmark database; must run before app.core.config is imported."""
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("configure() must be called before the app settings are imported")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
@@ -0,0 +1,134 @@
+"""
+In-memory stand-in for the boto3 S3 client, for benchmarks run without AWS.
+
+Only the calls the S3 storage driver makes are implemented. install() puts an
+S3Storage backed by it in place of the "specs" store.
+"""
+import base64
+import hashlib
+import io
+import threading
+import uuid
+from typing import Dict, Tuple
+from urllib.parse import quote
+
+from botocore.exceptions import ClientError
+
+
+class FakeS3Client:
+    def __init__(self) -> None:
+        self._objects: Dict[Tuple[str, str], bytes] = {}
+        self._uploads: Dict[str, Dict[int, bytes]] = {}
+        self._checksums: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def _missing(self, operation: str, key: str) -> ClientError:
+        return ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": f"{key} does not exist"}},
+            operation
+        )
+
+    def put_object(self, Bucket: str, Key: str, Body, ChecksumSHA256: str = None, **kwargs) -> dict:
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        if ChecksumSHA256 is not None and ChecksumSHA256 != base64.b64encode(hashlib.sha256(data).digest()).decode():
+            raise ClientError({"Error": {"Code": "BadDigest", "Message": "checksum mismatch"}}, "PutObject")
+        with self._lock:
+            self._objects[(Bucket, Key)] = data
+            if ChecksumSHA256 is not None:
+                self._checksums[(Bucket, Key)] = ChecksumSHA256
+            else:
+                self._checksums.pop((Bucket, Key), None)
+        return {"ETag": f'"{hash(data) & 0xffffffff:08x}"'}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self._lock:
+            data = self._objects.get((Bucket, Key))
+        if data is None:
+            raise self._missing("GetObject", Key)
+        if "Range" in kwargs:
+            first, _, last = kwargs["Range"][len("bytes="):].partition("-")
+            data = data[int(first):int(last) + 1 if last else None]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self._lock:
+            data = self._objects.get((Bucket, Key))
+        if data is None:
+            raise self._missing("HeadObject", Key)
+        response = {"ContentLength": len(data)}
+        if kwargs.get("ChecksumMode") == "ENABLED" and (Bucket, Key) in self._checksums:
+            response["ChecksumSHA256"] = self._checksums[(Bucket, Key)]
+        return response
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self._lock:
+            self._objects.pop((Bucket, Key), None)
+            self._checksums.pop((Bucket, Key), None)
+        return {}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> dict:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body, **kwargs) -> dict:
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        with self._lock:
+            if UploadId not in self._uploads:
+                raise ClientError({"Error": {"Code": "NoSuchUpload", "Message": UploadId}}, "UploadPart")
+            self._uploads[UploadId][PartNumber] = data
+        return {"ETag": f'"{hash(data) & 0xffffffff:08x}"'}
+
+    def list_parts(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> dict:
+        with self._lock:
+            if UploadId not in self._uploads:
+                raise ClientError({"Error": {"Code": "NoSuchUpload", "Message": UploadId}}, "ListParts")
+            parts = sorted(self._uploads[UploadId].items())
+        return {
+            "Parts": [{"PartNumber": n, "ETag": f'"{hash(data) & 0xffffffff:08x}"', "Size": len(data)} for n, data in parts],
+            "IsTruncated": False,
+        }
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict, **kwargs) -> dict:
+        with self._lock:
+            if UploadId not in self._uploads:
+                raise ClientError({"Error": {"Code": "NoSuchUpload", "Message": UploadId}}, "CompleteMultipartUpload")
+            parts = self._uploads.pop(UploadId)
+            self._checksums.pop((Bucket, Key), None)
+            self._objects[(Bucket, Key)] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+        return {"Key": Key}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> dict:
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: dict, **kwargs) -> dict:
+        with self._lock:
+            data = self._objects.get((CopySource["Bucket"], CopySource["Key"]))
+            if data is None:
+                raise self._missing("CopyObject", CopySource["Key"])
+            self._objects[(Bucket, Key)] = data
+            self._checksums.pop((Bucket, Key), None)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int = 3600, **kwargs) -> str:
+        url = f"http://fake-s3.local/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+        if "ResponseContentDisposition" in Params:
+            url += f"&response-content-disposition={quote(Params['ResponseContentDisposition'])}"
+        return url
+
+    @property
+    def object_count(self) -> int:
+        return len(self._objects)
+
+
+def install(client: FakeS3Client = None) -> FakeS3Client:
+    """Serve the app's spec storage from the fake."""
+    from app.core.config import settings
+    from app.services.storage import SPECS, S3Storage, set_storage
+
+    client = client or FakeS3Client()
+    set_storage(SPECS, S3Storage(settings.S3_BUCKET, client=client))
+    return client
@@ -0,0 +1,91 @@
+"""
+Microbenchmark for the single-row lookups on the auth and CRUD hot paths.
+
+Compares the legacy db.query(...).filter(...).first() construction with the
+cached lambda statements used by get_user_by_email, get_spec, get_project and
+get_company. Reports microseconds per call, so the difference is mostly Python
+statement construction and compilation overhead.
+
+    python -m benchmarks.hot_lookups --iterations 20000
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import User, Company, Project, Spec
+from app.services import auth as auth_service
+from app.crud import spec as crud_spec, project as crud_project, company as crud_company
+
+
+def seed(db) -> dict:
+    user = User(email="bench@example.com", hashed_password="x", role="engineer", is_active=True)
+    db.add(user)
+    db.flush()
+    company = Company(name="Bench Co", owner_id=user.id)
+    db.add(company)
+    db.flush()
+    project = Project(name="Bench Project", company_id=company.id)
+    db.add(project)
+    db.flush()
+    spec = Spec(name="Bench Spec", version="1.0.0", status="draft", file_path="specs/bench.json",
+                project_id=project.id, author_id=user.id)
+    db.add(spec)
+    db.commit()
+    return {"email": user.email, "company_id": company.id, "project_id": project.id, "spec_id": spec.id}
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()  # warm the statement cache
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - start) / iterations * 1_000_000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    ids = seed(db)
+    n = args.iterations
+
+    lookups = {
+        "get_user_by_email": (
+            lambda: db.query(User).filter(User.email == ids["email"]).first(),
+            lambda: auth_service.get_user_by_email(db, ids["email"]),
+        ),
+        "get_spec": (
+            lambda: db.query(Spec).filter(Spec.id == ids["spec_id"]).first(),
+            lambda: crud_spec.get_spec(db, ids["spec_id"]),
+        ),
+        "get_project": (
+            lambda: db.query(Project).filter(Project.id == ids["project_id"]).first(),
+            lambda: crud_project.get_project(db, ids["project_id"]),
+        ),
+        "get_company": (
+            lambda: db.query(Company).filter(Company.id == ids["company_id"]).first(),
+            lambda: crud_company.get_company(db, ids["company_id"]),
+        ),
+    }
+    results = {}
+    for name, (legacy, cached) in lookups.items():
+        results[name] = {
+            "legacy_query_us": per_call_us(legacy, n),
+            "cached_lambda_us": per_call_us(cached, n),
+        }
+    print(json.dumps({"iterations": n, "results": results}, indent=2))
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
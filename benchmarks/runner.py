@@ -0,0 +1,215 @@
+"""
+End-to-end endpoint benchmark.
+
+Drives the main API routes at a fixed concurrency, one route at a time, and
+writes p50/p95/p99 latency and throughput per route as JSON. Runs either
+in-process against a benchmark database (ASGI transport, optional fake S3) or
+against a running server.
+
+    # in-process, generating a fresh SQLite dataset first
+    python -m benchmarks.runner --database-url sqlite:///bench.db --generate --fake-s3 \\
+        --concurrency 16 --requests 500 --output bench_output.json
+
+    # against a running server that was seeded with benchmarks.datagen
+    python -m benchmarks.runner --base-url http://localhost:8000 --concurrency 32 --requests 2000
+
+Compare two runs with benchmarks.compare.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.datagen import BENCH_USER_EMAIL, BENCH_USER_PASSWORD, WORDS
+
+API = "/api/v1"
+
+# name -> path template; placeholders are filled from ids discovered through the API
+ROUTES: Dict[str, str] = {
+    "auth_me": "/auth/me",
+    "companies_list": "/companies/",
+    "projects_list": "/projects/",
+    "project_detail": "/projects/{project_id}",
+    "project_specs": "/specs/projects/{project_id}/specs",
+    "users_by_role": "/users/?role=engineer",
+    "search": "/search/?q={term}",
+    "search_suggest": "/search/suggest?q={term}",
+    "checklists_active": "/checklists/active",
+    "checklist_items": "/checklists/active/{checklist_id}/items",
+    "checklist_completion": "/checklists/active/{checklist_id}/completion",
+    "dashboard_stats": "/dashboard/stats",
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 3)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def login(client: httpx.AsyncClient) -> Dict[str, str]:
+    response = await client.post(f"{API}/auth/login", json={"email": BENCH_USER_EMAIL, "password": BENCH_USER_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def discover(client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, list]:
+    """Collect ids to fill route placeholders."""
+    projects = (await client.get(f"{API}/projects/", params={"limit": 1000}, headers=headers)).json()
+    checklists = (await client.get(f"{API}/checklists/active", headers=headers)).json()
+    return {
+        "project_id": [p["id"] for p in projects] or [1],
+        "checklist_id": [c["id"] for c in checklists] or [1],
+        "term": WORDS,
+    }
+
+
+async def run_route(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    template: str,
+    ids: Dict[str, list],
+    requests: int,
+    concurrency: int,
+    rng: random.Random
+) -> dict:
+    paths = [
+        API + template.format(**{key: rng.choice(values) for key, values in ids.items()})
+        for _ in range(requests)
+    ]
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async def worker() -> None:
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def run(args: argparse.Namespace, transport: Optional[httpx.AsyncBaseTransport]) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    base_url = args.base_url or "http://bench"
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=60) as client:
+        headers = await login(client)
+        ids = await discover(client, headers)
+        routes = {name: ROUTES[name] for name in (args.routes or ROUTES)}
+        results = {}
+        for name, template in routes.items():
+            if args.warmup:
+                await run_route(client, headers, template, ids, args.warmup, args.concurrency, rng)
+            results[name] = await run_route(client, headers, template, ids, args.requests, args.concurrency, rng)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--database-url", help="Run the app in-process against this database")
+    target.add_argument("--base-url", help="Benchmark an already running server")
+    parser.add_argument("--generate", action="store_true", help="Seed the database with benchmarks.datagen first")
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-s3", action="store_true", help="Use the in-memory S3 stand-in (in-process only)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route")
+    parser.add_argument("--routes", nargs="*", choices=sorted(ROUTES), help="Subset of routes to run")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    transport = None
+    if args.database_url:
+        from benchmarks.env import configure
+        configure(args.database_url)
+
+        from app.db.base_class import Base
+        from app.db.session import engine, SessionLocal
+        from app.main import app
+        from app.services.storage import SPECS, get_storage
+        from benchmarks import datagen, fake_s3
+
+        if args.fake_s3:
+            fake_s3.install()
+        if args.generate:
+            Base.metadata.create_all(engine)
+            db = SessionLocal()
+            try:
+                datagen.generate(db, get_storage(SPECS), seed=args.seed, scale=args.scale)
+            finally:
+                db.close()
+        # ASGITransport sends no lifespan events, so startup never loads the suggest index
+        from app.core.suggest import suggest_index
+        db = SessionLocal()
+        try:
+            suggest_index.rebuild(db)
+        finally:
+            db.close()
+        transport = httpx.ASGITransport(app=app)
+
+    results = asyncio.run(run(args, transport))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "target": args.base_url or args.database_url.split("@")[-1],
+            "concurrency": args.concurrency,
+            "requests_per_route": args.requests,
+            "scale": args.scale if args.generate else None,
+            "seed": args.seed,
+        },
+        "routes": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
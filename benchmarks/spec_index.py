@@ -0,0 +1,209 @@
+"""
+Throughput of the spec content indexer, size of its index and latency of
+/search/specs queries.
+
+Writes --files synthetic spec files to a temporary local spec store: JSON
+documents with cells, corners and parameters, plain-text timing reports and
+single-page PDFs. It adds a spec row for each and indexes them all with the
+same backfill the background indexer runs. The report covers files/s, MB/s,
+the index size and query latency for a common cell, a selective cell, a
+corner, a parameter name and a miss.
+
+    python -m benchmarks.spec_index --database-url sqlite:///spec_index.db --files 2000
+    python -m benchmarks.spec_index --database-url postgresql://localhost/tapeout_spec_index --files 20000
+
+Use an empty scratch database: ids are assigned up front.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from benchmarks.datagen import WORDS, _bulk_insert, _name, _next_id, _put_all, _reset_sequences
+from benchmarks.runner import git_commit, percentile
+
+CORNERS = ["tt_0p80v_25c", "ss_0p72v_125c", "ff_0p88v_m40c", "ssg_0p72v_m40c", "ffg_0p88v_125c"]
+PARAMETERS = ["vdd_core", "vdd_io", "setup_margin_ps", "hold_margin_ps", "max_fanout", "max_transition_ps"]
+LIMIT = 20
+
+
+def _cell(rng: random.Random) -> str:
+    return f"{rng.choice(['AND', 'NAND', 'OR', 'NOR', 'XOR', 'DFFR', 'BUF', 'INV'])}{rng.randint(2, 4)}X{rng.randint(1, 16)}"
+
+
+def _json_spec(rng: random.Random, name: str) -> bytes:
+    return json.dumps({
+        "name": name,
+        "corners": [
+            {"name": corner, "parameters": {p: round(rng.uniform(0.1, 100), 3) for p in rng.sample(PARAMETERS, 3)}}
+            for corner in rng.sample(CORNERS, rng.randint(1, 3))
+        ],
+        "cells": [_cell(rng) for _ in range(rng.randint(50, 400))],
+        "notes": _name(rng, 12),
+    }, indent=2).encode()
+
+
+def _text_spec(rng: random.Random, name: str) -> bytes:
+    lines = [f"Timing report for {name}"]
+    for _ in range(rng.randint(100, 600)):
+        lines.append(
+            f"{rng.choice(CORNERS)} {_cell(rng)} {rng.choice(PARAMETERS)}={rng.uniform(0, 500):.2f} {rng.choice(WORDS)}"
+        )
+    return "\n".join(lines).encode()
+
+
+def _pdf_spec(rng: random.Random, name: str) -> bytes:
+    """A one-page PDF with a line of text per row."""
+    rows = [f"{name} datasheet"] + [
+        f"{rng.choice(CORNERS)} {_cell(rng)} {rng.choice(PARAMETERS)} {rng.uniform(0, 500):.2f}"
+        for _ in range(rng.randint(20, 45))
+    ]
+    text_ops = " ".join(f"({row}) Tj 0 -15 Td" for row in rows)
+    stream = f"BT /F1 10 Tf 40 760 Td {text_ops} ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def seed(db: Session, storage, files: int, seed_value: int) -> Dict[str, int]:
+    """Store `files` spec files and add their spec rows; returns file counts by kind."""
+    from app.db.models import Company, Project, Spec, User
+
+    rng = random.Random(seed_value)
+    user_id, company_id, project_id = _next_id(db, User), _next_id(db, Company), _next_id(db, Project)
+    _bulk_insert(db, User, [{"id": user_id, "email": f"spec-index-{user_id}@example.com", "hashed_password": "!",
+                             "role": "engineer", "is_active": True, "is_superuser": False}])
+    _bulk_insert(db, Company, [{"id": company_id, "name": "Spec index bench", "owner_id": user_id, "status": "Active"}])
+    _bulk_insert(db, Project, [{"id": project_id, "name": "Spec index bench", "company_id": company_id}])
+    first_id = _next_id(db, Spec)
+    builders = [("json", _json_spec)] * 6 + [("text", _text_spec)] * 3 + [("pdf", _pdf_spec)]
+    kinds: Dict[str, int] = {}
+    stored: Dict[str, bytes] = {}
+    rows: List[dict] = []
+    for spec_id in range(first_id, first_id + files):
+        kind, build = rng.choice(builders)
+        name = f"{_name(rng)} {spec_id}"
+        data = build(rng, name)
+        key = f"bench-spec-index/{spec_id}.{kind}"
+        stored[key] = data
+        kinds[kind] = kinds.get(kind, 0) + 1
+        rows.append({
+            "id": spec_id, "name": name, "version": "1.0.0", "status": "draft", "file_path": key,
+            "checksum_sha256": hashlib.sha256(data).hexdigest(), "size_bytes": len(data),
+            "project_id": project_id, "author_id": user_id,
+        })
+        if len(stored) >= 500:
+            asyncio.run(_put_all(storage, stored))
+            stored.clear()
+    asyncio.run(_put_all(storage, stored))
+    _bulk_insert(db, Spec, rows)
+    _reset_sequences(db)
+    db.commit()
+    return kinds
+
+
+def run_query(db: Session, q: str, repeats: int) -> dict:
+    from app.services.spec_index import search_specs
+
+    latencies = []
+    matches = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        matches = len(search_specs(db, q, LIMIT)["items"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+    return {
+        "matches": matches,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    from benchmarks.env import configure
+    configure(args.database_url)
+
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.services.spec_index import SpecIndexer
+    from app.services.storage import SPECS, LocalStorage, get_storage, set_storage
+
+    Base.metadata.create_all(engine)
+    set_storage(SPECS, LocalStorage(tempfile.mkdtemp(prefix="bench-spec-index-")))
+    indexer = SpecIndexer()
+    db = SessionLocal()
+    try:
+        kinds = seed(db, get_storage(SPECS), args.files, args.seed)
+        started = time.perf_counter()
+        indexer.backfill(db)
+        wall_seconds = time.perf_counter() - started
+        stats = indexer.stats()
+        queries = {
+            "common_cell": "nand2x1",
+            "selective_cell": "dffr4x16 ss_0p72v",
+            "corner": "ff_0p88v_m40c",
+            "parameter": "setup_margin_ps",
+            "miss": "zzqx",
+        }
+        latency = {name: run_query(db, q, args.repeats) for name, q in queries.items()}
+    finally:
+        db.close()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "target": args.database_url.split("@")[-1],
+            "dialect": engine.dialect.name,
+            "files": kinds,
+            "repeats": args.repeats,
+            "limit": LIMIT,
+        },
+        "indexing": {
+            "wall_seconds": round(wall_seconds, 3),
+            "files_per_second": round(args.files / wall_seconds, 1),
+            "mb_per_second": round(stats["bytes_read"] / wall_seconds / 1e6, 2),
+            **{key: stats[key] for key in ("indexed", "shared", "unsupported", "failed", "errors",
+                                           "bytes_read", "chars_indexed")},
+        },
+        "index_size": stats["index_size"],
+        "queries": latency,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared test setup: a scratch SQLite database and in-memory token revocation,
+configured before any app module is imported.
+"""
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="tapeout-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_DB_DIR, 'app.db')}"
+os.environ["REVOCATION_STORE"] = "memory"
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Create every table once; yields the app's engine."""
+    from app.db import models  # noqa: F401  (registers the tables)
+    from app.db.base_class import Base
+    from app.db.session import engine
+
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
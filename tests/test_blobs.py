@@ -0,0 +1,124 @@
+"""
+Blob store writes never hold a blob row lock (or an uncommitted blob insert)
+across storage I/O: every DB call is synchronous on the event loop, so another
+request blocking on that row would freeze the worker before the holder could
+commit.
+"""
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import event
+
+from app.db.models import Blob
+from app.db.session import SessionLocal
+from app.services import blobs
+from app.services.storage import UPLOADS, LocalStorage, get_storage, set_storage
+
+
+class RecordingStorage(LocalStorage):
+    """LocalStorage that logs each storage call into a shared event list."""
+
+    def __init__(self, root: str, events: list) -> None:
+        super().__init__(root)
+        self.events = events
+
+    async def exists(self, key):
+        self.events.append("io:exists")
+        return await super().exists(key)
+
+    async def put_file(self, key, source):
+        self.events.append("io:put_file")
+        return await super().put_file(key, source)
+
+    async def copy(self, source_key, dest_key):
+        self.events.append("io:copy")
+        return await super().copy(source_key, dest_key)
+
+    async def delete(self, key):
+        self.events.append("io:delete")
+        return await super().delete(key)
+
+
+@pytest.fixture
+def events(database, tmp_path):
+    log = []
+    previous = get_storage(UPLOADS)
+    set_storage(UPLOADS, RecordingStorage(str(tmp_path), log))
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        words = statement.split()
+        # An UPDATE that matched no row locks nothing
+        if words[0] in ("UPDATE", "INSERT") and "blobs" in words[:4] and cursor.rowcount != 0:
+            log.append("db:write-blob")
+
+    def on_commit(conn):
+        log.append("db:commit")
+
+    event.listen(database, "after_cursor_execute", on_execute)
+    event.listen(database, "commit", on_commit)
+    yield log
+    event.remove(database, "after_cursor_execute", on_execute)
+    event.remove(database, "commit", on_commit)
+    set_storage(UPLOADS, previous)
+
+
+def assert_no_io_while_locked(events: list) -> None:
+    locked = False
+    for entry in events:
+        if entry == "db:write-blob":
+            locked = True
+        elif entry == "db:commit":
+            locked = False
+        elif entry.startswith("io:"):
+            assert not locked, f"storage I/O while a blob row is held: {events}"
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="evidence.pdf")
+
+
+def test_store_upload_does_storage_io_before_the_blob_row(events):
+    data = os.urandom(4096)
+    db = SessionLocal()
+    try:
+        first = asyncio.run(blobs.store_upload(db, UPLOADS, "evidence", _upload(data)))
+        db.commit()
+        # Dedup hit: existence check, then only the refcount update
+        second = asyncio.run(blobs.store_upload(db, UPLOADS, "evidence", _upload(data)))
+        db.commit()
+        assert first.key == second.key
+        assert db.query(Blob.refcount).filter(Blob.location == first.key).scalar() == 2
+        assert events.count("io:put_file") == 1
+        assert_no_io_while_locked(events)
+
+        # Content lost from the store: rewritten before the reference is added
+        os.remove(os.path.join(get_storage(UPLOADS).root, first.key))
+        asyncio.run(blobs.store_upload(db, UPLOADS, "evidence", _upload(data)))
+        db.commit()
+        assert events.count("io:put_file") == 2
+        assert_no_io_while_locked(events)
+    finally:
+        db.close()
+
+
+def test_adopt_object_copies_before_the_blob_row_and_keeps_the_staged_object(events):
+    data = os.urandom(4096)
+    storage = get_storage(UPLOADS)
+    sha256 = hashlib.sha256(data).hexdigest()
+    db = SessionLocal()
+    try:
+        for staged in ("incoming/a", "incoming/b"):
+            asyncio.run(storage.put_file(staged, io.BytesIO(data)))
+            result = asyncio.run(blobs.adopt_object(db, UPLOADS, "blobs", staged, sha256, len(data)))
+            db.commit()
+            # Deleting the staged object is left to the caller, after its commit
+            assert asyncio.run(storage.exists(staged))
+        assert events.count("io:copy") == 1
+        assert db.query(Blob.refcount).filter(Blob.location == result.key).scalar() == 2
+        assert_no_io_while_locked(events)
+    finally:
+        db.close()
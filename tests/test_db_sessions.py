@@ -0,0 +1,74 @@
+"""
+Every request holds at most one pooled connection: the endpoint's session and
+the one behind get_current_user are the same (see app/api/deps.py).
+
+Runs against the scratch SQLite database from conftest.py through TestClient:
+
+    python -m pytest tests/test_db_sessions.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import models
+from app.db.query_stats import assert_query_budget
+from app.db.session import SessionLocal
+from app.main import app
+from app.utils.security import get_password_hash
+
+API = "/api/v1"
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    db = SessionLocal()
+    try:
+        db.add(models.User(
+            email="sessions@example.com", hashed_password=get_password_hash("pw"),
+            full_name="Session Test", role="admin", is_active=True,
+        ))
+        db.commit()
+    finally:
+        db.close()
+    # Not used as a context manager: startup would launch the background workers
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def auth_headers(client):
+    response = client.post(f"{API}/auth/login", json={"email": "sessions@example.com", "password": "pw"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def api_key_headers(client, auth_headers):
+    response = client.post(f"{API}/settings/api-keys/", headers=auth_headers, json={"name": "ci"})
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['key']}"}
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("get", "/checklists/templates", None),
+    ("post", "/checklists/templates", {"name": "Tapeout signoff", "description": "", "created_by": "sessions"}),
+    ("get", "/checklists/active", None),
+    ("get", "/users/", None),
+    ("get", "/users/me/profile", None),
+    ("get", "/specifications/", None),
+    ("get", "/companies/", None),
+    ("post", "/companies/", {"name": "Acme Silicon", "description": "Test company"}),
+])
+def test_one_checkout_per_request(client, auth_headers, method, path, body):
+    with assert_query_budget(max_queries=10, max_checkouts=1) as captured:
+        response = client.request(method.upper(), f"{API}{path}", headers=auth_headers, json=body)
+    assert response.status_code == 200, response.text
+    assert len(captured) == 1
+
+
+@pytest.mark.parametrize("path", ["/companies/", "/checklists/templates", "/users/me/profile"])
+def test_one_checkout_per_api_key_request(client, api_key_headers, path):
+    # Both the first request (key lookup) and later cache hits stay on one connection
+    for _ in range(2):
+        with assert_query_budget(max_queries=10, max_checkouts=1) as captured:
+            response = client.get(f"{API}{path}", headers=api_key_headers)
+        assert response.status_code == 200, response.text
+        assert len(captured) == 1
@@ -0,0 +1,95 @@
+"""
+DownloadLimiter slots go back once the request is over, however it ended.
+
+    python -m pytest tests/test_downloads.py
+"""
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.download_slots import DownloadSlotMiddleware
+from app.services.downloads import DownloadLimiter
+
+
+async def _chunks():
+    # Paced like a read from the store, so a disconnect lands mid-stream
+    for _ in range(4):
+        await asyncio.sleep(0.01)
+        yield b"x" * 1024
+
+
+def _teardown_fails():
+    yield
+    raise RuntimeError("teardown failed")
+
+
+@pytest.fixture
+def limiter():
+    return DownloadLimiter(max_concurrency=2, acquire_timeout=0.1)
+
+
+@pytest.fixture
+def app(limiter):
+    app = FastAPI()
+    app.add_middleware(DownloadSlotMiddleware)
+
+    async def stream():
+        return StreamingResponse(_chunks())
+
+    @app.get("/download")
+    async def download(request: Request):
+        return await limiter.run(request, stream)
+
+    # The dependency fails after the endpoint returned, so the response is never sent
+    @app.get("/download-then-fail", dependencies=[Depends(_teardown_fails)])
+    async def download_then_fail(request: Request):
+        return await limiter.run(request, stream)
+
+    return app
+
+
+def test_slot_released_after_download(app, limiter):
+    for _ in range(3):
+        response = TestClient(app).get("/download")
+        assert response.status_code == 200
+        assert len(response.content) == 4096
+    assert limiter.in_flight == 0
+    assert limiter.completed == 3
+
+
+def test_slot_released_when_client_disconnects(app, limiter):
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(0)
+        return {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        # As uvicorn does once the client has gone: the message is dropped
+        sent.append(message["type"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/download", "raw_path": b"/download", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    # The stream was cancelled on the disconnect, before the end of the body
+    assert sent.count("http.response.body") < 5
+    assert limiter.in_flight == 0
+    assert limiter.completed == 1
+
+
+def test_slot_released_when_response_is_never_sent(app, limiter):
+    client = TestClient(app, raise_server_exceptions=False)
+    for _ in range(3):
+        assert client.get("/download-then-fail").status_code == 500
+    assert limiter.in_flight == 0
+    assert limiter.rejected == 0